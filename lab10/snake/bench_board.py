@@ -0,0 +1,68 @@
+"""Microbenchmark: list-of-tuples snake vs SnakeBoard (deque + occupancy grid).
+
+Moves a snake of a given length around a cycle that covers the whole 30x20
+board and times one game tick (collision checks, new head, drop tail).
+
+Run with:  python bench_board.py
+"""
+import timeit
+
+from board import SnakeBoard
+
+COLS, ROWS = 30, 20
+CELL_SIZE = 20
+TICKS = 2000
+LENGTHS = [3, 50, 150, 300, 450, COLS * ROWS - 1]
+
+
+def board_cycle():
+    """A closed path through every cell: zig-zag over columns 1.., back up column 0."""
+    path = []
+    for row in range(ROWS):
+        cols = range(1, COLS) if row % 2 == 0 else range(COLS - 1, 0, -1)
+        path.extend((col, row) for col in cols)
+    path.extend((0, row) for row in range(ROWS - 1, -1, -1))
+    return path
+
+
+def bench_list(path, length):
+    """The original representation: pixel tuples in a list, head first."""
+    snake = [(c * CELL_SIZE, r * CELL_SIZE) for c, r in reversed(path[:length])]
+    walls = set()
+    step = [length]
+
+    def tick():
+        col, row = path[step[0] % len(path)]
+        step[0] += 1
+        new_head = (col * CELL_SIZE, row * CELL_SIZE)
+        hit = new_head in walls or new_head in snake
+        snake.insert(0, new_head)
+        snake.pop()
+        return hit
+
+    return timeit.timeit(tick, number=TICKS) / TICKS
+
+
+def bench_board(path, length):
+    board = SnakeBoard(COLS, ROWS)
+    board.place_snake(reversed(path[:length]))
+    step = [length]
+
+    def tick():
+        col, row = path[step[0] % len(path)]
+        step[0] += 1
+        board.pop_tail()  # tail first so the full-length cycle never self-collides
+        hit = board.is_wall(col, row) or board.is_snake(col, row)
+        board.push_head(col, row)
+        return hit
+
+    return timeit.timeit(tick, number=TICKS) / TICKS
+
+
+if __name__ == "__main__":
+    path = board_cycle()
+    print(f"{'length':>7} {'list (us/tick)':>15} {'board (us/tick)':>16} {'speedup':>8}")
+    for length in LENGTHS:
+        t_list = bench_list(path, length) * 1e6
+        t_board = bench_board(path, length) * 1e6
+        print(f"{length:>7} {t_list:>15.2f} {t_board:>16.2f} {t_list / t_board:>7.1f}x")
@@ -0,0 +1,76 @@
+"""Frame-time benchmark: full-screen redraw vs the dirty-rectangle SnakeRenderer.
+
+Moves a snake around the level 5 board and times the drawing part of one
+frame both ways. Runs without a window by default (SDL dummy video driver);
+set SDL_VIDEODRIVER yourself to measure against a real display.
+
+Run with:  python bench_render.py
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from bench_board import board_cycle
+from renderer import SnakeRenderer
+
+WIDTH, HEIGHT = 600, 400
+CELL_SIZE = 20
+FRAMES = 300
+LENGTHS = [3, 50, 200, 500]
+WALLS = [(5, 5, 1, 10), (24, 5, 1, 10), (10, 2, 10, 1), (10, 17, 10, 1)]  # level 5
+
+BLACK, GRAY, GREEN, RED, WHITE = (0, 0, 0), (128, 128, 128), (0, 255, 0), (255, 0, 0), (255, 255, 255)
+
+
+def bench_full(screen, fonts, path, length):
+    """The original frame: fill, draw every wall/segment, render HUD, update everything."""
+    score_font, help_font = fonts
+    wall_rects = [pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, w * CELL_SIZE, h * CELL_SIZE) for x, y, w, h in WALLS]
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        snake = path[frame:frame + length]
+        screen.fill(BLACK)
+        for wall_rect in wall_rects: pygame.draw.rect(screen, GRAY, wall_rect)
+        for col, row in snake: pygame.draw.rect(screen, GREEN, (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+        pygame.draw.rect(screen, RED, (0, 0, CELL_SIZE, CELL_SIZE))
+        screen.blit(score_font.render(f"Score: {frame // 50}", True, WHITE), (10, 10))
+        help_text = help_font.render("SPACE: Pause | S: Save & Quit", True, WHITE)
+        screen.blit(help_text, help_text.get_rect(bottomright=(WIDTH - 10, HEIGHT - 10)))
+        pygame.display.update()
+    return (time.perf_counter() - start) / FRAMES
+
+
+def bench_dirty(screen, fonts, path, length):
+    score_font, help_font = fonts
+    renderer = SnakeRenderer(screen, CELL_SIZE, BLACK, GRAY)
+    renderer.set_walls([pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, w * CELL_SIZE, h * CELL_SIZE) for x, y, w, h in WALLS])
+    renderer.set_text("help", help_font, "SPACE: Pause | S: Save & Quit", WHITE, bottomright=(WIDTH - 10, HEIGHT - 10))
+    for col, row in path[:length]:
+        renderer.set_cell(col, row, GREEN)
+    renderer.set_cell(0, 0, RED)
+    renderer.present()
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        renderer.set_cell(*path[frame], None)  # tail leaves
+        renderer.set_cell(*path[frame + length], GREEN)  # head arrives
+        renderer.set_text("score", score_font, f"Score: {frame // 50}", WHITE, topleft=(10, 10))
+        renderer.present()
+    return (time.perf_counter() - start) / FRAMES
+
+
+if __name__ == "__main__":
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    fonts = (pygame.font.Font(None, 30), pygame.font.Font(None, 24))
+    path = board_cycle() * 2
+    print(f"video driver: {pygame.display.get_driver()}")
+    print(f"{'length':>7} {'full (ms/frame)':>16} {'dirty (ms/frame)':>17} {'speedup':>8}")
+    for length in LENGTHS:
+        t_full = bench_full(screen, fonts, path, length) * 1e3
+        t_dirty = bench_dirty(screen, fonts, path, length) * 1e3
+        print(f"{length:>7} {t_full:>16.3f} {t_dirty:>17.3f} {t_full / t_dirty:>7.1f}x")
+    pygame.quit()
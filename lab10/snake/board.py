@@ -0,0 +1,128 @@
+import os
+import random
+import sys
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pgcommon.free_cells import FreeCells
+
+# --- Cell states in the occupancy grid ---
+EMPTY = 0
+SNAKE = 1
+WALL = 2
+
+
+class SnakeBoard:
+    """Occupancy grid over the cell board plus the snake body that lives on it.
+
+    The body is a deque of cell indices (head first) and the grid keeps one
+    byte per cell, so moving the snake and every collision test are O(1)
+    no matter how long the snake gets. A FreeCells index is kept in sync
+    with the grid so food can be placed in O(1) even on a nearly full board.
+    """
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        self.grid = bytearray(cols * rows)
+        self.body = deque()
+        self.free = FreeCells(cols * rows)
+
+    # --- Coordinates ---
+    def index(self, col, row):
+        """Converts a (col, row) cell to its flat index in the grid."""
+        return row * self.cols + col
+
+    def cell(self, index):
+        """Converts a flat grid index back to a (col, row) cell."""
+        return index % self.cols, index // self.cols
+
+    def in_bounds(self, col, row):
+        return 0 <= col < self.cols and 0 <= row < self.rows
+
+    # --- Collision queries ---
+    def is_wall(self, col, row):
+        return self.in_bounds(col, row) and self.grid[row * self.cols + col] == WALL
+
+    def is_snake(self, col, row):
+        return self.in_bounds(col, row) and self.grid[row * self.cols + col] == SNAKE
+
+    def is_free(self, col, row):
+        return self.in_bounds(col, row) and self.grid[row * self.cols + col] == EMPTY
+
+    # --- Walls ---
+    def clear(self):
+        """Empties the whole board: no walls and no snake."""
+        self.grid = bytearray(self.cols * self.rows)
+        self.body.clear()
+        self.free.reset()
+
+    def load_walls(self, mask):
+        """Replaces the whole board with a precompiled wall mask (WALL or EMPTY per cell)."""
+        self.grid = bytearray(mask)
+        self.body.clear()
+        self.free.reset(self.grid)
+
+    def add_wall(self, col, row):
+        if self.in_bounds(col, row):
+            index = row * self.cols + col
+            self.grid[index] = WALL
+            self.free.remove(index)
+
+    # --- Snake body ---
+    def place_snake(self, cells):
+        """Replaces the snake with the given (col, row) cells, head first. The cells must not be walls."""
+        for index in self.body:
+            self.grid[index] = EMPTY
+            self.free.add(index)
+        self.body.clear()
+        for col, row in cells:
+            index = row * self.cols + col
+            self.body.append(index)
+            self.grid[index] = SNAKE
+            self.free.remove(index)
+
+    @property
+    def head(self):
+        return self.cell(self.body[0])
+
+    def push_head(self, col, row):
+        """Adds a new head segment. The caller checks collisions first."""
+        index = row * self.cols + col
+        self.body.appendleft(index)
+        self.grid[index] = SNAKE
+        self.free.remove(index)
+
+    def pop_tail(self):
+        """Removes the tail segment and returns its (col, row) cell."""
+        index = self.body.pop()
+        self.grid[index] = EMPTY
+        self.free.add(index)
+        return self.cell(index)
+
+    def random_free_cell(self, rng=random):
+        """Returns a random empty (col, row) cell, or None when the board is full."""
+        index = self.free.sample(rng)
+        if index is None:
+            return None
+        return self.cell(index)
+
+    def segments(self):
+        """Yields the snake's (col, row) cells from head to tail."""
+        cols = self.cols
+        for index in self.body:
+            yield index % cols, index // cols
+
+    def __len__(self):
+        return len(self.body)
+
+    # --- Snapshots ---
+    def snapshot(self):
+        """Returns a copy of the board state that restore() can bring back."""
+        return bytes(self.grid), tuple(self.body), self.free.snapshot()
+
+    def restore(self, state):
+        grid, body, free = state
+        self.grid = bytearray(grid)
+        self.body = deque(body)
+        self.free.restore(free)
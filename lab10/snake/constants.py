@@ -0,0 +1,14 @@
+# --- Board ---
+WIDTH, HEIGHT = 600, 400
+CELL_SIZE = 20
+COLS, ROWS = WIDTH // CELL_SIZE, HEIGHT // CELL_SIZE
+
+# --- Colors ---
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+YELLOW = (255, 255, 0)
+BLACK = (0, 0, 0)
+GRAY = (128, 128, 128)
+FOOD_COLORS = {1: RED, 2: BLUE, 3: YELLOW} # Food colour by weight
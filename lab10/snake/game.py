@@ -0,0 +1,158 @@
+import random
+
+from board import SnakeBoard
+
+# --- Movement ---
+DIRECTIONS = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+OPPOSITE = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
+
+SNAPSHOT_FIELDS = ("tick", "score", "level", "fps", "direction", "over", "reason")
+
+
+class SnakeGame:
+    """The snake rules, without drawing, input handling or timing.
+
+    One call to step() is one game tick. Everything random comes from a
+    single Random seeded at start, so a seed, a start level and the direction
+    used on each tick always reproduce the same game. That is what replays
+    and the score verifier rely on.
+
+    Cells whose contents changed are collected in `changed` (and
+    `level_changed` is set when the whole board was reset) so a renderer can
+    redraw just those.
+    """
+
+    def __init__(self, level_loader, level, seed, verbose=False):
+        self.levels = level_loader
+        self.max_level = level_loader.max_level
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.verbose = verbose
+        self.board = SnakeBoard(level_loader.cols, level_loader.rows)
+        self.initial_cells = level_loader.start_cells  # Kept free of walls by the loader
+        self.tick = 0
+        self.score = 0
+        self.over = False
+        self.reason = ""
+        self.changed = []
+        self.level_changed = False
+        self.load_level(min(level, self.max_level))
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    # --- Levels and food ---
+    def load_level(self, level_num):
+        """Resets snake, walls, speed and food for a level."""
+        self.level = min(level_num, self.max_level) # Ensure we don't exceed defined levels
+        self.compiled = self.levels.load(self.level) # Cached after the first load
+        self.fps = self.compiled.fps
+        self.log(f"--- Loading Level {self.level} (FPS: {self.fps}) ---")
+
+        # Walls come in as a ready-made occupancy mask; reset snake to center
+        self.board.load_walls(self.compiled.mask)
+        self.board.place_snake(self.initial_cells)
+        self.direction = "RIGHT"
+        self.food = self.generate_food()
+        self.changed = []
+        self.level_changed = True
+
+    def generate_food(self):
+        """Returns [col, row, timer, weight] on a random free cell, or None if the board is full."""
+        free_cell = self.board.random_free_cell(self.rng)
+        if free_cell is None:
+            return None
+        timer = self.rng.randint(5, 10) * self.fps # Timer based on current FPS
+        weight = self.rng.choice([1, 2, 3]) # Score value
+        return [free_cell[0], free_cell[1], timer, weight]
+
+    def _replace_food(self):
+        if self.food is not None:
+            self.changed.append((self.food[0], self.food[1]))
+        self.food = self.generate_food()
+        if self.food is not None:
+            self.changed.append((self.food[0], self.food[1]))
+
+    # --- Rules ---
+    def turn(self, direction):
+        """Changes direction unless it would reverse the snake onto itself."""
+        if direction != OPPOSITE[self.direction]:
+            self.direction = direction
+
+    def end(self, reason):
+        self.over = True
+        self.reason = reason
+
+    def step(self):
+        """Advances one tick. Returns False once the game is over."""
+        if self.over:
+            return False
+        self.tick += 1
+        board = self.board
+        col, row = board.head
+        d_col, d_row = DIRECTIONS[self.direction]
+        col += d_col
+        row += d_row
+
+        # Check Collisions (all O(1) lookups on the board grid)
+        if not board.in_bounds(col, row):
+            self.end("Hit screen boundary.")
+        elif board.is_wall(col, row):
+            self.end("Hit wall.")
+        elif board.is_snake(col, row): # Check collision with self *after* moving
+            self.end("Hit self.")
+        if self.over:
+            return False
+
+        board.push_head(col, row)
+        self.changed.append((col, row))
+
+        if (col, row) == (self.food[0], self.food[1]):
+            self.score += self.food[3]
+            self.log(f"Ate food! Score: {self.score}")
+            self.food = None # Eaten: its cell now holds the head
+            self._replace_food()
+
+            # Level up every 5 points of total score; past the last level only speed goes up
+            if self.score > 0 and self.score % 5 == 0:
+                previous_level = self.level
+                if self.level < self.max_level:
+                    self.load_level(self.level + 1)
+                elif previous_level == self.max_level:
+                    self.fps += 1
+                    self.log(f"Max level reached, increasing speed! New FPS: {self.fps}")
+        else:
+            # Didn't eat food, remove tail segment
+            self.changed.append(board.pop_tail())
+
+        if self.food is None:
+            # Snake covers every free cell, nothing left to eat
+            self.end("Board full.")
+            return False
+
+        # Update Food Timer
+        self.food[2] -= 1
+        if self.food[2] <= 0:
+            self.log("Food expired!")
+            self._replace_food() # Never None here: the expired food's cell is free
+
+        return True
+
+    # --- Snapshots (used to seek in replays) ---
+    def snapshot(self):
+        state = {name: getattr(self, name) for name in SNAPSHOT_FIELDS}
+        state["food"] = list(self.food) if self.food is not None else None
+        state["board"] = self.board.snapshot()
+        state["rng"] = self.rng.getstate()
+        return state
+
+    def restore(self, state):
+        for name in SNAPSHOT_FIELDS:
+            setattr(self, name, state[name])
+        self.food = list(state["food"]) if state["food"] is not None else None
+        self.board.restore(state["board"])
+        self.rng.setstate(state["rng"])
+        self.compiled = self.levels.load(self.level)
+        self.changed = []
+        self.level_changed = True
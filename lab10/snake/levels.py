@@ -0,0 +1,167 @@
+"""Level loading for the snake game.
+
+Levels are JSON files in the levels/ folder named level<N>.json:
+
+    {
+      "name": "Box outline",
+      "fps": 8,
+      "walls": [[2, 2, 26, 1], ...],       # (startX, startY, width, height) in cells
+      "grid": ["..####..", ...]            # optional: one string per row, '#' = wall
+    }
+
+"walls" and "grid" can be combined; big community mazes are easiest to write
+as a grid. Walls may not cover the cells the snake starts on (the middle of
+the board, see LevelLoader.start_cells). The first time a level file is
+loaded it is compiled into an occupancy mask (one byte per cell, ready to
+become the board grid) and a pre-rendered wall surface. Both are written to
+levels/__levelcache__/ under the SHA-256 of the file contents, so later
+loads skip parsing and drawing.
+"""
+import hashlib
+import json
+import os
+import re
+import struct
+
+import pygame
+
+from board import WALL
+
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels")
+CACHE_DIR = os.path.join(LEVEL_DIR, "__levelcache__")
+
+# Cached mask file: magic, format version, cols, rows, fps, then cols * rows cell bytes
+MASK_HEADER = struct.Struct("<4sBHHH")
+MASK_MAGIC = b"SLVL"
+MASK_VERSION = 2  # 2: start cells are checked when compiling
+
+
+class Level:
+    """A compiled level: speed, wall mask and the pre-rendered static layer."""
+
+    def __init__(self, number, fps, mask, surface):
+        self.number = number
+        self.fps = fps
+        self.mask = mask  # bytearray, WALL for wall cells, 0 elsewhere
+        self.surface = surface  # background + walls, display pixel format (None when headless)
+
+
+class LevelLoader:
+    """Loads level files for a cols x rows board, compiling them once."""
+
+    def __init__(self, cols, rows, cell_size, background, wall_color, level_dir=LEVEL_DIR, cache_dir=CACHE_DIR,
+                 render=True):
+        self.cols = cols
+        self.rows = rows
+        self.cell_size = cell_size
+        self.background = background
+        self.wall_color = wall_color
+        self.level_dir = level_dir
+        self.cache_dir = cache_dir
+        self.render = render  # False for headless use (replay verification): masks only
+        self.loaded = {}  # level number -> Level, for reloads within one run
+        self.start_cells = [(cols // 2 - i, rows // 2) for i in range(3)]  # Snake start, head first
+        self.numbers = sorted(
+            int(match.group(1))
+            for match in map(re.compile(r"level(\d+)\.json$").match, os.listdir(level_dir))
+            if match
+        )
+
+    @property
+    def max_level(self):
+        return self.numbers[-1]
+
+    def load(self, number):
+        """Returns the compiled Level, using the on-disk cache when it is fresh."""
+        if number in self.loaded:
+            return self.loaded[number]
+
+        with open(os.path.join(self.level_dir, f"level{number}.json"), "rb") as f:
+            raw = f.read()
+        # Render settings are part of the key so changing colours/sizes recompiles
+        settings = f"{self.cols}x{self.rows}@{self.cell_size}:{self.background}:{self.wall_color}"
+        digest = hashlib.sha256(raw + settings.encode()).hexdigest()[:32]
+        mask_path = os.path.join(self.cache_dir, digest + ".mask")
+        surface_path = os.path.join(self.cache_dir, digest + ".png")
+
+        level = self._read_cache(number, mask_path, surface_path)
+        if level is None:
+            level = self._compile(number, raw)
+            self._write_cache(level, mask_path, surface_path)
+        self.loaded[number] = level
+        return level
+
+    # --- Compilation ---
+    def _compile(self, number, raw):
+        config = json.loads(raw)
+        cols, rows = self.cols, self.rows
+        mask = bytearray(cols * rows)
+
+        for wx, wy, ww, wh in config.get("walls", []):
+            c0, c1 = max(wx, 0), min(wx + ww, cols)  # Clip walls to the board
+            if c0 >= c1:
+                continue
+            for r in range(max(wy, 0), min(wy + wh, rows)):
+                mask[r * cols + c0:r * cols + c1] = bytes([WALL]) * (c1 - c0)
+
+        grid = config.get("grid")
+        if grid is not None:
+            if len(grid) != rows or any(len(line) != cols for line in grid):
+                raise ValueError(f"level{number}.json: 'grid' must be {rows} rows of {cols} characters")
+            for r, line in enumerate(grid):
+                for c, char in enumerate(line):
+                    if char == "#":
+                        mask[r * cols + c] = WALL
+
+        # Start cells depend only on the board size, which is part of the cache key
+        for col, row in self.start_cells:
+            if mask[row * cols + col] == WALL:
+                raise ValueError(f"level{number}.json: wall on the snake's start cell ({col}, {row})")
+
+        surface = self._render(mask) if self.render else None
+        return Level(number, config["fps"], mask, surface)
+
+    def _render(self, mask):
+        """Draws background + wall cells, merging horizontal runs into one rect each."""
+        size = self.cell_size
+        surface = pygame.Surface((self.cols * size, self.rows * size)).convert()
+        surface.fill(self.background)
+        for r in range(self.rows):
+            row = mask[r * self.cols:(r + 1) * self.cols]
+            c = 0
+            while c < self.cols:
+                if row[c] == WALL:
+                    start = c
+                    while c < self.cols and row[c] == WALL:
+                        c += 1
+                    surface.fill(self.wall_color, (start * size, r * size, (c - start) * size, size))
+                else:
+                    c += 1
+        return surface
+
+    # --- Disk cache ---
+    def _read_cache(self, number, mask_path, surface_path):
+        if not os.path.exists(mask_path) or (self.render and not os.path.exists(surface_path)):
+            return None
+        try:
+            with open(mask_path, "rb") as f:
+                data = f.read()
+            magic, version, cols, rows, fps = MASK_HEADER.unpack_from(data)
+            mask = bytearray(data[MASK_HEADER.size:])
+            if (magic, version, cols, rows) != (MASK_MAGIC, MASK_VERSION, self.cols, self.rows) or len(mask) != cols * rows:
+                return None
+            surface = pygame.image.load(surface_path).convert() if self.render else None
+        except (OSError, struct.error, pygame.error):
+            return None  # Corrupt or unreadable cache entry: just recompile
+        return Level(number, fps, mask, surface)
+
+    def _write_cache(self, level, mask_path, surface_path):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(mask_path, "wb") as f:
+                f.write(MASK_HEADER.pack(MASK_MAGIC, MASK_VERSION, self.cols, self.rows, level.fps))
+                f.write(level.mask)
+            if level.surface is not None:
+                pygame.image.save(level.surface, surface_path)
+        except (OSError, pygame.error) as e:
+            print(f"Warning: could not cache level {level.number}: {e}")
@@ -0,0 +1,141 @@
+import pygame
+
+
+class SnakeRenderer:
+    """Incremental (dirty-rectangle) renderer for the snake board.
+
+    The screen is composed from three layers:
+      * a static layer with the background and walls, drawn once per level,
+      * a cell layer holding the colour of every occupied cell (snake, food),
+      * text overlays (HUD, messages) rendered only when their text changes.
+    The game only reports what changed (new head, dropped tail, moved food),
+    and present() recomposes and pushes just those rectangles to the display.
+    """
+
+    def __init__(self, screen, cell_size, background, wall_color):
+        self.screen = screen
+        self.cell_size = cell_size
+        self.background = background
+        self.wall_color = wall_color
+        self.static = pygame.Surface(screen.get_size()).convert()
+        self.cells = {}  # (col, row) -> colour
+        self.overlays = {}  # slot -> (key, surface, rect), drawn in insertion order
+        self.dirty = []
+        self.set_walls([])
+
+    # --- Layers ---
+    def set_walls(self, wall_rects):
+        """Rebuilds the cached static layer; the whole screen is repainted."""
+        self.static.fill(self.background)
+        for wall_rect in wall_rects:
+            pygame.draw.rect(self.static, self.wall_color, wall_rect)
+        self.invalidate()
+
+    def set_static(self, surface):
+        """Uses a pre-rendered static layer (e.g. a compiled level) as-is."""
+        self.static = surface
+        self.invalidate()
+
+    def clear_cells(self):
+        for col, row in self.cells:
+            self.dirty.append(self.cell_rect(col, row))
+        self.cells.clear()
+
+    def set_cell(self, col, row, color):
+        """Paints one cell, or clears it back to the static layer when color is None."""
+        if color is None:
+            self.cells.pop((col, row), None)
+        else:
+            self.cells[(col, row)] = color
+        self.dirty.append(self.cell_rect(col, row))
+
+    def set_text(self, slot, font, text, color, **position):
+        """Shows a text overlay; it is only re-rendered when text or colour change.
+
+        position is passed to Surface.get_rect, e.g. topleft=(10, 10).
+        """
+        key = (text, color, tuple(sorted(position.items())))
+        item = self.overlays.get(slot)
+        if item is not None and item[0] == key:
+            return
+        surface = font.render(text, True, color)
+        rect = surface.get_rect(**position)
+        if item is not None:
+            self.dirty.append(item[2])
+        self.overlays[slot] = (key, surface, rect)
+        self.dirty.append(rect)
+
+    def remove_text(self, slot):
+        item = self.overlays.pop(slot, None)
+        if item is not None:
+            self.dirty.append(item[2])
+
+    def sync(self, game, snake_color, food_colors):
+        """Pulls the changes of a SnakeGame tick into the cell layer.
+
+        Only the cells the game reported as changed are looked at, unless the
+        board was reset (new level, restored snapshot) which repaints it all.
+        """
+        board = game.board
+        if game.level_changed:
+            self.set_static(game.compiled.surface)
+            self.clear_cells()
+            cells = list(board.segments())
+            if game.food is not None:
+                cells.append((game.food[0], game.food[1]))
+            game.level_changed = False
+        else:
+            cells = game.changed
+        food = game.food
+        for col, row in cells:
+            if board.is_snake(col, row):
+                self.set_cell(col, row, snake_color)
+            elif food is not None and (col, row) == (food[0], food[1]):
+                self.set_cell(col, row, food_colors[food[3]])
+            else:
+                self.set_cell(col, row, None)
+        game.changed = []
+
+    def invalidate(self):
+        """Marks the whole screen for repainting (e.g. after something drew over it)."""
+        self.dirty = [self.screen.get_rect()]
+
+    # --- Drawing ---
+    def cell_rect(self, col, row):
+        size = self.cell_size
+        return pygame.Rect(col * size, row * size, size, size)
+
+    def _compose(self, rect):
+        """Redraws every layer inside rect onto the screen."""
+        screen = self.screen
+        size = self.cell_size
+        screen.set_clip(rect)
+        screen.blit(self.static, rect, rect)
+
+        col0, col1 = rect.left // size, (rect.right - 1) // size
+        row0, row1 = rect.top // size, (rect.bottom - 1) // size
+        if (col1 - col0 + 1) * (row1 - row0 + 1) > len(self.cells):
+            # Large area (e.g. full repaint): walk the occupied cells instead
+            for (col, row), color in self.cells.items():
+                if col0 <= col <= col1 and row0 <= row <= row1:
+                    screen.fill(color, (col * size, row * size, size, size))
+        else:
+            for row in range(row0, row1 + 1):
+                for col in range(col0, col1 + 1):
+                    color = self.cells.get((col, row))
+                    if color is not None:
+                        screen.fill(color, (col * size, row * size, size, size))
+
+        for _, surface, overlay_rect in self.overlays.values():
+            if overlay_rect.colliderect(rect):
+                screen.blit(surface, overlay_rect)
+        screen.set_clip(None)
+
+    def present(self):
+        """Recomposes the dirty rectangles and updates only those on the display."""
+        if not self.dirty:
+            return
+        for rect in self.dirty:
+            self._compose(rect)
+        pygame.display.update(self.dirty)
+        self.dirty = []
@@ -0,0 +1,244 @@
+"""Replay recording, verification and playback for the snake game.
+
+A replay holds the RNG seed, the start level and the direction changes,
+each stored as a varint of (ticks since the previous change << 2 | direction),
+so a whole game is usually a few hundred bytes. Because SnakeGame is fully
+deterministic, re-simulating that input reproduces the game exactly; the
+final tick, score and level in the header let a verifier confirm a claimed
+high score before it is accepted.
+
+Usage:
+    python replay.py <file.srpl>            # watch a replay
+    python replay.py --verify <file.srpl>   # re-simulate headless and check the score
+
+Viewer keys: SPACE pause, UP/DOWN playback speed, LEFT/RIGHT seek -/+ 50 ticks,
+0-9 jump to 0%-90%, HOME restart, ESC quit.
+"""
+import bisect
+import os
+import struct
+import sys
+
+from game import SnakeGame
+
+DIRECTION_CODES = ("UP", "DOWN", "LEFT", "RIGHT")
+HEADER = struct.Struct("<4sBQHIIHI")  # magic, version, seed, start level, ticks, score, final level, inputs
+MAGIC = b"SRPL"
+VERSION = 1
+SNAPSHOT_EVERY = 100  # ticks between stored states when seeking
+
+
+# --- Encoding ---
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Not a snake replay (truncated).")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Replay:
+    """A recorded game: seed, start level, inputs and the claimed final result."""
+
+    def __init__(self, seed, start_level, inputs, ticks=0, score=0, level=0):
+        self.seed = seed
+        self.start_level = start_level
+        self.inputs = inputs  # [(tick, direction)], tick = game.tick before the step that used it
+        self.ticks = ticks
+        self.score = score
+        self.level = level
+
+    def to_bytes(self):
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, self.start_level,
+                                    self.ticks, self.score, self.level, len(self.inputs)))
+        previous_tick = 0
+        for tick, direction in self.inputs:
+            _write_varint(out, (tick - previous_tick) << 2 | DIRECTION_CODES.index(direction))
+            previous_tick = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size:
+            raise ValueError("Not a snake replay (truncated).")
+        magic, version, seed, start_level, ticks, score, level, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a snake replay (bad header).")
+        inputs = []
+        pos = HEADER.size
+        tick = 0
+        for _ in range(count):
+            value, pos = _read_varint(data, pos)
+            tick += value >> 2
+            inputs.append((tick, DIRECTION_CODES[value & 3]))
+        return cls(seed, start_level, inputs, ticks, score, level)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """Collects the direction used on each tick, storing only the changes."""
+
+    def __init__(self, seed, start_level):
+        self.replay = Replay(seed, start_level, [])
+        self.last_direction = None
+
+    def step(self, game):
+        """Records the direction for this tick, then advances the game one tick."""
+        if game.direction != self.last_direction:
+            self.replay.inputs.append((game.tick, game.direction))
+        alive = game.step()
+        self.last_direction = game.direction # A level-up resets it, compare against that next tick
+        return alive
+
+    def finish(self, game):
+        """Stamps the final result onto the replay and returns it."""
+        self.replay.ticks = game.tick
+        self.replay.score = game.score
+        self.replay.level = game.level
+        return self.replay
+
+
+# --- Playback ---
+class ReplayPlayer:
+    """Re-simulates a replay, keeping a snapshot every SNAPSHOT_EVERY ticks for seeking."""
+
+    def __init__(self, replay, level_loader):
+        self.replay = replay
+        self.game = SnakeGame(level_loader, replay.start_level, replay.seed)
+        self.next_input = 0
+        self.snapshot_ticks = [0]
+        self.snapshots = [(self.game.snapshot(), 0)]
+
+    @property
+    def finished(self):
+        return self.game.over or self.game.tick >= self.replay.ticks
+
+    def step(self):
+        game = self.game
+        inputs = self.replay.inputs
+        while self.next_input < len(inputs) and inputs[self.next_input][0] <= game.tick:
+            game.direction = inputs[self.next_input][1] # Recorded as already validated
+            self.next_input += 1
+        game.step()
+        if game.tick % SNAPSHOT_EVERY == 0 and game.tick > self.snapshot_ticks[-1]:
+            self.snapshot_ticks.append(game.tick)
+            self.snapshots.append((game.snapshot(), self.next_input))
+
+    def run(self):
+        """Plays to the end as fast as possible."""
+        while not self.finished:
+            self.step()
+        return self.game
+
+    def seek(self, tick):
+        """Jumps to a tick: restore the nearest earlier snapshot, then simulate forward."""
+        tick = max(0, min(tick, self.replay.ticks))
+        i = bisect.bisect_right(self.snapshot_ticks, tick) - 1
+        if tick < self.game.tick or self.snapshot_ticks[i] > self.game.tick:
+            state, self.next_input = self.snapshots[i]
+            self.game.restore(state)
+        while self.game.tick < tick and not self.finished:
+            self.step()
+
+
+def verify_replay(replay, level_loader):
+    """Re-simulates a replay headless. Returns the final game if it matches the claimed result, else None."""
+    game = ReplayPlayer(replay, level_loader).run()
+    if (game.tick, game.score, game.level) != (replay.ticks, replay.score, replay.level):
+        return None
+    return game
+
+
+# --- Viewer ---
+def watch(path):
+    import pygame
+    from levels import LevelLoader
+    from renderer import SnakeRenderer
+    from constants import WIDTH, HEIGHT, COLS, ROWS, CELL_SIZE, BLACK, GRAY, GREEN, WHITE, FOOD_COLORS
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"Snake Replay - {os.path.basename(path)}")
+    clock = pygame.time.Clock()
+    font = pygame.font.Font(None, 24)
+
+    replay = Replay.load(path)
+    player = ReplayPlayer(replay, LevelLoader(COLS, ROWS, CELL_SIZE, BLACK, GRAY))
+    renderer = SnakeRenderer(screen, CELL_SIZE, BLACK, GRAY)
+    speed = 1.0
+    paused = False
+    pending = 0.0 # Fractional ticks carried between frames
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE: running = False
+                elif event.key == pygame.K_SPACE: paused = not paused
+                elif event.key == pygame.K_UP: speed = min(speed * 2, 64)
+                elif event.key == pygame.K_DOWN: speed = max(speed / 2, 0.25)
+                elif event.key == pygame.K_RIGHT: player.seek(player.game.tick + 50)
+                elif event.key == pygame.K_LEFT: player.seek(player.game.tick - 50)
+                elif event.key == pygame.K_HOME: player.seek(0)
+                elif pygame.K_0 <= event.key <= pygame.K_9:
+                    player.seek(replay.ticks * (event.key - pygame.K_0) // 10)
+
+        if not paused and not player.finished:
+            pending += player.game.fps * speed / 60
+            while pending >= 1 and not player.finished:
+                player.step()
+                pending -= 1
+
+        game = player.game
+        renderer.sync(game, GREEN, FOOD_COLORS)
+        status = "PAUSED" if paused else ("END" if player.finished else f"x{speed:g}")
+        renderer.set_text("hud", font, f"Tick {game.tick}/{replay.ticks} | Score: {game.score} | Level: {game.level} | {status}",
+                          WHITE, topleft=(10, 10))
+        renderer.present()
+        clock.tick(60)
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--verify":
+        from levels import LevelLoader
+        from constants import COLS, ROWS, CELL_SIZE, BLACK, GRAY
+        try:
+            replay = Replay.load(sys.argv[2])
+        except ValueError as e:
+            print(f"REJECTED: {e}")
+            sys.exit(1)
+        result = verify_replay(replay, LevelLoader(COLS, ROWS, CELL_SIZE, BLACK, GRAY, render=False))
+        if result is None:
+            print(f"REJECTED: replay does not reproduce score {replay.score} / level {replay.level}")
+            sys.exit(1)
+        print(f"OK: score {result.score}, level {result.level}, {result.tick} ticks")
+    elif len(sys.argv) == 2:
+        watch(sys.argv[1])
+    else:
+        print(__doc__)
@@ -1,10 +1,23 @@
-import pygame
-import random
-import psycopg2
 import sys
 import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pgcommon.bootstrap import Startup, ticks
+
+# Start only the pygame modules the game uses (no mixer or joysticks)
+startup = Startup("Snake", ("display", "font"))
+
+import pygame
+import random
 import configparser # Import the configparser module
+import threading # The database is reached in the background while the window opens
 import time # Import the time module (though we'll use pygame's timer)
+from constants import WIDTH, HEIGHT, CELL_SIZE, COLS, ROWS, WHITE, GREEN, YELLOW, BLACK, GRAY, FOOD_COLORS
+from game import SnakeGame
+from renderer import SnakeRenderer
+from levels import LevelLoader
+from replay import ReplayRecorder, verify_replay
+startup.mark("imports")
 
 # --- Configuration Loading ---
 
@@ -41,25 +54,15 @@ def load_db_config(filename='database.ini', section='postgresql'):
          sys.exit(1)
 
 
-# --- Constants (Removed DB_CONFIG dictionary) ---
-WIDTH, HEIGHT = 600, 400
-CELL_SIZE = 20
-BASE_FPS = 5
+# --- Constants (Removed DB_CONFIG dictionary; board size and colors live in constants.py) ---
 INITIAL_DELAY_MS = 2000 # 2 seconds in milliseconds
-
-# --- Colors ---
-WHITE = (255, 255, 255)
-GREEN = (0, 255, 0)
-RED = (255, 0, 0)
-BLUE = (0, 0, 255)
-YELLOW = (255, 255, 0)
-BLACK = (0, 0, 0)
-GRAY = (128, 128, 128)
+REPLAY_DIR = "replays" # Every finished game is saved here so disputed scores can be re-checked
 
 # --- Database Functions (Using psycopg2 and loaded config) ---
 
 def get_db_connection():
     """Establishes a connection to the PostgreSQL database using config from file."""
+    import psycopg2 # Imported on first use, so startup doesn't pay for it
     config = load_db_config() # Load config when needed
     try:
         conn = psycopg2.connect(**config) # Use unpacked dictionary from config
@@ -94,7 +97,7 @@ def init_db():
             with conn.cursor() as cursor:
                 cursor.execute(sql)
         print("Database table 'user_data' checked/created successfully.")
-    except (psycopg2.Error, Exception) as e:
+    except Exception as e: # psycopg2.Error included
         print(f"Database error during table initialization: {e}")
         # If connection fails, get_db_connection exits. If table creation fails,
         # subsequent DB calls will likely fail too, but we let it continue for now.
@@ -115,14 +118,24 @@ def get_user_data(username):
                     print(f"Welcome, new player: {username}!")
                     # Ensure new players start at level 1, regardless of DB default
                     return {"high_score": 0, "level": 1}
-    except (psycopg2.Error, Exception) as e:
+    except Exception as e: # psycopg2.Error included
         print(f"Database error fetching user data for '{username}': {e}")
         print("Starting as a new player (Level 1, Score 0) due to fetch error.")
         # Return default values if fetch fails after connection is made
         return {"high_score": 0, "level": 1}
 
-def save_user_data(username, current_score, current_level):
-    """Saves or updates the user's high score and level in PostgreSQL."""
+def save_user_data(username, current_score, current_level, replay=None):
+    """Saves or updates the user's high score and level in PostgreSQL.
+
+    If a replay is given, it is re-simulated first and the result is only
+    accepted when the replay reproduces the same score and level.
+    """
+    if replay is not None:
+        verified = verify_replay(replay, headless_level_loader)
+        if verified is None or (verified.score, verified.level) != (current_score, current_level):
+            print(f"Replay check failed for '{username}': Score={current_score}, Level={current_level} not saved.")
+            return
+        print(f"Replay verified for {username} ({replay.ticks} ticks).")
     select_sql = "SELECT high_score, level FROM user_data WHERE username = %s;"
     update_sql = "UPDATE user_data SET high_score = %s, level = %s WHERE username = %s;"
     insert_sql = "INSERT INTO user_data (username, high_score, level) VALUES (%s, %s, %s);"
@@ -146,98 +159,76 @@ def save_user_data(username, current_score, current_level):
                     safe_level = min(current_level, MAX_LEVEL)
                     cursor.execute(insert_sql, (username, current_score, safe_level))
                     print(f"New user data saved for {username}: Score={current_score}, Level={safe_level}")
-    except (psycopg2.Error, Exception) as e:
+    except Exception as e: # psycopg2.Error included
         print(f"Database error saving user data for '{username}': {e}")
 
 
 # --- Level Definitions ---
-LEVELS = {
-    1: {"fps": 5, "walls": []},
-    2: {"fps": 6, "walls": []},
-    3: {"fps": 7, "walls": [(13, 9, 4, 2)]}, # Example wall: (startX, startY, width, height) in cells
-    4: {"fps": 8, "walls": [(2, 2, 26, 1), (2, 17, 26, 1), (2, 3, 1, 14), (27, 3, 1, 14)]}, # Box outline
-    5: {"fps": 10, "walls": [(5, 5, 1, 10), (24, 5, 1, 10), (10, 2, 10, 1), (10, 17, 10, 1)]}, # Inner cross
-}
-MAX_LEVEL = max(LEVELS.keys())
+# Levels live in levels/level<N>.json and are compiled (mask + wall surface) on first load
+level_loader = LevelLoader(COLS, ROWS, CELL_SIZE, BLACK, GRAY)
+headless_level_loader = LevelLoader(COLS, ROWS, CELL_SIZE, BLACK, GRAY, render=False) # For replay checks
+MAX_LEVEL = level_loader.max_level
 
 # --- Game Setup ---
-pygame.init()
-pygame.font.init() # Explicitly initialize font module
-
 while True:
     current_username = input("Enter your username: ").strip()
     if current_username: break
     else: print("Username cannot be empty.")
+startup.mark("username") # Time spent typing is in here too
 
-init_db() # Check connection and table existence using config file
+def load_user_data():
+    """Runs in the background: checks the table, then fetches the user's level and high score."""
+    init_db() # Check connection and table existence using config file
+    user_data.update(get_user_data(current_username))
 
-user_data = get_user_data(current_username)
-# Ensure user_data is never None after get_user_data (it returns defaults on error/new)
-score = 0
-level = user_data["level"] # Already capped at MAX_LEVEL in get/save if needed
-level = min(level, MAX_LEVEL) # Still good practice to cap here too
+user_data = {} # Filled by load_user_data (stays empty if the connection failed)
+db_thread = threading.Thread(target=load_user_data, daemon=True)
+db_thread.start()
 
 # --- Game Variables ---
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption(f"Snake Game (PG/INI) - {current_username}")
 clock = pygame.time.Clock()
+renderer = SnakeRenderer(screen, CELL_SIZE, BLACK, GRAY) # Only redraws what changed each tick
+
+# First frame right away; the game can start once the database has answered
+screen.fill(BLACK)
+connecting_text = pygame.font.Font(None, 36).render("Connecting to database...", True, WHITE)
+screen.blit(connecting_text, connecting_text.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
+pygame.display.flip()
+startup.first_frame()
+while db_thread.is_alive():
+    for event in pygame.event.get(): # Keep the window responsive while waiting
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+    clock.tick(30)
+if not user_data: # get_db_connection already printed why
+    pygame.quit()
+    sys.exit(1)
+level = user_data["level"] # Already capped at MAX_LEVEL in get/save if needed
+level = min(level, MAX_LEVEL) # Still good practice to cap here too
 
-initial_snake_pos = [(WIDTH // 2, HEIGHT // 2),
-                     (WIDTH // 2 - CELL_SIZE, HEIGHT // 2),
-                     (WIDTH // 2 - 2 * CELL_SIZE, HEIGHT // 2)]
-snake = list(initial_snake_pos)
-direction = "RIGHT" # Initial direction
-
-current_walls_pixels = []
-current_wall_coords = set() # Store wall coordinates for collision checks
-FPS = BASE_FPS # Base FPS, will be updated by load_level
-
-# --- Functions load_level, generate_food ---
-def load_level(level_num):
-    global FPS, current_walls_pixels, current_wall_coords, snake, direction, food
-    level_num = min(level_num, MAX_LEVEL) # Ensure we don't exceed defined levels
-    config = LEVELS[level_num]
-    FPS = config["fps"]
-    print(f"--- Loading Level {level_num} (FPS: {FPS}) ---")
-
-    # Reset snake to center, clear walls
-    snake = list(initial_snake_pos)
-    direction = "RIGHT"
-    current_walls_pixels = []
-    current_wall_coords = set()
-
-    for wall in config["walls"]:
-        wx, wy, ww, wh = wall # Wall definition: startX, startY, width, height (in cells)
-        # Create a Rect for drawing
-        pixel_rect = pygame.Rect(wx * CELL_SIZE, wy * CELL_SIZE, ww * CELL_SIZE, wh * CELL_SIZE)
-        current_walls_pixels.append(pixel_rect)
-        # Add individual cell coordinates for collision detection
-        for r in range(wy, wy + wh):
-            for c in range(wx, wx + ww):
-                current_wall_coords.add((c * CELL_SIZE, r * CELL_SIZE))
-
-    # Regenerate food ensuring it's not inside new walls or snake
-    food = generate_food()
-
-def generate_food():
-    while True:
-        x = random.randint(0, (WIDTH // CELL_SIZE) - 1) * CELL_SIZE
-        y = random.randint(0, (HEIGHT // CELL_SIZE) - 1) * CELL_SIZE
-        # Check collision with snake body AND wall coordinates
-        if (x, y) not in snake and (x, y) not in current_wall_coords:
-            # Food properties: position x, y, timer, weight (score value)
-            timer = random.randint(5, 10) * FPS # Timer based on current FPS
-            weight = random.choice([1, 2, 3]) # Score value
-            return [x, y, timer, weight]
-
-# Load initial level setup
-load_level(level)
-# Food is generated by load_level
+# Game rules live in SnakeGame; everything random comes from this seed so the game can be replayed
+seed = random.getrandbits(63)
+game = SnakeGame(level_loader, level, seed, verbose=True)
+recorder = ReplayRecorder(seed, game.level)
+
+def finish_replay():
+    """Stamps the final result on the replay and keeps a copy on disk."""
+    replay = recorder.finish(game)
+    path = os.path.join(REPLAY_DIR, f"{current_username}_{time.strftime('%Y%m%d-%H%M%S')}.srpl")
+    try:
+        replay.save(path)
+        print(f"Replay saved to {path} ({len(replay.to_bytes())} bytes).")
+    except OSError as e:
+        print(f"Could not save replay: {e}")
+    return replay
 
 running = True
 paused = False
 initial_delay_active = True # <<< ADDED: Flag for initial delay
-start_time = pygame.time.get_ticks() # <<< ADDED: Record start time
+start_time = ticks() # <<< ADDED: Record start time
 
 # --- Font Setup (Define fonts once) ---
 try:
@@ -249,6 +240,13 @@ except pygame.error as e:
     pygame.quit()
     sys.exit(1)
 
+# Static help text overlay (rendered once); the "Get Ready" message shows until the delay ends
+renderer.set_text("help", help_font, "SPACE: Pause | S: Save & Quit", WHITE, bottomright=(WIDTH - 10, HEIGHT - 10))
+renderer.set_text("message", message_font, "Get Ready!", YELLOW, center=(WIDTH // 2, HEIGHT // 2))
+
+def hud_text():
+    return f"User: {current_username} | Score: {game.score} | Level: {game.level} | Speed: {game.fps}fps"
+
 
 # --- Main Game Loop ---
 while running:
@@ -263,51 +261,32 @@ while running:
                     print("Game Paused." if paused else "Game Resumed.")
             elif event.key == pygame.K_s:
                  print("Saving game state to PostgreSQL (using config from database.ini)...")
-                 save_user_data(current_username, score, level)
+                 save_user_data(current_username, game.score, game.level, recorder.finish(game))
                  print("Game saved. Exiting.")
                  running = False
             # Direction changes are allowed even during pause/delay,
             # but only acted upon when game is active
             elif not paused: # Direction change only if not paused
-                # Check initial_delay_active here if you DON'T want directions queued during delay
-                # if not initial_delay_active:
-                if event.key == pygame.K_UP and direction != "DOWN": direction = "UP"
-                elif event.key == pygame.K_DOWN and direction != "UP": direction = "DOWN"
-                elif event.key == pygame.K_LEFT and direction != "RIGHT": direction = "LEFT"
-                elif event.key == pygame.K_RIGHT and direction != "LEFT": direction = "RIGHT"
+                if event.key == pygame.K_UP: game.turn("UP")
+                elif event.key == pygame.K_DOWN: game.turn("DOWN")
+                elif event.key == pygame.K_LEFT: game.turn("LEFT")
+                elif event.key == pygame.K_RIGHT: game.turn("RIGHT")
 
     if not running: break # Exit loop immediately if quit/save event processed
 
     # --- Initial Delay Logic ---
     if initial_delay_active:
-        current_time = pygame.time.get_ticks()
+        current_time = ticks()
         if current_time - start_time >= INITIAL_DELAY_MS:
             initial_delay_active = False # Delay over
+            renderer.remove_text("message")
             print("Get Ready... Go!")
         else:
             # --- Draw Game State During Delay ---
-            screen.fill(BLACK)
-            # Draw snake in starting position
-            for segment in snake: pygame.draw.rect(screen, GREEN, (segment[0], segment[1], CELL_SIZE, CELL_SIZE))
-            # Draw initial food
-            food_color = {1: RED, 2: BLUE, 3: YELLOW}.get(food[3], RED)
-            pygame.draw.rect(screen, food_color, (food[0], food[1], CELL_SIZE, CELL_SIZE))
-            # Draw walls
-            for wall_rect in current_walls_pixels: pygame.draw.rect(screen, GRAY, wall_rect)
-            # Draw Score/Level Info
-            score_text = score_font.render(f"User: {current_username} | Score: {score} | Level: {level} | Speed: {FPS}fps", True, WHITE)
-            screen.blit(score_text, (10, 10))
-            # Draw Help Text
-            help_text = help_font.render("SPACE: Pause | S: Save & Quit", True, WHITE)
-            help_rect = help_text.get_rect(bottomright=(WIDTH - 10, HEIGHT - 10))
-            screen.blit(help_text, help_rect)
-            # Draw "Get Ready" message
-            ready_text = message_font.render("Get Ready!", True, YELLOW)
-            ready_rect = ready_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-            screen.blit(ready_text, ready_rect)
-
-            pygame.display.update()
-            clock.tick(FPS) # Keep ticking at game FPS for smooth display
+            renderer.sync(game, GREEN, FOOD_COLORS)
+            renderer.set_text("score", score_font, hud_text(), WHITE, topleft=(10, 10))
+            renderer.present()
+            clock.tick(game.fps) # Keep ticking at game FPS for smooth display
             continue # Skip the rest of the loop (movement, game logic)
 
     # --- Pause Logic ---
@@ -322,111 +301,35 @@ while running:
         screen.blit(pause_text, pause_rect)
 
         pygame.display.update()
+        renderer.invalidate() # Overlay drew over everything; repaint fully once resumed
         clock.tick(10) # Tick slower during pause
         continue # Skip movement and game logic
 
     # --- Game Logic (Movement, Collision, Food, Level Up) ---
     # This section only runs if not paused AND initial delay is over
-
-    # Move Snake
-    head_x, head_y = snake[0]
-    if direction == "UP": head_y -= CELL_SIZE
-    elif direction == "DOWN": head_y += CELL_SIZE
-    elif direction == "LEFT": head_x -= CELL_SIZE
-    elif direction == "RIGHT": head_x += CELL_SIZE
-    new_head = (head_x, head_y)
-
-    # Check Collisions
-    game_over = False
-    reason = ""
-    if head_x < 0 or head_x >= WIDTH or head_y < 0 or head_y >= HEIGHT:
-        game_over = True
-        reason = "Hit screen boundary."
-    elif new_head in current_wall_coords:
-        game_over = True
-        reason = "Hit wall."
-    elif new_head in snake: # Check collision with self *after* moving
-        game_over = True
-        reason = "Hit self."
-
-    if game_over:
+    if not recorder.step(game): # Steps the game and records this tick's direction in the replay
         print("Game Over!")
-        print(f"Reason: {reason}")
+        print(f"Reason: {game.reason}")
         running = False # Set running to False to exit loop
-        # No 'break' here, let the drawing happen one last time if needed, then loop condition checks running=False
-    else:
-        # Insert new head
-        snake.insert(0, new_head)
-
-        # Check Food Collision
-        if new_head == (food[0], food[1]):
-            score += food[3]
-            print(f"Ate food! Score: {score}")
-            food = generate_food() # Generate new food
-
-            # Check Level Up / Speed Increase
-            # Level up every 5 points *earned on this level* might be better,
-            # but original logic is based on total score % 5 == 0. Let's keep that.
-            if score > 0 and score % 5 == 0:
-                 previous_level = level
-                 if level < MAX_LEVEL:
-                     level += 1
-                     load_level(level) # This resets snake, generates food, sets FPS
-                     # Start the initial delay again for the new level? (Optional - not doing this now)
-                     # initial_delay_active = True
-                     # start_time = pygame.time.get_ticks()
-                 elif previous_level == MAX_LEVEL: # Only increase speed if already at max level
-                     FPS += 1
-                     print(f"Max level reached, increasing speed! New FPS: {FPS}")
-                 # No 'else' needed, food is generated by load_level or eating
-
-        else:
-            # Didn't eat food, remove tail segment
-            snake.pop()
-
-        # Update Food Timer
-        food[2] -= 1
-        if food[2] <= 0:
-            print("Food expired!")
-            food = generate_food()
 
     # --- Drawing (Main Game) ---
-    # This section runs if the game is active (not paused, not in initial delay)
-    # OR if it's the very last frame after game_over is set true
-    screen.fill(BLACK)
-
-    # Draw Walls
-    for wall_rect in current_walls_pixels: pygame.draw.rect(screen, GRAY, wall_rect)
-
-    # Draw Snake
-    for segment in snake: pygame.draw.rect(screen, GREEN, (segment[0], segment[1], CELL_SIZE, CELL_SIZE))
-
-    # Draw Food
-    food_color = {1: RED, 2: BLUE, 3: YELLOW}.get(food[3], RED)
-    pygame.draw.rect(screen, food_color, (food[0], food[1], CELL_SIZE, CELL_SIZE))
-
-    # Draw Score/Level Info
-    score_text = score_font.render(f"User: {current_username} | Score: {score} | Level: {level} | Speed: {FPS}fps", True, WHITE)
-    screen.blit(score_text, (10, 10))
-
-    # Draw Help Text
-    help_text = help_font.render("SPACE: Pause | S: Save & Quit", True, WHITE)
-    help_rect = help_text.get_rect(bottomright=(WIDTH - 10, HEIGHT - 10))
-    screen.blit(help_text, help_rect)
+    # Only the cells the tick changed are redrawn; the score text re-renders only when it changes
+    renderer.sync(game, GREEN, FOOD_COLORS)
+    renderer.set_text("score", score_font, hud_text(), WHITE, topleft=(10, 10))
 
-    # Update Display
-    pygame.display.update()
+    # Update Display (dirty rectangles only)
+    renderer.present()
 
     # Tick Clock
-    clock.tick(FPS)
+    clock.tick(game.fps)
 
 # --- Game Over or Quit ---
 print("-" * 20)
 # Ensure final state is saved only if the game didn't exit due to a fatal error before loop
 if 'current_username' in locals() and current_username: # Check if username was set
-    print(f"Final Score for {current_username}: {score}, Final Level: {level}")
-    # Save final state using config from INI
-    save_user_data(current_username, score, level)
+    print(f"Final Score for {current_username}: {game.score}, Final Level: {game.level}")
+    # Keep the replay and save final state (after verifying it) using config from INI
+    save_user_data(current_username, game.score, game.level, finish_replay())
 else:
     print("Game ended before username was fully initialized or due to an early error.")
 
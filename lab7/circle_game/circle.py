@@ -1,11 +1,18 @@
-import pygame
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pgcommon.bootstrap import Startup
 
-pygame.init()
+startup = Startup("Moving Ball", ("display",))  # Only the window
+
+import pygame
 
 screen_width = 600
 screen_height = 600
 screen = pygame.display.set_mode((screen_width, screen_height))
 pygame.display.set_caption("Moving Ball")
+startup.mark("window")
 
 ball_color = (255, 0, 0)  
 ball_x = screen_width // 2  #init pos x
@@ -34,5 +41,6 @@ while running:
     pygame.draw.circle(screen, ball_color, (ball_x, ball_y), ball_radius)
 
     pygame.display.flip()
+    startup.first_frame()
 
 pygame.quit()
@@ -1,10 +1,17 @@
-import pygame
 import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pgcommon.bootstrap import Startup
 
-pygame.init()
+startup = Startup("Clock", ("display",))  # Only the window; no fonts, sound or joysticks
+
+import pygame
 
 screen = pygame.display.set_mode((800, 800))
 pygame.display.set_caption('Clock')
+startup.mark("window")
 clock = pygame.time.Clock()
 FPS = 50
 done = False
@@ -17,6 +24,7 @@ minute_arrow = pygame.image.load('img/rightarm.png') # 30:257
 minute_arrow = pygame.transform.scale(minute_arrow, (800, 700))
 second_arrow = pygame.image.load('img/leftarm.png')
 second_arrow = pygame.transform.scale(second_arrow, (40, 500))
+startup.mark("images")
 
 
 while not done:
@@ -43,6 +51,7 @@ while not done:
         screen.blit(minute, ((399 - int(minute.get_width() / 2), 400 - int(minute.get_height() / 2))))
         pygame.draw.circle(screen, (0, 0, 0), (400, 400), 22)
         pygame.display.flip()
+        startup.first_frame()
         clock.tick(FPS)
         # time.sleep(1)
 pygame.quit()
\ No newline at end of file
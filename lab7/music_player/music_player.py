@@ -1,12 +1,20 @@
-from time import sleep
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pgcommon.bootstrap import Startup
+
+startup = Startup("Music Player", ("display", "font"))  # The AudioManager starts the mixer
 
 import pygame
-import os
+from pgcommon.audio import AudioManager
 
-pygame.init()
+audio = AudioManager()
+startup.mark("audio")
 
 screen = pygame.display.set_mode((500, 500))
 pygame.display.set_caption("Music Player")
+startup.mark("window")
 
 music_directory = "music"
 chill_guy = pygame.image.load("Chill_Guy.webp")
@@ -17,9 +25,8 @@ print(music_files)
 current_track = 0
 paused = False
 
-pygame.mixer.music.load(music_files[current_track])
-
-pygame.mixer.music.play()
+audio.play_music(music_files[current_track], loops=0)  # Streamed from disk, starts at once
+startup.mark("music")
 font = pygame.font.Font(None, 24)
 large_font = pygame.font.Font(None, 40)
 
@@ -33,23 +40,17 @@ while running:
             running = False
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE:
-                if paused:
-                    pygame.mixer.music.unpause()
-                    paused = False
-                else:
-                    pygame.mixer.music.pause()
-                    paused = True
+                paused = audio.toggle_music()
             elif event.key == pygame.K_RIGHT:
                 current_track = (current_track + 1) % len(music_files)
-                pygame.mixer.music.load(music_files[current_track])
-                sleep(1)
-                pygame.mixer.music.play()
+                audio.play_music(music_files[current_track], loops=0, fade_ms=300)  # Fades out, then in; no sleep()
+                paused = False
             elif event.key == pygame.K_LEFT:
                 current_track = (current_track - 1) % len(music_files)
-                pygame.mixer.music.load(music_files[current_track])
-                sleep(1)
-                pygame.mixer.music.play()
+                audio.play_music(music_files[current_track], loops=0, fade_ms=300)
+                paused = False
 
+    audio.update()  # Starts the next track once the old one has faded out
     screen.fill((255, 255, 255))
 
     # Instructions in column
@@ -74,5 +75,6 @@ while running:
     screen.blit(chill_guy, (150, 100))
 
     pygame.display.flip()
+    startup.first_frame()
 
 pygame.quit()
\ No newline at end of file
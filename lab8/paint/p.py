@@ -1,6 +1,15 @@
-import pygame
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pgcommon.bootstrap import Startup
 
-pygame.init()
+# Initialize only the pygame modules paint uses (no mixer or joysticks)
+startup = Startup("Paint", ("display", "font"))
+
+import pygame
+from pgcommon.profiler import FrameProfiler
+startup.mark("imports")
 
 # Screen settings
 fps = 60
@@ -13,6 +22,7 @@ color_selected = False  # Track if a color has been selected
 
 screen = pygame.display.set_mode([WIDTH, HEIGHT])
 pygame.display.set_caption("Paint")
+startup.mark("window")
 painting = []
 
 # Initialize font for the message
@@ -77,8 +87,10 @@ def draw_painting(paints):
 
 # Main loop
 run = True
+profiler = FrameProfiler(("canvas", "menu", "preview", "events", "flip"))  # F3 overlay, F4 trace
 while run:
     timer.tick(fps)
+    profiler.start_frame()
     screen.fill("white")
 
     # Display message if no color is selected and canvas is empty
@@ -89,15 +101,18 @@ while run:
 
     mouse = pygame.mouse.get_pos()
     left_click = pygame.mouse.get_pressed()[0]
+    profiler.lap("canvas")
 
     # Unpack the draw_menu return values
     brushes, colors, rgbs, clear_button = draw_menu(active_color)
+    profiler.lap("menu")
 
     # Draw while clicking (only below menu bar)
     if left_click and mouse[1] > 85:
         painting.append((active_color, mouse, active_figure))
 
     draw_painting(painting)
+    profiler.lap("canvas")  # Replaying every stored shape
 
     # Cursor preview
     if mouse[1] > 85:
@@ -108,11 +123,16 @@ while run:
         elif active_figure == 1:  # Rectangle
             pygame.draw.rect(screen, active_color, [mouse[0] - 15, mouse[1] - 15, 37, 20], 2)
 
+    profiler.lap("preview")
+
     # Event handling
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             run = False
 
+        if profiler.handle_event(event):  # F3 / F4
+            continue
+
         if event.type == pygame.MOUSEBUTTONDOWN:
             # Check if clear button is clicked
             if clear_button.collidepoint(event.pos):
@@ -130,6 +150,14 @@ while run:
                 if brush[0].collidepoint(event.pos):
                     active_figure = brush[1]  # Switch between circle and rectangle
 
+    profiler.lap("events")
+    profiler.draw(screen, {"shapes": len(painting)})
+
     pygame.display.flip()
+    startup.first_frame()
+    profiler.lap("flip")
+    profiler.end_frame()
 
+if profiler.trace is not None:
+    profiler.dump_trace()  # Still recording at exit
 pygame.quit()
\ No newline at end of file
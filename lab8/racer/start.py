@@ -1,9 +1,14 @@
-import pygame, sys
-from pygame.locals import *
+import sys, os
 import random, time
 
-# Initializing
-pygame.init()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pgcommon.bootstrap import Startup
+
+# Initializing only the pygame modules the game uses (the crash sound needs the mixer)
+startup = Startup("Racer", ("display", "font", "mixer"))
+
+import pygame
+from pygame.locals import *
 
 # Setting up FPS
 FPS = 60
@@ -27,6 +32,7 @@ COINS_COLLECTED = 0  # Coin counter
 font = pygame.font.SysFont("Verdana", 60)
 font_small = pygame.font.SysFont("Verdana", 20)
 game_over = font.render("Game Over", True, BLACK)
+startup.mark("fonts")
 
 background = pygame.image.load("images/AnimatedStreet.png")
 
@@ -34,6 +40,7 @@ background = pygame.image.load("images/AnimatedStreet.png")
 DISPLAYSURF = pygame.display.set_mode((400, 600))
 DISPLAYSURF.fill(WHITE)
 pygame.display.set_caption("Game")
+startup.mark("window")
 
 
 # Enemy class
@@ -156,4 +163,5 @@ while True:
 
         # Update screen
     pygame.display.update()
+    startup.first_frame()
     FramePerSec.tick(FPS)
\ No newline at end of file
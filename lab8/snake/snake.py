@@ -1,11 +1,19 @@
-import pygame
+import os
 import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pgcommon.bootstrap import Startup
 
-pygame.init()
+startup = Startup("Snake", ("display", "font"))  # No mixer or joysticks
+
+import pygame
+from pgcommon.free_cells import FreeCells
 
 WIDTH, HEIGHT = 600, 400
 CELL_SIZE = 20
 FPS = 5
+COLS, ROWS = WIDTH // CELL_SIZE, HEIGHT // CELL_SIZE
 
 WHITE = (255, 255, 255)
 GREEN = (0, 255, 0)
@@ -15,16 +23,44 @@ BLACK = (0, 0, 0)
 
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Snake Game")
+startup.mark("window")
 
 snake = [(100, 100), (90, 100), (80, 100)]
 direction = "RIGHT"
 
+# Free grid cells, kept in sync with the snake so food placement is O(1)
+free_cells = FreeCells(COLS * ROWS)
+
+
+def cell_index(pos):
+    """Grid index of a pixel position, or None if it is off the grid."""
+    x, y = pos
+    if x % CELL_SIZE or y % CELL_SIZE or not (0 <= x < WIDTH and 0 <= y < HEIGHT):
+        return None
+    return (y // CELL_SIZE) * COLS + x // CELL_SIZE
+
+
+def occupy(pos):
+    index = cell_index(pos)
+    if index is not None:
+        free_cells.remove(index)
+
+
+def vacate(pos):
+    index = cell_index(pos)
+    if index is not None:
+        free_cells.add(index)
+
+
+for segment in snake:
+    occupy(segment)
+
+
 def generate_food():
-    while True:
-        x = random.randint(0, (WIDTH // CELL_SIZE) - 1) * CELL_SIZE
-        y = random.randint(0, (HEIGHT // CELL_SIZE) - 1) * CELL_SIZE
-        if (x, y) not in snake:
-            return x, y
+    index = free_cells.sample()
+    if index is None:
+        return None  # Board is full
+    return (index % COLS) * CELL_SIZE, (index // COLS) * CELL_SIZE
 
 food = generate_food()
 
@@ -69,27 +105,33 @@ while running:
         running = False
 
     snake.insert(0, (head_x, head_y))
+    occupy((head_x, head_y))
 
     if (head_x, head_y) == food:
         score += 1
         food = generate_food()
+        if food is None:
+            print("Game Over! The board is full.")
+            running = False
         if score % 3 == 0:
             level += 1
             FPS += 2
     else:
-        snake.pop()
+        vacate(snake.pop())
 
     for segment in snake:
         pygame.draw.rect(screen, GREEN,
                          (segment[0], segment[1], CELL_SIZE, CELL_SIZE))
 
-    pygame.draw.rect(screen, RED, (food[0], food[1], CELL_SIZE, CELL_SIZE))
+    if food is not None:
+        pygame.draw.rect(screen, RED, (food[0], food[1], CELL_SIZE, CELL_SIZE))
 
     font = pygame.font.Font(None, 30)
     score_text = font.render(f"Score: {score}  Level: {level}", True, WHITE)
     screen.blit(score_text, (10, 10))
 
     pygame.display.update()
+    startup.first_frame()
     clock.tick(FPS)
 
 pygame.quit()
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""Benchmark: per-pixel Python flood fill vs the scanline fill in raster.py.
+
+Fills an empty 800x600 canvas and one cluttered with circle outlines, once
+with a plain breadth-first fill over get_at/set_at and once with
+raster.flood_fill, and checks both paint the same pixels.
+
+Run with:  python bench_fill.py
+"""
+import os
+import random
+import time
+from collections import deque
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # No window needed
+
+import pygame
+
+pygame.display.init()
+pygame.display.set_mode((1, 1))
+
+import raster
+
+WIDTH, HEIGHT = 800, 600
+FILL = (255, 0, 0)
+
+
+def naive_fill(surface, pos, color):
+    """What a fill looks like without surfarray: one Python step per pixel."""
+    target = surface.get_at(pos)
+    queue = deque([pos])
+    seen = {pos}
+    while queue:
+        x, y = queue.popleft()
+        surface.set_at((x, y), color)
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < WIDTH and 0 <= ny < HEIGHT and (nx, ny) not in seen and surface.get_at((nx, ny)) == target:
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+
+
+def make_canvas(circles):
+    surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+    surface.fill("white")
+    rng = random.Random(1)
+    for _ in range(circles):
+        pygame.draw.circle(surface, "black", (rng.randrange(WIDTH), rng.randrange(HEIGHT)), rng.randint(4, 20), 2)
+    return surface
+
+
+def timed(fill, surface, pos):
+    start = time.perf_counter()
+    fill(surface, pos, FILL)
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    print(f"{'canvas':>14} {'per-pixel ms':>13} {'surfarray ms':>13}  same pixels")
+    for circles in (0, 300, 600):
+        base = make_canvas(circles)
+        # Start from the point with the biggest region among a coarse grid of white points
+        starts = [(x, y) for x in range(5, WIDTH, 50) for y in range(5, HEIGHT, 50)
+                  if base.get_at((x, y)) == pygame.Color("white")]
+        pos = max(starts, key=lambda start: raster.flood_region(base, start)[0].sum())
+        slow, fast = base.copy(), base.copy()
+        slow_ms = timed(naive_fill, slow, pos)
+        fast_ms = min(timed(raster.flood_fill, base.copy(), pos) for _ in range(5))
+        raster.flood_fill(fast, pos, FILL)
+        same = pygame.image.tobytes(slow, "RGB") == pygame.image.tobytes(fast, "RGB")
+        print(f"{f'{circles} circles':>14} {slow_ms:13.1f} {fast_ms:13.2f}  {same}")
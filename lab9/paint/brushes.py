@@ -0,0 +1,117 @@
+"""Brush registry: every brush shape is rendered once into a stencil and then blitted.
+
+A brush is a function draw(surface, color, center, size) that draws one
+shape around center. stencil() renders it onto a transparent surface,
+crops it to what was drawn and keeps the result in an LRU cache keyed on
+(figure, color, size), so stamping is a single blit. Custom brushes are
+added with register_brush(), e.g.
+
+    def star(surface, color, pos, size): ...
+    register_brush(10, "star", star)
+"""
+import math
+from functools import lru_cache
+
+import pygame
+
+BRUSH_SIZE = 40  # Default brush size in pixels; shapes scale with it
+STENCIL_CACHE = 256  # Stencils kept (one per figure/color/size in use)
+
+BRUSHES = {}  # figure -> (name, draw function, fixed color or None)
+
+
+def register_brush(figure, name, draw, color=None):
+    """Adds a brush under the figure number (replacing any brush there).
+
+    color fixes the brush to one color whatever color is active (the eraser
+    always paints white).
+    """
+    BRUSHES[figure] = (name, draw, color)
+    stencil.cache_clear()
+
+
+@lru_cache(maxsize=STENCIL_CACHE)
+def stencil(figure, color, size=BRUSH_SIZE):
+    """Returns (surface, offset): the brush drawn once, and where its top-left sits relative to the stamp position.
+
+    The stencil uses an RLE-accelerated colorkey rather than per-pixel alpha,
+    which makes blitting these mostly-empty outlines several times cheaper.
+    """
+    _, draw, fixed_color = BRUSHES[figure]
+    color = fixed_color or color
+    key = tuple(255 - c for c in color[:3])  # Never equal to the brush color
+    center = (2 * size, 2 * size)
+    scratch = pygame.Surface((4 * size, 4 * size))
+    if pygame.display.get_surface() is not None:
+        scratch = scratch.convert()  # Same pixel format as the canvas, so blits need no conversion
+    scratch.fill(key)
+    scratch.set_colorkey(key)
+    draw(scratch, color, center, size)
+    bounds = scratch.get_bounding_rect()
+    image = scratch.subsurface(bounds).copy()
+    image.set_colorkey(key, pygame.RLEACCEL)
+    return image, (bounds.x - center[0], bounds.y - center[1])
+
+
+def stamp(surface, figure, color, pos, size=BRUSH_SIZE):
+    """Draws one brush shape at pos with a single blit."""
+    image, (dx, dy) = stencil(figure, tuple(color), size)
+    surface.blit(image, (pos[0] + dx, pos[1] + dy))
+
+
+def stamp_rect(figure, pos, size=BRUSH_SIZE):
+    """Area a stamp of this brush at pos covers."""
+    image, (dx, dy) = stencil(figure, (0, 0, 0), size)
+    return image.get_rect(topleft=(pos[0] + dx, pos[1] + dy))
+
+
+# --- Built-in brushes (shapes are for size 40 and scale from there) ---
+def _eraser(surface, color, pos, size):
+    half = size // 2
+    pygame.draw.rect(surface, color, [pos[0] - half, pos[1] - half, size, size])
+
+
+def _circle(surface, color, pos, size):
+    pygame.draw.circle(surface, color, pos, size // 2, 2)
+
+
+def _rectangle(surface, color, pos, size):
+    scale = size / BRUSH_SIZE
+    pygame.draw.rect(surface, color, [pos[0] - 15 * scale, pos[1] - 15 * scale, 37 * scale, 20 * scale], 2)
+
+
+def _square(surface, color, pos, size):
+    scale = size / BRUSH_SIZE
+    pygame.draw.rect(surface, color, [pos[0] - 15 * scale, pos[1] - 15 * scale, 30 * scale, 30 * scale], 2)
+
+
+def _right_triangle(surface, color, pos, size):
+    pygame.draw.polygon(surface, color, [(pos[0], pos[1]), (pos[0] + size, pos[1]), (pos[0], pos[1] - size)], 2)
+
+
+def _equilateral_triangle(surface, color, pos, size):
+    height = size * math.sqrt(3) / 2
+    pygame.draw.polygon(surface, color, [
+        (pos[0], pos[1] - 2 * height / 3),  # Top vertex
+        (pos[0] - size / 2, pos[1] + height / 3),  # Bottom left
+        (pos[0] + size / 2, pos[1] + height / 3)  # Bottom right
+    ], 2)
+
+
+def _rhombus(surface, color, pos, size):
+    half = size // 2
+    pygame.draw.polygon(surface, color, [
+        (pos[0], pos[1] - half),  # Top
+        (pos[0] + half, pos[1]),  # Right
+        (pos[0], pos[1] + half),  # Bottom
+        (pos[0] - half, pos[1])  # Left
+    ], 2)
+
+
+register_brush(-1, "eraser", _eraser, color=(255, 255, 255))
+register_brush(0, "circle", _circle)
+register_brush(1, "rectangle", _rectangle)
+register_brush(2, "square", _square)
+register_brush(3, "right triangle", _right_triangle)
+register_brush(4, "equilateral triangle", _equilateral_triangle)
+register_brush(5, "rhombus", _rhombus)
@@ -0,0 +1,131 @@
+from collections import deque
+
+import pygame
+
+TILE_SIZE = 64  # Undo snapshots are taken per TILE_SIZE x TILE_SIZE tile
+MAX_HISTORY_BYTES = 48 * 1024 * 1024  # Pixel memory the undo/redo history may hold
+MAX_HISTORY_STEPS = 200
+
+
+class TiledCanvas:
+    """The paint canvas, split into tiles so undo/redo only copies what changed.
+
+    An operation (one stroke, a clear, a fill...) runs between begin() and
+    end(). Before it draws over an area it calls touch(rect); the first time a
+    tile is touched within the operation, a copy of that tile is saved
+    (copy-on-write). Undo swaps the saved tiles with the current ones, and
+    redo swaps them back, so both cost O(tiles touched). When the history
+    holds more than MAX_HISTORY_BYTES of tiles or MAX_HISTORY_STEPS steps,
+    the oldest steps are dropped.
+    """
+
+    def __init__(self, width, height, background="white", tile_size=TILE_SIZE,
+                 max_bytes=MAX_HISTORY_BYTES, max_steps=MAX_HISTORY_STEPS):
+        self.surface = pygame.Surface([width, height]).convert()
+        self.background = background
+        self.surface.fill(background)
+        self.tile_size = tile_size
+        self.cols = (width + tile_size - 1) // tile_size
+        self.rows = (height + tile_size - 1) // tile_size
+        self.max_bytes = max_bytes
+        self.max_steps = max_steps
+        self.undo_stack = deque()  # Entries: (tiles {(col, row): Surface}, data)
+        self.redo_stack = []
+        self.history_bytes = 0
+        self._tiles = None  # Tiles saved by the operation in progress
+
+    # --- Tiles ---
+    def tile_rect(self, col, row):
+        size = self.tile_size
+        return pygame.Rect(col * size, row * size, size, size).clip(self.surface.get_rect())
+
+    def tiles_in(self, rect):
+        """Yields the (col, row) tiles that rect overlaps."""
+        rect = pygame.Rect(rect).clip(self.surface.get_rect())
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        size = self.tile_size
+        for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for col in range(rect.left // size, (rect.right - 1) // size + 1):
+                yield col, row
+
+    @staticmethod
+    def _size_of(tile):
+        return tile.get_width() * tile.get_height() * tile.get_bytesize()
+
+    # --- Operations ---
+    def begin(self):
+        """Starts an undoable operation."""
+        self._tiles = {}
+
+    def touch(self, rect, source=None):
+        """Saves the tiles under rect before they are drawn over.
+
+        source is the surface holding the "before" pixels; it defaults to the
+        canvas itself, but callers that already changed the canvas can pass a
+        copy they made beforehand.
+        """
+        if self._tiles is None:
+            return
+        source = source or self.surface
+        for tile in self.tiles_in(rect):
+            if tile not in self._tiles:
+                self._tiles[tile] = source.subsurface(self.tile_rect(*tile)).copy()
+
+    def end(self, data=None):
+        """Finishes the operation. data is handed back by undo()/redo() for this step."""
+        tiles, self._tiles = self._tiles, None
+        if not tiles:
+            return
+        self.undo_stack.append((tiles, data))
+        self.history_bytes += sum(self._size_of(tile) for tile in tiles.values())
+        for entry in self.redo_stack:
+            self.history_bytes -= sum(self._size_of(tile) for tile in entry[0].values())
+        self.redo_stack.clear()
+        self._evict()
+
+    def _evict(self):
+        """Drops the oldest undo steps until the history fits its limits."""
+        while self.undo_stack and (self.history_bytes > self.max_bytes
+                                   or len(self.undo_stack) > self.max_steps):
+            tiles, _ = self.undo_stack.popleft()
+            self.history_bytes -= sum(self._size_of(tile) for tile in tiles.values())
+
+    def clear(self, data=None):
+        """Fills the whole canvas with the background as one undoable step."""
+        self.begin()
+        self.touch(self.surface.get_rect())
+        self.surface.fill(self.background)
+        self.end(data)
+
+    def reset_history(self):
+        """Forgets all undo/redo steps (e.g. after opening a document)."""
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.history_bytes = 0
+
+    # --- Undo / Redo ---
+    def _swap(self, tiles):
+        """Puts the saved tiles on the canvas and keeps the replaced ones in their place."""
+        for tile, saved in tiles.items():
+            rect = self.tile_rect(*tile)
+            tiles[tile] = self.surface.subsurface(rect).copy()
+            self.surface.blit(saved, rect)
+
+    def undo(self):
+        """Reverts the last step. Returns (True, data) or (False, None) if there is nothing to undo."""
+        if not self.undo_stack:
+            return False, None
+        entry = self.undo_stack.pop()
+        self._swap(entry[0])
+        self.redo_stack.append(entry)
+        return True, entry[1]
+
+    def redo(self):
+        """Re-applies the last undone step. Returns (True, data) or (False, None)."""
+        if not self.redo_stack:
+            return False, None
+        entry = self.redo_stack.pop()
+        self._swap(entry[0])
+        self.undo_stack.append(entry)
+        return True, entry[1]
@@ -0,0 +1,158 @@
+"""Saving and opening paint documents (.pnt files).
+
+Layout (little-endian):
+
+    header     magic "PNTD", version, width, height, palette size, stroke count,
+               raster offset, stroke section offset and length
+    palette    3 bytes (RGB) per color used by the strokes
+    raster     the flattened canvas, width * height * 3 bytes of RGB, starting
+               on a 4 KB boundary so it can be used straight from a memory map
+    strokes    per stroke: figure, palette index, spacing and point count, then
+               the points as zig-zag varint deltas from the previous point
+
+Opening a document maps the file and blits the raster at once; the stroke
+records are only parsed when something asks for them (saving again, or a
+clear that has to remember them for undo).
+"""
+import mmap
+import os
+import struct
+
+import pygame
+
+from stroke import Stroke
+
+MAGIC = b"PNTD"
+VERSION = 1
+HEADER = struct.Struct("<4sBHHHIQQQ")
+RASTER_ALIGN = 4096
+
+
+# --- Varints ---
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+# --- Saving ---
+def encode_strokes(strokes):
+    """Returns (palette, stroke section bytes) for a list of Strokes."""
+    palette = []
+    index_of = {}
+    out = bytearray()
+    for stroke in strokes:
+        color = tuple(stroke.color)[:3]
+        if color not in index_of:
+            index_of[color] = len(palette)
+            palette.append(color)
+        out += struct.pack("<bB", stroke.figure, stroke.spacing)
+        _write_varint(out, index_of[color])
+        _write_varint(out, len(stroke))
+        last_x = last_y = 0
+        for x, y in stroke.points():
+            _write_varint(out, _zigzag(x - last_x))
+            _write_varint(out, _zigzag(y - last_y))
+            last_x, last_y = x, y
+    return palette, bytes(out)
+
+
+def save_document(path, surface, strokes):
+    """Writes the canvas raster and stroke history to path (atomically)."""
+    width, height = surface.get_size()
+    palette, stroke_bytes = encode_strokes(strokes)
+    palette_bytes = b"".join(bytes(color) for color in palette)
+
+    raster_offset = HEADER.size + len(palette_bytes)
+    raster_offset += -raster_offset % RASTER_ALIGN
+    raster = pygame.image.tobytes(surface, "RGB")
+    strokes_offset = raster_offset + len(raster)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, width, height, len(palette), len(strokes),
+                            raster_offset, strokes_offset, len(stroke_bytes)))
+        f.write(palette_bytes)
+        f.write(bytes(raster_offset - HEADER.size - len(palette_bytes)))  # Padding up to the raster
+        f.write(raster)
+        f.write(stroke_bytes)
+    os.replace(tmp_path, path)
+
+
+# --- Opening ---
+class Document:
+    """An opened .pnt file. The raster is ready at once; strokes are parsed on demand."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.width, self.height, self.palette_size, self.stroke_count,
+         self.raster_offset, self.strokes_offset, self.strokes_length) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a paint document")
+        self.palette = [tuple(self._map[HEADER.size + i * 3:HEADER.size + i * 3 + 3])
+                        for i in range(self.palette_size)]
+
+    def blit_raster(self, target):
+        """Draws the cached raster onto target straight from the memory map."""
+        size = self.width * self.height * 3
+        view = memoryview(self._map)[self.raster_offset:self.raster_offset + size]
+        try:
+            target.blit(pygame.image.frombuffer(view, (self.width, self.height), "RGB"), (0, 0))
+        finally:
+            view.release()
+
+    def load_strokes(self):
+        """Parses the stroke records and closes the file."""
+        data = self._map
+        pos = self.strokes_offset
+        strokes = []
+        for _ in range(self.stroke_count):
+            figure, spacing = struct.unpack_from("<bB", data, pos)
+            pos += 2
+            color_index, pos = _read_varint(data, pos)
+            count, pos = _read_varint(data, pos)
+            stroke = Stroke(self.palette[color_index], figure, spacing)
+            x = y = 0
+            for _ in range(count):
+                dx, pos = _read_varint(data, pos)
+                dy, pos = _read_varint(data, pos)
+                x += _unzigzag(dx)
+                y += _unzigzag(dy)
+                stroke.xs.append(x)
+                stroke.ys.append(y)
+            strokes.append(stroke)
+        self.close()
+        return strokes
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+
+def export_png(path, surface):
+    pygame.image.save(surface, path)
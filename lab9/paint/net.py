@@ -0,0 +1,527 @@
+"""Collaborative paint: a relay server and the client side of its protocol.
+
+Every message is a 5-byte header (type, payload length) and a payload.
+Clients collect the ops they draw during a frame (stamps, raster tools,
+clear) and send them as one BATCH. The server numbers each batch, relays it
+to the other clients and acks it to the sender with the sender's own
+timestamp, which gives the round-trip time.
+
+The server keeps the relayed batches since the last canvas snapshot. Every
+SNAPSHOT_EVERY batches it asks a client for a zlib-compressed copy of its
+canvas and drops the batches it covers, so a late joiner gets that
+snapshot plus the recent batches instead of the whole session. It asks the
+client that has painted least recently; one that hasn't answered after
+SNAPSHOT_TIMEOUT seconds is passed over for the next, and once the log
+reaches ASK_ALL_AFTER times SNAPSHOT_EVERY batches every client is asked
+at once (the newest answer wins), so a stuck client can't make the log
+grow without bound.
+
+Ops are not idempotent and do not commute (a fill or a clear depends on
+what is under it), so every client applies each batch exactly once, in seq
+order, on top of the snapshot it started from. SharedCanvas does this: it
+keeps a confirmed canvas that gets a client's own batches only when their
+ack comes back, in seq order among the relayed ones. The painter sees the
+confirmed canvas plus its own batches still waiting for their ack, redrawn
+on top whenever other painters' batches arrive in between. Snapshots are
+copies of the confirmed canvas, so they hold exactly the batches up to
+their seq.
+
+Usage:
+    python net.py serve [port]                  # run the relay server
+    python p.py --join host[:port] [--name me]  # paint in a shared session
+"""
+import selectors
+import socket
+import struct
+import sys
+import time
+import zlib
+from array import array
+from collections import deque
+
+DEFAULT_PORT = 5757
+SNAPSHOT_EVERY = 300  # Relayed batches kept before the server asks for a fresh snapshot
+SNAPSHOT_TIMEOUT = 2.0  # Seconds before asking another client
+ASK_ALL_AFTER = 4  # Log length, in SNAPSHOT_EVERYs, at which every client is asked
+STATS_INTERVAL = 1.0  # Seconds between bandwidth rate updates
+
+# --- Messages ---
+FRAME = struct.Struct("<BI")  # type, payload length
+HELLO, WELCOME, BATCH, RELAY, ACK, SNAP_REQ, SNAPSHOT = range(1, 8)
+BATCH_HEAD = struct.Struct("<d")  # client send time (time.time())
+RELAY_HEAD = struct.Struct("<IHd")  # seq, origin client id, origin send time
+ACK_MSG = struct.Struct("<Id")  # seq, echoed send time
+WELCOME_MSG = struct.Struct("<HI")  # client id, last batch seq at join time
+SNAP_HEAD = struct.Struct("<IHH")  # seq covered, width, height (then zlib RGB)
+
+# --- Ops (the body of a batch) ---
+OP_STAMPS, OP_RASTER, OP_CLEAR = 1, 2, 3
+STAMPS_HEAD = struct.Struct("<BbBBBH")  # op, figure, r, g, b, point count (then int16 x, y pairs)
+RASTER_OP = struct.Struct("<BBBBBhhhh")  # op, tool, r, g, b, start x, y, end x, y
+
+
+def frame(kind, payload=b""):
+    return FRAME.pack(kind, len(payload)) + payload
+
+
+def read_frames(buffer):
+    """Pops every complete (type, payload) message off the front of a bytearray."""
+    messages = []
+    pos = 0
+    while len(buffer) - pos >= FRAME.size:
+        kind, length = FRAME.unpack_from(buffer, pos)
+        if len(buffer) - pos - FRAME.size < length:
+            break
+        start = pos + FRAME.size
+        messages.append((kind, bytes(buffer[start:start + length])))
+        pos = start + length
+    del buffer[:pos]
+    return messages
+
+
+def _points_bytes(points):
+    values = array('h', points)
+    if sys.byteorder == "big":
+        values.byteswap()  # The wire format is little-endian
+    return values.tobytes()
+
+
+def decode_ops(data):
+    """Yields ("stamps", figure, color, points), ("raster", tool, color, start, end) or ("clear",)."""
+    pos = 0
+    while pos < len(data):
+        op = data[pos]
+        if op == OP_STAMPS:
+            _, figure, r, g, b, count = STAMPS_HEAD.unpack_from(data, pos)
+            pos += STAMPS_HEAD.size
+            values = array('h', data[pos:pos + count * 4])
+            if sys.byteorder == "big":
+                values.byteswap()
+            pos += count * 4
+            yield "stamps", figure, (r, g, b), list(zip(values[0::2], values[1::2]))
+        elif op == OP_RASTER:
+            _, tool, r, g, b, x0, y0, x1, y1 = RASTER_OP.unpack_from(data, pos)
+            pos += RASTER_OP.size
+            yield "raster", tool, (r, g, b), (x0, y0), (x1, y1)
+        elif op == OP_CLEAR:
+            pos += 1
+            yield ("clear",)
+        else:
+            raise ValueError(f"Unknown paint op {op}")
+
+
+# --- Client ---
+class PaintClient:
+    """One painter's connection. Non-blocking: call flush() and poll() once per frame."""
+
+    def __init__(self, host, port=DEFAULT_PORT, name="painter"):
+        self.sock = socket.create_connection((host, port), timeout=5)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.setblocking(False)
+        self.client_id = None
+        self.joined_at = None  # Batches up to this seq are catch-up, not live
+        self.seq = 0  # Last batch seq received (relayed or acked)
+        self.pending = deque()  # Ops of own batches sent but not acked yet, oldest first
+        self.snapshot_wanted = False  # The server asked for a snapshot not sent yet
+        self.inbox = bytearray()
+        self.outbox = bytearray()
+        self.ops = bytearray()  # Ops drawn this frame
+        self._stamps = None  # (figure, color) of the stamp run being collected
+        self._points = []
+        self.connected = True
+
+        # Stats
+        self.bytes_sent = self.bytes_received = 0
+        self.up_rate = self.down_rate = 0.0  # Bytes per second over the last interval
+        self.rtt = deque(maxlen=50)  # Seconds from sending a batch to its ack
+        self.relay_age = deque(maxlen=50)  # Seconds from another client's send to receiving it here
+        self._rate_time = time.perf_counter()
+        self._rate_sent = self._rate_received = 0
+
+        self._send(frame(HELLO, name.encode()[:64]))
+
+    # --- Outgoing ops ---
+    def add_stamps(self, figure, color, points):
+        """Queues brush stamps; consecutive stamps with one brush and color become one op."""
+        key = (figure, tuple(color)[:3])
+        if key != self._stamps:
+            self._close_stamps()
+            self._stamps = key
+        for x, y in points:
+            self._points += (x, y)
+
+    def _close_stamps(self):
+        if self._stamps and self._points:
+            figure, (r, g, b) = self._stamps
+            self.ops += STAMPS_HEAD.pack(OP_STAMPS, figure, r, g, b, len(self._points) // 2)
+            self.ops += _points_bytes(self._points)
+        self._stamps = None
+        self._points = []
+
+    def add_raster(self, tool, color, start, end):
+        self._close_stamps()
+        r, g, b = tuple(color)[:3]
+        self.ops += RASTER_OP.pack(OP_RASTER, tool, r, g, b, *start, *end)
+
+    def add_clear(self):
+        self._close_stamps()
+        self.ops.append(OP_CLEAR)
+
+    def flush(self):
+        """Sends this frame's ops as one batch (if there are any)."""
+        self._close_stamps()
+        if self.ops:
+            self._send(frame(BATCH, BATCH_HEAD.pack(time.time()) + self.ops))
+            self.pending.append(bytes(self.ops))
+            self.ops = bytearray()
+        self._write()
+
+    # --- Socket ---
+    def _send(self, data):
+        self.outbox += data
+        self._write()
+
+    def _write(self):
+        if not self.outbox or not self.connected:
+            return
+        try:
+            sent = self.sock.send(self.outbox)
+        except BlockingIOError:
+            return
+        except OSError:
+            self.connected = False
+            return
+        self.bytes_sent += sent
+        del self.outbox[:sent]
+
+    def poll(self):
+        """Reads what arrived. Returns the events in seq order:
+
+        ("batch", own, ops)   a batch (ops as in decode_ops); own batches come
+                              back when their ack arrives
+        ("snapshot", Surface) the session's canvas, for a late joiner
+        """
+        events = []
+        while self.connected:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                data = b""
+            if not data:
+                self.connected = False
+                break
+            self.bytes_received += len(data)
+            self.inbox += data
+
+        for kind, payload in read_frames(self.inbox):
+            if kind == WELCOME:
+                self.client_id, self.joined_at = WELCOME_MSG.unpack(payload)
+                self.seq = self.joined_at  # The catch-up below brings the canvas up to here
+            elif kind == RELAY:
+                seq, origin, sent = RELAY_HEAD.unpack_from(payload)
+                self.seq = seq
+                if seq > self.joined_at:
+                    self.relay_age.append(time.time() - sent)
+                events.append(("batch", False, list(decode_ops(payload[RELAY_HEAD.size:]))))
+            elif kind == ACK:
+                self.seq, sent = ACK_MSG.unpack(payload)
+                self.rtt.append(time.time() - sent)
+                events.append(("batch", True, list(decode_ops(self.pending.popleft()))))
+            elif kind == SNAPSHOT:
+                events.append(("snapshot", decode_snapshot(payload)[1]))
+            elif kind == SNAP_REQ:
+                self.snapshot_wanted = True
+        self._update_rates()
+        return events
+
+    def pending_ops(self):
+        """Ops of the own batches still waiting for their ack, in the order they were drawn."""
+        for ops in self.pending:
+            yield from decode_ops(ops)
+
+    def send_snapshot(self, surface):
+        """Answers the server's snapshot request; surface must hold exactly the batches up to self.seq."""
+        self._send(frame(SNAPSHOT, encode_snapshot(self.seq, surface)))
+        self.snapshot_wanted = False
+
+    def _update_rates(self):
+        now = time.perf_counter()
+        elapsed = now - self._rate_time
+        if elapsed >= STATS_INTERVAL:
+            self.up_rate = (self.bytes_sent - self._rate_sent) / elapsed
+            self.down_rate = (self.bytes_received - self._rate_received) / elapsed
+            self._rate_time, self._rate_sent, self._rate_received = now, self.bytes_sent, self.bytes_received
+
+    def status_text(self):
+        if not self.connected:
+            return "Disconnected"
+        rtt = f"{sum(self.rtt) / len(self.rtt) * 1000:.1f} ms" if self.rtt else "-"
+        age = f"{sum(self.relay_age) / len(self.relay_age) * 1000:.1f} ms" if self.relay_age else "-"
+        return (f"RTT {rtt} | sync {age} | up {self.up_rate / 1024:.1f} KB/s"
+                f" | down {self.down_rate / 1024:.1f} KB/s")
+
+    def close(self):
+        self.flush()
+        self.sock.close()
+        self.connected = False
+
+
+class SharedCanvas:
+    """A painter's canvas kept in the session's order (see the module docstring).
+
+    draw_op(surface, op) draws one decoded op onto a surface. The painter
+    draws its own ops onto surface at once and queues them on the client;
+    sync() once per frame does the rest.
+    """
+
+    def __init__(self, client, surface, draw_op):
+        self.client = client
+        self.surface = surface  # What the painter sees and draws on
+        self.confirmed = surface.copy()  # Exactly the batches up to client.seq
+        self.draw_op = draw_op
+
+    def sync(self):
+        """Sends this frame's ops and applies what arrived.
+
+        Returns (own, op, result) for every op applied to the confirmed
+        canvas, result being what draw_op returned; a snapshot comes back
+        as (False, ("snapshot", Surface), None).
+        """
+        client = self.client
+        client.flush()
+        applied = []
+        redraw = False  # Others' batches landed under this painter's pending ops
+        for event in client.poll():
+            if event[0] == "snapshot":
+                self.confirmed.blit(event[1], (0, 0))
+                applied.append((False, event, None))
+                redraw = True
+                continue
+            _, own, ops = event
+            for op in ops:
+                applied.append((own, op, self.draw_op(self.confirmed, op)))
+            redraw = redraw or not own
+        if redraw:
+            self.surface.blit(self.confirmed, (0, 0))
+            for op in client.pending_ops():
+                self.draw_op(self.surface, op)
+        if client.snapshot_wanted:
+            client.send_snapshot(self.confirmed)
+        return applied
+
+
+def encode_snapshot(seq, surface):
+    import pygame
+    width, height = surface.get_size()
+    return SNAP_HEAD.pack(seq, width, height) + zlib.compress(pygame.image.tobytes(surface, "RGB"), 1)
+
+
+def decode_snapshot(payload):
+    """Returns (seq, Surface) from a SNAPSHOT payload."""
+    import pygame
+    seq, width, height = SNAP_HEAD.unpack_from(payload)
+    pixels = zlib.decompress(payload[SNAP_HEAD.size:])
+    return seq, pygame.image.frombytes(pixels, (width, height), "RGB")
+
+
+# --- Server ---
+class _Peer:
+    def __init__(self, sock, client_id):
+        self.sock = sock
+        self.client_id = client_id
+        self.name = "?"
+        self.inbox = bytearray()
+        self.outbox = bytearray()
+        self.bytes_in = self.bytes_out = 0
+        self.joined = False
+        self.last_batch = 0.0  # perf_counter() of its latest batch
+
+
+class PaintServer:
+    """Relays batches between clients and keeps what a late joiner needs."""
+
+    def __init__(self, host="0.0.0.0", port=DEFAULT_PORT, verbose=True):
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.port = self.listener.getsockname()[1]
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.peers = {}  # socket -> _Peer
+        self.next_id = 1
+        self.seq = 0
+        self.log = deque()  # (seq, RELAY frame) since the snapshot
+        self.snapshot = None  # Latest SNAPSHOT frame
+        self.snapshot_seq = 0  # Batch seq the latest snapshot covers
+        self.snapshot_asked = {}  # Client id -> perf_counter() when asked for the snapshot still due
+        self.verbose = verbose
+        self._stats_time = time.perf_counter()
+
+    def log_message(self, message):
+        if self.verbose:
+            print(message, flush=True)
+
+    def serve(self, duration=None):
+        """Runs the relay loop (forever, or for duration seconds)."""
+        end = None if duration is None else time.perf_counter() + duration
+        while end is None or time.perf_counter() < end:
+            self.step(0.05)
+
+    def step(self, timeout=0.0):
+        for key, mask in self.selector.select(timeout):
+            if key.fileobj is self.listener:
+                self._accept()
+                continue
+            peer = self.peers.get(key.fileobj)
+            if peer is None:
+                continue
+            if mask & selectors.EVENT_READ:
+                self._read(peer)
+            if mask & selectors.EVENT_WRITE and peer.sock in self.peers:
+                self._write(peer)
+        self._request_snapshot()
+        self._print_stats()
+
+    def _accept(self):
+        sock, address = self.listener.accept()
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        peer = _Peer(sock, self.next_id)
+        self.next_id += 1
+        self.peers[sock] = peer
+        self.selector.register(sock, selectors.EVENT_READ)
+
+    def _drop(self, peer):
+        self.log_message(f"Client {peer.client_id} ({peer.name}) left")
+        self.selector.unregister(peer.sock)
+        peer.sock.close()
+        del self.peers[peer.sock]
+        self.snapshot_asked.pop(peer.client_id, None)
+
+    def _send(self, peer, data):
+        peer.outbox += data
+        self._write(peer)
+
+    def _write(self, peer):
+        if peer.sock not in self.peers:
+            return  # Dropped while handling its messages
+        try:
+            sent = peer.sock.send(peer.outbox)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(peer)
+            return
+        peer.bytes_out += sent
+        del peer.outbox[:sent]
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if peer.outbox else 0)
+        self.selector.modify(peer.sock, events)
+
+    def _read(self, peer):
+        try:
+            data = peer.sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(peer)
+            return
+        peer.bytes_in += len(data)
+        peer.inbox += data
+        for kind, payload in read_frames(peer.inbox):
+            self._handle(peer, kind, payload)
+
+    def _handle(self, peer, kind, payload):
+        if kind == HELLO:
+            peer.name = payload.decode(errors="replace")
+            peer.joined = True
+            # Late joiner: latest snapshot, then every batch relayed since it
+            catch_up = bytearray(frame(WELCOME, WELCOME_MSG.pack(peer.client_id, self.seq)))
+            if self.snapshot is not None:
+                catch_up += self.snapshot
+            for _, relay in self.log:
+                catch_up += relay
+            self._send(peer, catch_up)
+            snapshot = "snapshot + " if self.snapshot is not None else ""
+            self.log_message(f"Client {peer.client_id} ({peer.name}) joined, sent {len(catch_up)} bytes "
+                             f"({snapshot}{len(self.log)} batches)")
+        elif kind == BATCH:
+            self.seq += 1
+            sent = BATCH_HEAD.unpack_from(payload)[0]
+            relay = frame(RELAY, RELAY_HEAD.pack(self.seq, peer.client_id, sent) + payload[BATCH_HEAD.size:])
+            self.log.append((self.seq, relay))
+            for other in list(self.peers.values()):
+                if other is not peer and other.joined:
+                    self._send(other, relay)
+            self._send(peer, frame(ACK, ACK_MSG.pack(self.seq, sent)))
+            peer.last_batch = time.perf_counter()
+        elif kind == SNAPSHOT:
+            seq = SNAP_HEAD.unpack_from(payload)[0]
+            if seq <= self.snapshot_seq:
+                return  # Older than the one kept (a slow answer to an earlier request)
+            self.snapshot = frame(SNAPSHOT, payload)
+            self.snapshot_seq = seq
+            while self.log and self.log[0][0] <= seq:
+                self.log.popleft()
+            self.snapshot_asked.clear()
+            self.log_message(f"Snapshot at batch {seq} from client {peer.client_id}: {len(payload)} bytes")
+
+    def _request_snapshot(self):
+        """Asks for a snapshot once the log is SNAPSHOT_EVERY batches long (see the module docstring)."""
+        if len(self.log) < SNAPSHOT_EVERY:
+            return
+        now = time.perf_counter()
+        ask_all = len(self.log) >= ASK_ALL_AFTER * SNAPSHOT_EVERY
+        waiting = any(now - asked < SNAPSHOT_TIMEOUT for asked in self.snapshot_asked.values())
+        joined = [peer for peer in self.peers.values() if peer.joined]
+        candidates = [peer for peer in joined if peer.client_id not in self.snapshot_asked]
+        if not candidates:
+            if waiting:
+                return
+            self.snapshot_asked.clear()  # Everyone was asked and nobody answered: start over
+            candidates = joined
+        if not ask_all:
+            if waiting:
+                return  # Give the asked client its time
+            candidates = sorted(candidates, key=lambda peer: peer.last_batch)[:1]  # Painted least recently
+        for peer in candidates:
+            self.snapshot_asked[peer.client_id] = now
+            self._send(peer, frame(SNAP_REQ, struct.pack("<I", self.seq)))
+
+    def _print_stats(self):
+        now = time.perf_counter()
+        elapsed = now - self._stats_time
+        if elapsed < 5 or not self.peers:
+            return
+        for peer in self.peers.values():
+            self.log_message(f"  client {peer.client_id} ({peer.name}): in {peer.bytes_in / elapsed / 1024:.1f} KB/s, "
+                             f"out {peer.bytes_out / elapsed / 1024:.1f} KB/s")
+            peer.bytes_in = peer.bytes_out = 0
+        self._stats_time = now
+
+    def close(self):
+        for peer in list(self.peers.values()):
+            peer.sock.close()
+        self.selector.close()
+        self.listener.close()
+
+
+def parse_address(text):
+    host, _, port = text.partition(":")
+    return host or "127.0.0.1", int(port) if port else DEFAULT_PORT
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "serve":
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT
+        server = PaintServer(port=port)
+        print(f"Paint server listening on port {server.port}")
+        try:
+            server.serve()
+        except KeyboardInterrupt:
+            pass
+        server.close()
+    else:
+        print(__doc__)
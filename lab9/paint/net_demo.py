@@ -0,0 +1,132 @@
+"""Loopback test of the collaborative paint protocol: a server and headless clients.
+
+Two clients paint different strokes (plus a fill and a clear) at the same
+time, and a few times both fill, clear, erase and stamp over the same spot
+in the same frame, which only comes out the same everywhere if every
+client applies the batches in the server's order. A third one joins
+halfway through, and at the end all three canvases must be identical
+(the exit status is 1 if they are not). A fourth client connects and then
+freezes (never reads): as the quietest client it is asked for snapshots
+first, and the server has to move on to another one. Prints sync latency
+and bandwidth per client, and the longest the server's log got.
+
+Run with:  python net_demo.py
+"""
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # No window needed
+
+import pygame
+
+import brushes
+import net
+import raster
+
+WIDTH, HEIGHT = 800, 600
+FRAMES = 600
+LATE_JOIN_FRAME = 300
+FILL = 6  # Bucket fill tool number, as in p.py
+OVERLAP = (400, 300)  # Where both painters fill, clear, erase and stamp at once
+OVERLAP_FRAMES = (120, 121, 240, 360, 361, 500)
+net.SNAPSHOT_EVERY = 100  # Small, so the late joiner gets a snapshot and some batches
+net.SNAPSHOT_TIMEOUT = 0.1  # Pass over the frozen client quickly
+
+
+class HeadlessPainter:
+    def __init__(self, port, name):
+        self.name = name
+        self.canvas = pygame.Surface((WIDTH, HEIGHT)).convert()
+        self.canvas.fill("white")
+        self.client = net.PaintClient("127.0.0.1", port, name)
+        self.shared = net.SharedCanvas(self.client, self.canvas, draw_op)
+
+    def stamp(self, figure, color, points):
+        draw_op(self.canvas, ("stamps", figure, color, points))
+        self.client.add_stamps(figure, color, points)
+
+    def fill(self, pos, color):
+        draw_op(self.canvas, ("raster", FILL, color, pos, pos))
+        self.client.add_raster(FILL, color, pos, pos)
+
+    def clear(self):
+        self.canvas.fill("white")
+        self.client.add_clear()
+
+    def sync(self):
+        self.shared.sync()
+
+
+def draw_op(surface, op):
+    """Draws a decoded op (the demo only uses stamps, bucket fill and clear)."""
+    if op[0] == "stamps":
+        for point in op[3]:
+            brushes.stamp(surface, op[1], op[2], point)
+    elif op[0] == "raster":
+        raster.flood_fill(surface, op[3], op[2])
+    elif op[0] == "clear":
+        surface.fill("white")
+
+
+def orbit(frame, center, radius, speed):
+    angle = frame * speed
+    return round(center[0] + radius * math.cos(angle)), round(center[1] + radius * math.sin(angle))
+
+
+if __name__ == "__main__":
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    server = net.PaintServer("127.0.0.1", 0, verbose=True)
+    a = HeadlessPainter(server.port, "alice")
+    b = HeadlessPainter(server.port, "bob")
+    frozen = net.PaintClient("127.0.0.1", server.port, "frozen")  # Says hello, then never polls
+    painters = [a, b]
+    longest_log = 0
+    start = time.perf_counter()
+
+    for frame in range(FRAMES):
+        # Each painter lays a couple of stamps per frame, like a mouse drag
+        a.stamp(0, (0, 0, 255), [orbit(frame * 2 + i, (250, 300), 150, 0.05) for i in range(2)])
+        b.stamp(4, (255, 0, 0), [orbit(frame * 2 + i, (550, 300), 120, -0.04) for i in range(2)])
+        if frame == 50:
+            b.clear()
+        if frame == 450:
+            a.fill((400, 120), (255, 255, 0))
+        if frame in OVERLAP_FRAMES:  # Both painters on the same spot in the same frame
+            a.fill(OVERLAP, (0, 200, 0))
+            b.clear()
+            b.stamp(0, (255, 0, 255), [OVERLAP])
+            a.stamp(-1, (255, 255, 255), [OVERLAP])
+        if frame == LATE_JOIN_FRAME:
+            painters.append(HeadlessPainter(server.port, "carol (late)"))
+        for painter in painters:
+            painter.sync()
+        server.step(0)
+        longest_log = max(longest_log, len(server.log))
+
+    # Let the last batches arrive everywhere
+    for _ in range(50):
+        server.step(0.005)
+        for painter in painters:
+            painter.sync()
+
+    elapsed = time.perf_counter() - start
+    reference = pygame.image.tobytes(a.canvas, "RGB")
+    all_same = True
+    for painter in painters:
+        same = pygame.image.tobytes(painter.canvas, "RGB") == reference
+        all_same = all_same and same
+        client = painter.client
+        rtt = f"{sum(client.rtt) / len(client.rtt) * 1000:.2f} ms" if client.rtt else "-"
+        age = f"{sum(client.relay_age) / len(client.relay_age) * 1000:.2f} ms" if client.relay_age else "-"
+        print(f"{painter.name:>13}: matches alice: {same} | RTT {rtt}, sync {age} | "
+              f"up {client.bytes_sent / 1024:.1f} KB, down {client.bytes_received / 1024:.1f} KB "
+              f"in {elapsed:.1f} s")
+    print(f"Longest server log: {longest_log} batches (snapshot every {net.SNAPSHOT_EVERY})")
+    for painter in painters:
+        painter.client.close()
+    frozen.sock.close()
+    server.close()
+    sys.exit(0 if all_same else 1)
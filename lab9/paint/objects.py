@@ -0,0 +1,171 @@
+"""Shapes as objects: a uniform-grid spatial index for hit-testing and redraws.
+
+Every stroke or raster-tool result on the canvas is kept as an object with a
+bounding box. The Scene files each object under the grid cells its box
+overlaps, so finding what is under the mouse or what intersects a dirty
+region only looks at the few objects in those cells instead of scanning
+the whole painting.
+"""
+import math
+
+import pygame
+
+import brushes
+
+GRID_CELL = 64  # Size in pixels of one spatial grid cell
+HIT_RADIUS = 20  # How close (in pixels) a click must be to a stamp to pick its stroke
+
+
+class StrokeObject:
+    """A Stroke as a selectable object. Its box covers every stamp of the stroke."""
+
+    def __init__(self, stroke):
+        self.stroke = stroke
+        self.z = None  # Drawing order, set by the Scene
+        self.rect = self._bounds()
+
+    def _bounds(self):
+        xs, ys, figure = self.stroke.xs, self.stroke.ys, self.stroke.figure
+        return brushes.stamp_rect(figure, (min(xs), min(ys))).union(brushes.stamp_rect(figure, (max(xs), max(ys))))
+
+    @property
+    def selectable(self):
+        return self.stroke.figure != -1  # Eraser strokes are part of the picture, not shapes
+
+    def hit(self, pos):
+        x, y = pos
+        return any(math.hypot(px - x, py - y) <= HIT_RADIUS for px, py in self.stroke.points())
+
+    def move(self, dx, dy):
+        xs, ys = self.stroke.xs, self.stroke.ys
+        for i in range(len(xs)):
+            xs[i] += dx
+            ys[i] += dy
+        self.rect.move_ip(dx, dy)
+
+    def draw(self, surface, region):
+        """Draws the stamps that fall inside region (the surface is clipped to it)."""
+        stroke = self.stroke
+        for point in stroke.points():
+            if region.colliderect(brushes.stamp_rect(stroke.figure, point)):
+                brushes.stamp(surface, stroke.figure, stroke.color, point)
+
+
+class PatchObject:
+    """Pixels added by a raster tool, kept as a transparent patch and its position."""
+
+    def __init__(self, patch, topleft):
+        self.patch = patch
+        self.z = None
+        self.rect = patch.get_rect(topleft=topleft)
+
+    selectable = True
+
+    def hit(self, pos):
+        if not self.rect.collidepoint(pos):
+            return False
+        return self.patch.get_at((pos[0] - self.rect.x, pos[1] - self.rect.y)).a > 0
+
+    def move(self, dx, dy):
+        self.rect.move_ip(dx, dy)
+
+    def draw(self, surface, region):
+        surface.blit(self.patch, self.rect)
+
+
+class SpatialGrid:
+    """Uniform grid: each cell holds the set of objects whose box overlaps it."""
+
+    def __init__(self, cell_size=GRID_CELL):
+        self.cell_size = cell_size
+        self.cells = {}  # (col, row) -> set of objects
+        self.placed = {}  # object -> the cells it was filed under
+
+    def _cells(self, rect):
+        size = self.cell_size
+        return [(col, row)
+                for row in range(rect.top // size, (rect.bottom - 1) // size + 1)
+                for col in range(rect.left // size, (rect.right - 1) // size + 1)]
+
+    def insert(self, obj):
+        cells = self._cells(obj.rect)
+        self.placed[obj] = cells
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(obj)
+
+    def remove(self, obj):
+        for cell in self.placed.pop(obj):
+            bucket = self.cells[cell]
+            bucket.discard(obj)
+            if not bucket:
+                del self.cells[cell]
+
+    def query_point(self, pos):
+        size = self.cell_size
+        return self.cells.get((pos[0] // size, pos[1] // size), ())
+
+    def query_rect(self, rect):
+        found = set()
+        for cell in self._cells(pygame.Rect(rect)):
+            found.update(self.cells.get(cell, ()))
+        return found
+
+
+class Scene:
+    """The objects on the canvas, in drawing order, with their spatial index."""
+
+    def __init__(self, cell_size=GRID_CELL):
+        self.grid = SpatialGrid(cell_size)
+        self.next_z = 0
+
+    def __len__(self):
+        return len(self.grid.placed)
+
+    def add(self, obj):
+        """Adds obj on top, or back at its old depth if it was in the scene before."""
+        if obj.z is None:
+            obj.z = self.next_z
+            self.next_z += 1
+        self.grid.insert(obj)
+
+    def remove(self, obj):
+        self.grid.remove(obj)
+
+    def move(self, obj, dx, dy):
+        self.grid.remove(obj)
+        obj.move(dx, dy)
+        self.grid.insert(obj)
+
+    def objects(self):
+        return sorted(self.grid.placed, key=lambda obj: obj.z)
+
+    def reset(self, objects=()):
+        self.grid = SpatialGrid(self.grid.cell_size)
+        for obj in objects:
+            self.add(obj)
+
+    def at_point(self, pos):
+        """The topmost selectable object under pos, or None."""
+        candidates = sorted(self.grid.query_point(pos), key=lambda obj: obj.z, reverse=True)
+        for obj in candidates:
+            if obj.selectable and obj.hit(pos):
+                return obj
+        return None
+
+    def in_rect(self, rect):
+        """Objects whose box intersects rect, bottom to top."""
+        rect = pygame.Rect(rect)
+        return sorted((obj for obj in self.grid.query_rect(rect) if obj.rect.colliderect(rect)),
+                      key=lambda obj: obj.z)
+
+    def redraw(self, surface, region, base, background):
+        """Repaints region of surface: the base picture, then every object over it in order."""
+        region = pygame.Rect(region).clip(surface.get_rect())
+        surface.set_clip(region)
+        if base is not None:
+            surface.blit(base, region, region)
+        else:
+            surface.fill(background, region)
+        for obj in self.in_rect(region):
+            obj.draw(surface, region)
+        surface.set_clip(None)
@@ -1,8 +1,21 @@
-import pygame
-import math
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pgcommon.bootstrap import Startup, ticks
+
+# Initialize only the pygame modules paint uses (no mixer or joysticks)
+startup = Startup("Paint", ("display", "font"))
 
-# Initialize pygame
-pygame.init()
+import pygame
+from stroke import Stroke
+from canvas import TiledCanvas
+from document import Document, save_document, export_png
+import raster
+import brushes
+from objects import Scene, StrokeObject, PatchObject
+from pgcommon.profiler import FrameProfiler
+startup.mark("imports")
 
 # Screen settings
 fps = 60  # Frames per second for smooth animation
@@ -16,197 +29,535 @@ color_selected = False  # Track if a color has been selected
 # Set up the display window
 screen = pygame.display.set_mode([WIDTH, HEIGHT])
 pygame.display.set_caption("Paint")  # Set the window title
-painting = []  # List to store all drawing actions
+startup.mark("window")
+painting = []  # List of Strokes, one per press-drag-release
+current_stroke = None  # Stroke being drawn while the mouse button is held
+DOCUMENT_PATH = "painting.pnt"  # Ctrl+S saves here, Ctrl+O opens it
+EXPORT_PATH = "painting.png"  # Ctrl+E exports the canvas as PNG
+opened_document = None  # Opened document whose strokes haven't been parsed yet
+drag_start = None  # Where the mouse was pressed for the raster tool being dragged
+
+# Raster tools (active_figure values past the stamp brushes)
+FILL_TOOL = 6  # Bucket fill
+LINE_TOOL = 7
+RECT_TOOL = 8  # Filled rectangle
+ELLIPSE_TOOL = 9  # Filled ellipse
+RASTER_TOOLS = (FILL_TOOL, LINE_TOOL, RECT_TOOL, ELLIPSE_TOOL)
+LINE_WIDTH = 3
+
+# Object mode (V): click selects a shape, drag moves it, Delete removes it,
+# and the eraser removes whole shapes instead of painting white
+object_mode = False
+selected = None  # Selected object
+object_drag = None  # ("move", obj, last mouse pos, total dx, total dy) or ("erase", removed objects)
+
+# Shared session: python p.py --join host[:port] [--name me] (server: python net.py serve)
+# Undo/redo, object mode and opening documents are local-only, so they are off while joined.
+net_client = None
+if "--join" in sys.argv:
+    from net import PaintClient, SharedCanvas, parse_address  # Only needed for shared sessions
+    name = sys.argv[sys.argv.index("--name") + 1] if "--name" in sys.argv else "painter"
+    net_client = PaintClient(*parse_address(sys.argv[sys.argv.index("--join") + 1]), name=name)
+    pygame.display.set_caption(f"Paint - shared ({name})")
+net_text = None  # (half-second it was made in, rendered sync/bandwidth line)
+
+# Off-screen canvas: every committed shape is drawn onto it once, and each frame
+# only blits the canvas instead of redrawing the whole painting list.
+# It is tiled so each stroke can be undone/redone by restoring just the tiles it touched.
+canvas = TiledCanvas(WIDTH, HEIGHT, "white")
+# Every shape on the canvas is also an object in the scene (indexed by a spatial grid),
+# drawn over the base picture: the opened document's raster, or plain background
+scene = Scene()
+base_surface = None
 
 # Initialize font for messages
 font = pygame.font.Font(None, 36)
+menu_font = pygame.font.Font(None, 24)  # Menu button labels
+mode_text = menu_font.render("Object mode (V)", True, (0, 0, 0))
+
+
+MENU_HEIGHT = 72  # Menu bar plus its bottom border line
 
 
-def draw_menu(color):
-    """Draws the top menu with color options, brush shapes, and buttons."""
+def build_menu(color, figure):
+    """Draws the top menu once onto its own surface.
+
+    Returns the surface and a hit-test table of (rect, action, value) entries,
+    where action is "figure", "color" or "clear". It only needs rebuilding when
+    the active color or tool changes.
+    """
+    menu = pygame.Surface([WIDTH, MENU_HEIGHT]).convert()
+    menu.fill("white")
+    hits = []
+
     # Draw the menu background
-    pygame.draw.rect(screen, 'gray', [0, 0, WIDTH, 70])
-    pygame.draw.line(screen, 'black', (0, 70), (WIDTH, 70), 3)
+    pygame.draw.rect(menu, 'gray', [0, 0, WIDTH, 70])
+    pygame.draw.line(menu, 'black', (0, 70), (WIDTH, 70), 3)
 
     # Basic brush selection tools
     # Circle brush button
-    circle_brush = [pygame.draw.rect(screen, 'black', [10, 10, 50, 50]), 0]
-    pygame.draw.circle(screen, 'white', (35, 35), 20)
-    pygame.draw.circle(screen, 'black', (35, 35), 18)
+    hits.append((pygame.draw.rect(menu, 'black', [10, 10, 50, 50]), "figure", 0))
+    pygame.draw.circle(menu, 'white', (35, 35), 20)
+    pygame.draw.circle(menu, 'black', (35, 35), 18)
 
     # Rectangle brush button
-    rect_brush = [pygame.draw.rect(screen, 'black', [70, 10, 50, 50]), 1]
-    pygame.draw.rect(screen, 'white', [76.5, 26, 37, 20], 2)
+    hits.append((pygame.draw.rect(menu, 'black', [70, 10, 50, 50]), "figure", 1))
+    pygame.draw.rect(menu, 'white', [76.5, 26, 37, 20], 2)
 
     # Square brush button
-    square_brush = [pygame.draw.rect(screen, 'black', [130, 10, 50, 50]), 2]
-    pygame.draw.rect(screen, 'white', [140, 20, 30, 30], 2)
+    hits.append((pygame.draw.rect(menu, 'black', [130, 10, 50, 50]), "figure", 2))
+    pygame.draw.rect(menu, 'white', [140, 20, 30, 30], 2)
 
     # Right triangle brush button
-    right_triangle = [pygame.draw.rect(screen, 'black', [190, 10, 50, 50]), 3]
-    pygame.draw.polygon(screen, 'white', [(195, 45), (235, 45), (195, 15)], 2)
+    hits.append((pygame.draw.rect(menu, 'black', [190, 10, 50, 50]), "figure", 3))
+    pygame.draw.polygon(menu, 'white', [(195, 45), (235, 45), (195, 15)], 2)
 
     # Equilateral triangle brush button
-    eq_triangle = [pygame.draw.rect(screen, 'black', [250, 10, 50, 50]), 4]
-    pygame.draw.polygon(screen, 'white', [(275, 15), (255, 45), (295, 45)], 2)
+    hits.append((pygame.draw.rect(menu, 'black', [250, 10, 50, 50]), "figure", 4))
+    pygame.draw.polygon(menu, 'white', [(275, 15), (255, 45), (295, 45)], 2)
 
     # Rhombus brush button
-    rhombus = [pygame.draw.rect(screen, 'black', [310, 10, 50, 50]), 5]
-    pygame.draw.polygon(screen, 'white', [(335, 15), (350, 35), (335, 55), (320, 35)], 2)
-
-    # Collect all brush options
-    brush_list = [circle_brush, rect_brush, square_brush, right_triangle, eq_triangle, rhombus]
+    hits.append((pygame.draw.rect(menu, 'black', [310, 10, 50, 50]), "figure", 5))
+    pygame.draw.polygon(menu, 'white', [(335, 15), (350, 35), (335, 55), (320, 35)], 2)
+
+    # Raster tool buttons (2x2 grid next to the Clear button)
+    hits.append((pygame.draw.rect(menu, 'black', [545, 10, 25, 25]), "figure", FILL_TOOL))
+    pygame.draw.polygon(menu, 'white', [(551, 20), (558, 14), (565, 21), (558, 28)])
+    pygame.draw.line(menu, 'white', (564, 24), (564, 30), 2)  # Drip
+    hits.append((pygame.draw.rect(menu, 'black', [572, 10, 25, 25]), "figure", LINE_TOOL))
+    pygame.draw.line(menu, 'white', (576, 31), (593, 14), 2)
+    hits.append((pygame.draw.rect(menu, 'black', [545, 37, 25, 25]), "figure", RECT_TOOL))
+    pygame.draw.rect(menu, 'white', [550, 43, 15, 13])
+    hits.append((pygame.draw.rect(menu, 'black', [572, 37, 25, 25]), "figure", ELLIPSE_TOOL))
+    pygame.draw.ellipse(menu, 'white', [575, 43, 19, 13])
+
+    # Highlight the active brush
+    for rect, action, value in hits:
+        if action == "figure" and value == figure:
+            pygame.draw.rect(menu, 'yellow', rect.inflate(4, 4), 2)
 
     # Current active color indicator
-    pygame.draw.circle(screen, color, (400, 35), 30)
-    pygame.draw.circle(screen, 'dark gray', (400, 35), 30, 3)
+    pygame.draw.circle(menu, color, (400, 35), 30)
+    pygame.draw.circle(menu, 'dark gray', (400, 35), 30, 3)
 
     # Eraser button (X icon)
-    eraser_rect = pygame.draw.rect(screen, (200, 200, 200), [WIDTH - 150, 10, 40, 40])
-    pygame.draw.line(screen, 'black', (WIDTH - 140, 15), (WIDTH - 120, 35), 5)
-    pygame.draw.line(screen, 'black', (WIDTH - 120, 15), (WIDTH - 140, 35), 5)
+    eraser_rect = pygame.draw.rect(menu, (200, 200, 200), [WIDTH - 150, 10, 40, 40])
+    pygame.draw.line(menu, 'black', (WIDTH - 140, 15), (WIDTH - 120, 35), 5)
+    pygame.draw.line(menu, 'black', (WIDTH - 120, 15), (WIDTH - 140, 35), 5)
+    if figure == -1:
+        pygame.draw.rect(menu, 'yellow', eraser_rect.inflate(4, 4), 2)
 
     # Color palette with various color options
-    blue = pygame.draw.rect(screen, (0, 0, 255), [WIDTH - 35, 10, 25, 25])
-    red = pygame.draw.rect(screen, (255, 0, 0), [WIDTH - 35, 35, 25, 25])
-    green = pygame.draw.rect(screen, (0, 255, 0), [WIDTH - 60, 10, 25, 25])
-    yellow = pygame.draw.rect(screen, (255, 255, 0), [WIDTH - 60, 35, 25, 25])
-    teal = pygame.draw.rect(screen, (0, 255, 255), [WIDTH - 85, 10, 25, 25])
-    purple = pygame.draw.rect(screen, (255, 0, 255), [WIDTH - 85, 35, 25, 25])
-    black = pygame.draw.rect(screen, (0, 0, 0), [WIDTH - 110, 10, 25, 25])
-
-    # Group color options and their RGB values
-    color_rect = [blue, red, green, yellow, teal, purple, black, eraser_rect]
-    rgb_list = [(0, 0, 255), (255, 0, 0), (0, 255, 0), (255, 255, 0),
-                (0, 255, 255), (255, 0, 255), (0, 0, 0), (255, 255, 255)]  # Eraser is white
+    palette = [
+        ([WIDTH - 35, 10, 25, 25], (0, 0, 255)),  # Blue
+        ([WIDTH - 35, 35, 25, 25], (255, 0, 0)),  # Red
+        ([WIDTH - 60, 10, 25, 25], (0, 255, 0)),  # Green
+        ([WIDTH - 60, 35, 25, 25], (255, 255, 0)),  # Yellow
+        ([WIDTH - 85, 10, 25, 25], (0, 255, 255)),  # Teal
+        ([WIDTH - 85, 35, 25, 25], (255, 0, 255)),  # Purple
+        ([WIDTH - 110, 10, 25, 25], (0, 0, 0)),  # Black
+    ]
+    for rect, rgb in palette:
+        hits.append((pygame.draw.rect(menu, rgb, rect), "color", rgb))
+    hits.append((eraser_rect, "color", (255, 255, 255)))  # Eraser is white
 
     # Clear button
-    clear_button = pygame.draw.rect(screen, (173, 216, 230), [450, 10, 80, 50])
-    pygame.draw.rect(screen, 'black', [450, 10, 80, 50], 2)
-    font = pygame.font.Font(None, 24)
-    text = font.render("Clear", True, (0, 0, 0))
-    text_rect = text.get_rect(center=(490, 35))
-    screen.blit(text, text_rect)
-
-    return brush_list, color_rect, rgb_list, clear_button
-
-
-def draw_painting(paints):
-    """Draws all shapes from the stored paint list."""
-    for color, pos, figure in paints:
-        if figure == -1:  # Eraser
-            pygame.draw.rect(screen, (255, 255, 255), [pos[0] - 20, pos[1] - 20, 40, 40])
-        elif figure == 0:  # Circle
-            pygame.draw.circle(screen, color, pos, 20, 2)
-        elif figure == 1:  # Rectangle
-            pygame.draw.rect(screen, color, [pos[0] - 15, pos[1] - 15, 37, 20], 2)
-        elif figure == 2:  # Square
-            pygame.draw.rect(screen, color, [pos[0] - 15, pos[1] - 15, 30, 30], 2)
-        elif figure == 3:  # Right triangle
-            pygame.draw.polygon(screen, color, [(pos[0], pos[1]), (pos[0] + 40, pos[1]), (pos[0], pos[1] - 40)], 2)
-        elif figure == 4:  # Equilateral triangle
-            # Calculate vertices for equilateral triangle
-            side = 40
-            height = side * math.sqrt(3) / 2
-            pygame.draw.polygon(screen, color, [
-                (pos[0], pos[1] - 2 * height / 3),  # Top vertex
-                (pos[0] - side / 2, pos[1] + height / 3),  # Bottom left
-                (pos[0] + side / 2, pos[1] + height / 3)  # Bottom right
-            ], 2)
-        elif figure == 5:  # Rhombus
-            # Draw rhombus (diamond shape)
-            size = 20
-            pygame.draw.polygon(screen, color, [
-                (pos[0], pos[1] - size),  # Top
-                (pos[0] + size, pos[1]),  # Right
-                (pos[0], pos[1] + size),  # Bottom
-                (pos[0] - size, pos[1])  # Left
-            ], 2)
-
+    hits.append((pygame.draw.rect(menu, (173, 216, 230), [450, 10, 80, 50]), "clear", None))
+    pygame.draw.rect(menu, 'black', [450, 10, 80, 50], 2)
+    text = menu_font.render("Clear", True, (0, 0, 0))
+    menu.blit(text, text.get_rect(center=(490, 35)))
+
+    return menu, hits
+
+
+def apply_history(step, data):
+    """Keeps the painting list and scene in line with an undone (step=-1) or redone (step=1) canvas step."""
+    global painting, base_surface, selected
+    selected = None
+    kind, value = data
+    if kind == "stroke":
+        if step < 0:
+            painting.remove(value.stroke)
+            scene.remove(value)
+        else:
+            painting.append(value.stroke)
+            scene.add(value)
+    elif kind == "raster":
+        if step < 0:
+            scene.remove(value)
+        else:
+            scene.add(value)
+    elif kind == "move":
+        obj, dx, dy = value
+        scene.move(obj, dx * step, dy * step)
+    elif kind == "delete":
+        for obj in value:
+            if step < 0:
+                scene.add(obj)
+                if isinstance(obj, StrokeObject):
+                    painting.append(obj.stroke)
+            else:
+                remove_object(obj)
+    elif kind == "clear":
+        if step < 0:
+            painting, objects, base_surface = list(value[0]), value[1], value[2]
+            scene.reset(objects)
+        else:
+            painting, base_surface = [], None
+            scene.reset()
+
+
+def remove_object(obj):
+    scene.remove(obj)
+    if isinstance(obj, StrokeObject):
+        painting.remove(obj.stroke)
+
+
+def redraw_region(rect):
+    """Repaints just rect of the canvas from the base picture and the objects over it."""
+    scene.redraw(canvas.surface, rect, base_surface, canvas.background)
+
+
+def erase_object(obj):
+    """Takes obj off the canvas as part of the undo step in progress."""
+    canvas.touch(obj.rect)
+    remove_object(obj)
+    redraw_region(obj.rect)
+
+
+def raster_patch(surface, tool, start, end, color):
+    """Draws a raster tool onto a transparent patch the size of its bounding box.
+
+    Returns (patch, rect), or None if the tool would change nothing (a fill
+    with the color already there). surface is only read, by the fill.
+    """
+    if tool == FILL_TOOL:
+        if surface.get_at(start) == pygame.Color(color):
+            return None  # Already that color, nothing to fill
+        mask, rect = raster.flood_region(surface, start)
+        patch = pygame.Surface(rect.size, pygame.SRCALPHA)
+        raster.fill_mask(patch, mask[rect.left:rect.right, rect.top:rect.bottom], color)
+    elif tool == LINE_TOOL:
+        rect = raster.line_rect(start, end, LINE_WIDTH)
+        patch = pygame.Surface(rect.size, pygame.SRCALPHA)
+        raster.draw_line(patch, (start[0] - rect.x, start[1] - rect.y), (end[0] - rect.x, end[1] - rect.y),
+                         color, LINE_WIDTH)
+    else:
+        rect = raster.corners_rect(start, end)
+        patch = pygame.Surface(rect.size, pygame.SRCALPHA)
+        if tool == RECT_TOOL:
+            raster.fill_rect(patch, patch.get_rect(), color)
+        else:
+            raster.fill_ellipse(patch, patch.get_rect(), color)
+    return patch, rect
+
+
+def apply_raster_tool(tool, start, end, color):
+    """Runs a raster tool as one undoable step.
+
+    The patch is blitted onto the canvas and kept in the scene as a movable object.
+    """
+    drawn = raster_patch(canvas.surface, tool, start, end, color)
+    if drawn is None:
+        return
+    patch, rect = drawn
+    obj = PatchObject(patch, rect.topleft)
+    canvas.begin()
+    canvas.touch(rect)
+    canvas.surface.blit(patch, rect)
+    scene.add(obj)
+    canvas.end(("raster", obj))
+
+
+def draw_raster_preview(surface, tool, start, end, color):
+    """Shows what releasing the mouse would draw (pygame.draw is fine for a throwaway preview)."""
+    if tool == LINE_TOOL:
+        pygame.draw.line(surface, color, start, end, LINE_WIDTH)
+    elif tool == RECT_TOOL:
+        pygame.draw.rect(surface, color, raster.corners_rect(start, end))
+    elif tool == ELLIPSE_TOOL:
+        pygame.draw.ellipse(surface, color, raster.corners_rect(start, end))
+
+
+def clear_canvas():
+    global painting, base_surface, selected
+    load_document_strokes()  # Undoing the clear has to bring them back
+    canvas.clear(("clear", (painting, scene.objects(), base_surface)))  # Undoable, like any other step
+    painting = []  # Empty the painting list
+    base_surface = None
+    scene.reset()
+    selected = None
+
+
+def draw_op(surface, op):
+    """Draws an op of the shared session onto surface (only draws: no undo step, no scene change).
+
+    Returns the PatchObject a raster op drew, or None.
+    """
+    kind = op[0]
+    if kind == "stamps":
+        _, figure, color, points = op
+        for point in points:
+            draw_shape(surface, color, point, figure)
+    elif kind == "raster":
+        _, tool, color, start, end = op
+        drawn = raster_patch(surface, tool, start, end, color)
+        if drawn is not None:
+            patch, rect = drawn
+            surface.blit(patch, rect)
+            return PatchObject(patch, rect.topleft)
+    elif kind == "clear":
+        surface.fill(canvas.background)
+    return None
+
+
+def apply_remote(event, obj):
+    """Keeps the painting list and scene in line with an op (or snapshot) another painter sent.
+
+    The SharedCanvas has already drawn it (obj is what draw_op returned).
+    No undo step is made (undo is off in a shared session) and a local
+    stroke or drag in progress keeps its own canvas.begin()/end().
+    """
+    global painting, base_surface, selected
+    kind = event[0]
+    if kind == "raster" and obj is not None:
+        scene.add(obj)
+    elif kind in ("clear", "snapshot"):
+        painting = [current_stroke] if current_stroke is not None else []  # Still being drawn
+        base_surface = event[1].convert() if kind == "snapshot" else None  # Joined late: the session's canvas
+        scene.reset()
+        selected = None
+        if kind == "snapshot":
+            canvas.reset_history()
+
+
+def load_document_strokes():
+    """Parses the strokes of an opened document (only done when they are needed)."""
+    global opened_document
+    if opened_document is not None:
+        painting[:0] = opened_document.load_strokes()
+        opened_document = None
+
+
+def draw_shape(surface, color, pos, figure):
+    """Draws one shape of the given figure type onto a surface (a blit of the brush's cached stencil)."""
+    brushes.stamp(surface, figure, color, pos)
+
+
+# Shared session: the canvas is kept in the server's order of everyone's ops
+shared = SharedCanvas(net_client, canvas.surface, draw_op) if net_client is not None else None
 
 # Main game loop
 run = True
+menu_state = None  # (color, figure) the cached menu surface was built for
+profiler = FrameProfiler(("canvas", "menu", "preview", "events", "flip"))  # F3 overlay, F4 trace
 while run:
     # Control game speed
     timer.tick(fps)
-    screen.fill("white")  # Clear screen with white background
-
-    # Display initial guidance message
-    if not color_selected and len(painting) == 0:
-        text = font.render("Choose a color first", True, (0, 0, 0))
-        text_rect = text.get_rect(center=(400, 350))  # Center in the canvas area
-        screen.blit(text, text_rect)
+    profiler.start_frame()
 
     # Get mouse position and click state
     mouse = pygame.mouse.get_pos()
     left_click = pygame.mouse.get_pressed()[0]
 
-    # Create menu and get interactive elements
-    brushes, colors, rgbs, clear_button = draw_menu(active_color)
+    # Object mode: select, move and erase whole shapes
+    if object_mode:
+        if left_click and object_drag is None and mouse[1] > 85:
+            canvas.begin()  # The whole drag is one undo step
+            if active_figure == -1:  # Object eraser
+                object_drag = ("erase", [])
+            else:
+                selected = scene.at_point(mouse)
+                object_drag = ("move", selected, mouse, 0, 0) if selected is not None else ("select",)
+        if object_drag is not None and object_drag[0] == "erase" and left_click:
+            obj = scene.at_point(mouse)
+            if obj is not None:
+                erase_object(obj)
+                object_drag[1].append(obj)
+        elif object_drag is not None and object_drag[0] == "move" and left_click:
+            _, obj, last, total_dx, total_dy = object_drag
+            dx, dy = mouse[0] - last[0], mouse[1] - last[1]
+            if dx or dy:
+                old_rect = obj.rect.copy()
+                dirty = old_rect.union(old_rect.move(dx, dy))
+                canvas.touch(dirty)  # Only the region it left and entered changes
+                scene.move(obj, dx, dy)
+                redraw_region(dirty)
+                object_drag = ("move", obj, mouse, total_dx + dx, total_dy + dy)
+        elif object_drag is not None and not left_click:
+            if object_drag[0] == "erase":
+                canvas.end(("delete", object_drag[1]))
+            elif object_drag[0] == "move":
+                canvas.end(("move", (object_drag[1], object_drag[3], object_drag[4])))
+            else:
+                canvas.end()
+            object_drag = None
+
+    # Raster tools act once, when the mouse is released (fill uses the press position)
+    elif active_figure in RASTER_TOOLS:
+        if left_click and drag_start is None and mouse[1] > 85:
+            drag_start = mouse
+        elif not left_click and drag_start is not None:
+            apply_raster_tool(active_figure, drag_start, (mouse[0], max(mouse[1], 86)), active_color)
+            if net_client is not None:
+                net_client.add_raster(active_figure, active_color, drag_start, (mouse[0], max(mouse[1], 86)))
+            drag_start = None
 
     # Add shapes when clicking in the canvas area
-    if left_click and mouse[1] > 85:  # Only draw below menu bar
-        painting.append((active_color, mouse, active_figure))
+    elif left_click and mouse[1] > 85:  # Only draw below menu bar
+        if current_stroke is None:
+            current_stroke = Stroke(active_color, active_figure)
+            painting.append(current_stroke)
+            canvas.begin()  # The whole stroke is one undo step
+        # The stroke drops repeated samples and fills gaps between fast samples
+        stamps = current_stroke.add_sample(mouse)
+        for point in stamps:
+            canvas.touch(brushes.stamp_rect(active_figure, point))  # Save the tiles underneath before drawing over them
+            draw_shape(canvas.surface, active_color, point, active_figure)  # Rasterize once, onto the canvas
+        if net_client is not None and stamps:
+            net_client.add_stamps(active_figure, active_color, stamps)
+    elif current_stroke is not None:
+        stroke_object = StrokeObject(current_stroke)
+        scene.add(stroke_object)
+        canvas.end(("stroke", stroke_object))  # Button released (or left the canvas): the stroke is done
+        current_stroke = None
+
+    # Shared session: send this frame's ops as one batch, apply everything in the server's order
+    if shared is not None:
+        for own, op, obj in shared.sync():
+            if not own:
+                apply_remote(op, obj)
+
+    screen.blit(canvas.surface, (0, 0))  # Everything painted so far, already rasterized
+
+    # Display initial guidance message
+    if not color_selected and len(painting) == 0 and opened_document is None:
+        text = font.render("Choose a color first", True, (0, 0, 0))
+        text_rect = text.get_rect(center=(400, 350))  # Center in the canvas area
+        screen.blit(text, text_rect)
+    profiler.lap("canvas")  # Input handling, stamping, network sync and the canvas blit
 
-    # Render all existing drawings
-    draw_painting(painting)
+    # Menu is cached; rebuild it (and its hit-test table) only when color or tool changed
+    if menu_state != (active_color, active_figure):
+        menu_state = (active_color, active_figure)
+        menu_surface, menu_hits = build_menu(active_color, active_figure)
+    screen.blit(menu_surface, (0, 0))
+    profiler.lap("menu")
 
     # Show cursor preview (what will be drawn on click)
-    if mouse[1] > 85:  # Only show preview below menu bar
-        if active_figure == -1:  # Eraser
+    if object_mode:
+        screen.blit(mode_text, (10, HEIGHT - 25))
+        if selected is not None:
+            pygame.draw.rect(screen, (0, 120, 215), selected.rect, 1)
+        if active_figure == -1 and mouse[1] > 85:  # Object eraser
+            pygame.draw.circle(screen, (200, 0, 0), mouse, 6, 2)
+    elif drag_start is not None:
+        draw_raster_preview(screen, active_figure, drag_start, (mouse[0], max(mouse[1], 86)), active_color)
+    elif mouse[1] > 85:  # Only show preview below menu bar
+        if active_figure in RASTER_TOOLS:
+            pygame.draw.circle(screen, active_color, mouse, 4)
+            pygame.draw.circle(screen, 'black', mouse, 5, 1)
+        elif active_figure == -1:  # Eraser
             pygame.draw.rect(screen, (200, 200, 200), [mouse[0] - 20, mouse[1] - 20, 40, 40], 2)
-        elif active_figure == 0:  # Circle
-            pygame.draw.circle(screen, active_color, mouse, 20, 2)
-        elif active_figure == 1:  # Rectangle
-            pygame.draw.rect(screen, active_color, [mouse[0] - 15, mouse[1] - 15, 37, 20], 2)
-        elif active_figure == 2:  # Square
-            pygame.draw.rect(screen, active_color, [mouse[0] - 15, mouse[1] - 15, 30, 30], 2)
-        elif active_figure == 3:  # Right triangle
-            pygame.draw.polygon(screen, active_color,
-                                [(mouse[0], mouse[1]), (mouse[0] + 40, mouse[1]), (mouse[0], mouse[1] - 40)], 2)
-        elif active_figure == 4:  # Equilateral triangle
-            side = 40
-            height = side * math.sqrt(3) / 2
-            pygame.draw.polygon(screen, active_color, [
-                (mouse[0], mouse[1] - 2 * height / 3),
-                (mouse[0] - side / 2, mouse[1] + height / 3),
-                (mouse[0] + side / 2, mouse[1] + height / 3)
-            ], 2)
-        elif active_figure == 5:  # Rhombus
-            size = 20
-            pygame.draw.polygon(screen, active_color, [
-                (mouse[0], mouse[1] - size),  # Top
-                (mouse[0] + size, mouse[1]),  # Right
-                (mouse[0], mouse[1] + size),  # Bottom
-                (mouse[0] - size, mouse[1])  # Left
-            ], 2)
+        else:
+            draw_shape(screen, active_color, mouse, active_figure)
+
+    if net_client is not None:
+        if net_text is None or ticks() // 500 != net_text[0]:  # Twice a second
+            net_text = (ticks() // 500, menu_font.render(net_client.status_text(), True, (0, 0, 0)))
+        screen.blit(net_text[1], net_text[1].get_rect(bottomright=(WIDTH - 10, HEIGHT - 8)))
+    profiler.lap("preview")
 
     # Process events
     for event in pygame.event.get():
         if event.type == pygame.QUIT:  # Handle window close button
             run = False
 
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            # Clear canvas when clear button is clicked
-            if clear_button.collidepoint(event.pos):
-                painting = []  # Empty the painting list
-
-            # Handle color selection
-            for i in range(len(colors)):
-                if colors[i].collidepoint(event.pos):
-                    active_color = rgbs[i]
-                    if active_color != (255, 255, 255):  # If not eraser
-                        color_selected = True  # Mark that a color has been selected
-                    if active_color == (255, 255, 255):  # If eraser is selected
-                        active_figure = -1  # Special eraser mode
-
-            # Handle brush/shape selection
-            for brush in brushes:
-                if brush[0].collidepoint(event.pos):
-                    active_figure = brush[1]  # Set active figure to the selected shape
+        if profiler.handle_event(event):  # F3 / F4
+            continue
+
+        busy = current_stroke is not None or drag_start is not None or object_drag is not None
+        local_only = event.type == pygame.KEYDOWN and (event.key in (pygame.K_v, pygame.K_z, pygame.K_y, pygame.K_o)
+                                                       or event.key in (pygame.K_DELETE, pygame.K_BACKSPACE))
+        if net_client is not None and local_only:
+            continue  # Would change the canvas without telling the other painters
+        if event.type == pygame.KEYDOWN and not event.mod & pygame.KMOD_CTRL and not busy:
+            if event.key == pygame.K_v:  # Toggle object mode
+                object_mode = not object_mode
+                selected = None
+            elif event.key in (pygame.K_DELETE, pygame.K_BACKSPACE) and selected is not None:
+                canvas.begin()
+                erase_object(selected)
+                canvas.end(("delete", [selected]))
+                selected = None
+
+        # Undo: Ctrl+Z, Redo: Ctrl+Y or Ctrl+Shift+Z (not while a stroke is being drawn)
+        if event.type == pygame.KEYDOWN and event.mod & pygame.KMOD_CTRL and not busy:
+            if event.key == pygame.K_z and not event.mod & pygame.KMOD_SHIFT:
+                done, data = canvas.undo()
+                if done:
+                    apply_history(-1, data)
+            elif event.key == pygame.K_y or event.key == pygame.K_z:
+                done, data = canvas.redo()
+                if done:
+                    apply_history(1, data)
+            elif event.key == pygame.K_s:  # Save document
+                load_document_strokes()
+                save_document(DOCUMENT_PATH, canvas.surface, painting)
+                print(f"Saved {len(painting)} strokes to {DOCUMENT_PATH}")
+            elif event.key == pygame.K_o:  # Open document: show its raster now, strokes later
+                try:
+                    document = Document(DOCUMENT_PATH)
+                except (OSError, ValueError) as e:
+                    print(f"Could not open {DOCUMENT_PATH}: {e}")
+                else:
+                    if opened_document is not None:
+                        opened_document.close()
+                    document.blit_raster(canvas.surface)
+                    canvas.reset_history()
+                    painting = []
+                    # Its strokes are baked into the raster, which becomes the new base picture
+                    base_surface = canvas.surface.copy()
+                    scene.reset()
+                    selected = None
+                    opened_document = document
+                    print(f"Opened {DOCUMENT_PATH} ({document.stroke_count} strokes)")
+            elif event.key == pygame.K_e:  # Export PNG
+                export_png(EXPORT_PATH, canvas.surface)
+                print(f"Exported {EXPORT_PATH}")
+
+        if event.type == pygame.MOUSEBUTTONDOWN and event.pos[1] < MENU_HEIGHT:
+            # Look the click up in the cached menu's hit-test table
+            for rect, action, value in menu_hits:
+                if rect.collidepoint(event.pos):
+                    if action == "clear":  # Clear canvas when clear button is clicked
+                        clear_canvas()
+                        if net_client is not None:
+                            net_client.add_clear()
+                    elif action == "color":  # Handle color selection
+                        active_color = value
+                        if active_color != (255, 255, 255):  # If not eraser
+                            color_selected = True  # Mark that a color has been selected
+                        else:  # If eraser is selected
+                            active_figure = -1  # Special eraser mode
+                    elif action == "figure":  # Handle brush/shape selection
+                        active_figure = value  # Set active figure to the selected shape
+                        object_mode = False  # Picking a brush goes back to drawing
+                        selected = None
+                    break
+
+    profiler.lap("events")
+    profiler.draw(screen, {"strokes": len(painting), "objects": len(scene), "undo": len(canvas.undo_stack)})
 
     # Update the display
     pygame.display.flip()
+    startup.first_frame()
+    profiler.lap("flip")
+    profiler.end_frame()
 
 # Clean up and exit
+if profiler.trace is not None:
+    profiler.dump_trace()  # Still recording at exit
+if net_client is not None:
+    net_client.close()
 pygame.quit()
@@ -0,0 +1,154 @@
+"""Raster tools that work on the canvas pixels through pygame.surfarray / NumPy.
+
+Surfaces are edited through surfarray.pixels2d, a NumPy view of the mapped
+pixel values indexed [x, y], so fills are array operations instead of one
+Python call per pixel. Every function takes the surface to draw on and
+returns (or works on) the Rect it changed, which is what the tiled canvas
+needs to save for undo.
+"""
+import bisect
+
+import numpy as np
+import pygame
+
+
+def corners_rect(start, end):
+    """The Rect spanned by two corner points, both included."""
+    left, right = sorted((start[0], end[0]))
+    top, bottom = sorted((start[1], end[1]))
+    return pygame.Rect(left, top, right - left + 1, bottom - top + 1)
+
+
+def _mapped(surface, color):
+    """color as the unsigned pixel value surfarray uses (map_rgb is signed for alpha surfaces)."""
+    return surface.map_rgb(color) & 0xFFFFFFFF
+
+
+# --- Shapes ---
+def fill_rect(surface, rect, color):
+    rect = pygame.Rect(rect).clip(surface.get_rect())
+    if rect.width and rect.height:
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[rect.left:rect.right, rect.top:rect.bottom] = _mapped(surface, color)
+        del pixels  # Unlocks the surface
+    return rect
+
+
+def fill_ellipse(surface, rect, color):
+    """Fills the ellipse inscribed in rect."""
+    rect = pygame.Rect(rect)
+    area = rect.clip(surface.get_rect())
+    if not (area.width and area.height):
+        return area
+    # Pixel centers of the clipped area, relative to the ellipse center and radii
+    radius_x, radius_y = rect.width / 2, rect.height / 2
+    xs = (np.arange(area.left, area.right) + 0.5 - rect.left - radius_x) / radius_x
+    ys = (np.arange(area.top, area.bottom) + 0.5 - rect.top - radius_y) / radius_y
+    inside = xs[:, None] ** 2 + ys[None, :] ** 2 <= 1.0
+
+    pixels = pygame.surfarray.pixels2d(surface)
+    pixels[area.left:area.right, area.top:area.bottom][inside] = _mapped(surface, color)
+    del pixels
+    return area
+
+
+def line_rect(start, end, width):
+    """Area a line of the given width between start and end can cover."""
+    return corners_rect(start, end).inflate(width, width)
+
+
+def draw_line(surface, start, end, color, width=1):
+    """Draws a line as width x width squares at every step along it."""
+    (x0, y0), (x1, y1) = start, end
+    steps = max(abs(x1 - x0), abs(y1 - y0)) + 1
+    xs = np.rint(np.linspace(x0, x1, steps)).astype(np.intp)
+    ys = np.rint(np.linspace(y0, y1, steps)).astype(np.intp)
+    # Offsets of the square pen around each point on the line
+    offsets = np.arange(width) - (width - 1) // 2
+    xs = (xs[:, None, None] + offsets[None, :, None]).repeat(width, axis=2).ravel()
+    ys = (ys[:, None, None] + offsets[None, None, :]).repeat(width, axis=1).ravel()
+
+    w, h = surface.get_size()
+    keep = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+    pixels = pygame.surfarray.pixels2d(surface)
+    pixels[xs[keep], ys[keep]] = _mapped(surface, color)
+    del pixels
+    return line_rect(start, end, width).clip(surface.get_rect())
+
+
+# --- Flood fill ---
+def flood_region(surface, pos):
+    """Finds the region a bucket fill at pos would paint.
+
+    Scanline fill over runs: every horizontal run of the clicked color is
+    found for all rows at once with NumPy, then a search walks from the run
+    under pos to the runs overlapping it in the rows above and below. Python
+    only loops over runs (a few per row), never over pixels.
+
+    Returns (mask, rect): a [x, y] bool array of the pixels to fill and their
+    bounding Rect, or (None, None) if pos is outside the surface.
+    """
+    x, y = pos
+    w, h = surface.get_size()
+    if not (0 <= x < w and 0 <= y < h):
+        return None, None
+
+    pixels = pygame.surfarray.pixels2d(surface)
+    same = np.ascontiguousarray((pixels == pixels[x, y]).T)  # [y, x] mask of the color being replaced
+    del pixels
+
+    # Run boundaries: +1 where a run starts, -1 one past where it ends
+    padded = np.zeros((h, w + 2), dtype=np.int8)
+    padded[:, 1:-1] = same
+    edges = np.diff(padded, axis=1)
+    run_rows, run_starts = np.nonzero(edges == 1)
+    _, run_ends = np.nonzero(edges == -1)  # Same row-major order, so they pair up with the starts
+    first_run = np.searchsorted(run_rows, np.arange(h + 1))  # Runs of row r: first_run[r]:first_run[r + 1]
+
+    # Plain lists + bisect: cheaper than a NumPy call per run in the loop below
+    rows, starts, ends = run_rows.tolist(), run_starts.tolist(), run_ends.tolist()
+    first_run = first_run.tolist()
+
+    seed = bisect.bisect_right(starts, x, first_run[y], first_run[y + 1]) - 1
+    seen = bytearray(len(starts))
+    seen[seed] = 1
+    stack = [seed]
+    while stack:
+        run = stack.pop()
+        row, start, end = rows[run], starts[run], ends[run]
+        for other in (row - 1, row + 1):
+            if 0 <= other < h:
+                lo, hi = first_run[other], first_run[other + 1]
+                # Runs in that row that overlap [start, end)
+                first = bisect.bisect_right(ends, start, lo, hi)
+                last = bisect.bisect_left(starts, end, lo, hi)
+                for neighbour in range(first, last):
+                    if not seen[neighbour]:
+                        seen[neighbour] = 1
+                        stack.append(neighbour)
+
+    # Turn the reached runs back into a pixel mask: mark their edges, then a running sum
+    filled = np.frombuffer(seen, dtype=bool)
+    region = np.zeros((h, w + 1), dtype=np.int8)
+    region[run_rows[filled], run_starts[filled]] = 1
+    region[run_rows[filled], run_ends[filled]] = -1
+    mask = np.cumsum(region, axis=1, dtype=np.int8)[:, :w].astype(bool).T
+
+    top, bottom = run_rows[filled].min(), run_rows[filled].max()
+    left, right = run_starts[filled].min(), run_ends[filled].max()
+    return mask, pygame.Rect(left, top, right - left, bottom - top + 1)
+
+
+def fill_mask(surface, mask, color):
+    pixels = pygame.surfarray.pixels2d(surface)
+    pixels[mask] = _mapped(surface, color)
+    del pixels
+
+
+def flood_fill(surface, pos, color):
+    """Bucket fill at pos. Returns the changed Rect, or None if nothing changed."""
+    if not surface.get_rect().collidepoint(pos) or surface.get_at(pos) == pygame.Color(color):
+        return None
+    mask, rect = flood_region(surface, pos)
+    fill_mask(surface, mask, color)
+    return rect
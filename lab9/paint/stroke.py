@@ -0,0 +1,58 @@
+import math
+from array import array
+
+STAMP_SPACING = 8  # Distance in pixels between two stamps along a stroke
+
+
+class Stroke:
+    """One press-drag-release of the mouse with a single brush and color.
+
+    Mouse samples are turned into stamp positions: repeated samples at the
+    same spot are dropped, and fast moves are filled in with stamps every
+    `spacing` pixels so strokes have no gaps. The positions are kept in two
+    array('h') buffers (2 bytes per coordinate) instead of one tuple per frame.
+    """
+
+    __slots__ = ("color", "figure", "spacing", "xs", "ys", "_last", "_carry")
+
+    def __init__(self, color, figure, spacing=STAMP_SPACING):
+        self.color = color
+        self.figure = figure
+        self.spacing = spacing
+        self.xs = array('h')
+        self.ys = array('h')
+        self._last = None  # Last mouse sample
+        self._carry = 0.0  # Distance travelled since the last stamp
+
+    def add_sample(self, pos):
+        """Feeds one mouse position; returns the new stamp positions to draw."""
+        if pos == self._last:
+            return []  # Mouse held still: nothing new
+        if self._last is None:
+            self._last = pos
+            self._stamp(pos)
+            return [pos]
+
+        (x0, y0), (x1, y1) = self._last, pos
+        self._last = pos
+        length = math.hypot(x1 - x0, y1 - y0)
+        stamps = []
+        t = self.spacing - self._carry  # Distance along this segment of the next stamp
+        while t <= length:
+            point = (round(x0 + (x1 - x0) * t / length), round(y0 + (y1 - y0) * t / length))
+            self._stamp(point)
+            stamps.append(point)
+            t += self.spacing
+        self._carry = length - (t - self.spacing)
+        return stamps
+
+    def _stamp(self, point):
+        self.xs.append(point[0])
+        self.ys.append(point[1])
+
+    def points(self):
+        """Yields the stroke's stamp positions in order."""
+        return zip(self.xs, self.ys)
+
+    def __len__(self):
+        return len(self.xs)
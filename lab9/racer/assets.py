@@ -0,0 +1,87 @@
+"""Asset cache for the racer: each image is loaded from disk once.
+
+Images are converted to the display's pixel format as they are loaded
+(convert() for opaque ones, convert_alpha() for sprites with transparency),
+so blitting them doesn't convert pixels every frame. Everyone gets the same
+shared Surface, so callers must copy() before drawing on one. Sounds are
+decoded into the shared AudioManager by preload().
+
+A display mode has to be set before the first image is loaded.
+"""
+import os
+import time
+
+import pygame
+
+IMAGE_DIR = "images"
+
+# name -> (file, has transparency)
+IMAGES = {
+    "background": ("AnimatedStreet.png", False),
+    "player": ("Player.png", True),
+    "enemy": ("Enemy.png", True),
+    "coin": ("coin.png", True),
+}
+
+# name -> file
+SOUNDS = {
+    "crash": "crash.wav",
+}
+MUSIC = "background.wav"  # Streamed, not preloaded
+
+_images = {}
+_variants = {}  # (name, tint, scale) -> Surface
+
+
+def path(filename):
+    return os.path.join(IMAGE_DIR, filename)
+
+
+def image(name):
+    """Returns the shared, display-format Surface for an image name."""
+    surface = _images.get(name)
+    if surface is None:
+        filename, alpha = IMAGES[name]
+        surface = pygame.image.load(path(filename))
+        surface = surface.convert_alpha() if alpha else surface.convert()
+        _images[name] = surface
+    return surface
+
+
+def variant(name, tint=None, scale=1.0):
+    """Returns the image multiplied by tint (an RGB color) and scaled by scale, made once per combination."""
+    key = (name, tint, scale)
+    surface = _variants.get(key)
+    if surface is None:
+        surface = image(name).copy()
+        if tint is not None:
+            surface.fill(tint, special_flags=pygame.BLEND_MULT)
+        if scale != 1.0:
+            size = (int(surface.get_width() * scale), int(surface.get_height() * scale))
+            surface = pygame.transform.scale(surface, size)
+        _variants[key] = surface
+    return surface
+
+
+def preload(variants=(), audio=None, report=print):
+    """Loads every image (and sound, into audio if given) up front, printing progress as it goes.
+
+    variants is a list of (name, tint, scale) to build as well.
+    """
+    sounds = list(SOUNDS) if audio is not None else []
+    total = len(IMAGES) + len(sounds) + len(variants)
+    start = time.perf_counter()
+    done = 0
+    for name in IMAGES:
+        image(name)
+        done += 1
+        report(f"Loading assets {done}/{total}: {IMAGES[name][0]}")
+    for name in sounds:
+        audio.load(name, path(SOUNDS[name]))
+        done += 1
+        report(f"Loading assets {done}/{total}: {SOUNDS[name]}")
+    for name, tint, scale in variants:
+        variant(name, tint, scale)
+        done += 1
+        report(f"Loading assets {done}/{total}: {name} variant {tint} x{scale}")
+    report(f"Loaded {total} assets in {(time.perf_counter() - start) * 1000:.0f} ms")
@@ -0,0 +1,155 @@
+"""Autopilot harness: plays thousands of headless racer games to tune the balance settings.
+
+A policy is a function policy(sim) -> steer (-1, 0 or 1) that looks at a
+RacerSim and decides where to drive. Each game gets a fresh one from
+make(seed), registered with register_policy(), so policies that keep state
+or roll dice do it in their own objects: the game's RNG only spawns the
+world, and a seed gives the same enemies and coins whatever the policy.
+Games run in a process pool, one (policy, settings, seed) job each, and
+the results are summarized as distributions of survival time, coins and
+score.
+
+    python autopilot.py [policy] [runs]   one setting, e.g. python autopilot.py dodger 500
+    python autopilot.py sweep [runs]      every combination in SWEEP
+"""
+import itertools
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import sim
+
+MAX_TIME = 120  # Simulated seconds before a game is called a survival
+LOOKAHEAD = 160  # Pixels above the player the dodger watches for enemies
+MARGIN = 8  # Extra room the dodger leaves beside an enemy
+
+# Settings tried by "sweep" (the racer's SPEED_BOOST_THRESHOLD, SPEED_BOOST_AMOUNT and coin odds)
+SWEEP = {
+    "boost_threshold": (3, 5, 8),
+    "boost_amount": (1, 2),
+    "gold_chance": (0.1, 0.25, 0.5),
+}
+
+POLICIES = {}  # name -> make(seed) -> policy(sim) -> steer
+
+
+def register_policy(name, make):
+    POLICIES[name] = make
+
+
+def stateless(policy):
+    """make(seed) for a policy that is a plain function."""
+    return lambda seed: policy
+
+
+# --- Policies ---
+def idle(racer):
+    """Never steers (how long does standing still last?)."""
+    return 0
+
+
+class Wander:
+    """Steers at random, changing its mind about twice a second."""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)  # Its own dice, not the game's
+        self.steer = 0
+
+    def __call__(self, racer):
+        if racer.steps % 30 == 0:
+            self.steer = self.rng.choice((-1, 0, 1))
+        return self.steer
+
+
+def dodger(racer):
+    """Moves out of the way of enemies coming down its lane, otherwise drives under the nearest coin."""
+    entities, player = racer.entities, racer.player
+    live = entities.alive
+    size = entities.sizes[entities.kind]
+    left, top = entities.x, entities.y
+    bottom = top + size[:, 1]
+    enemies = live & (entities.kind == racer.enemy)
+
+    # Enemies overlapping the player's lane, close above or beside it
+    ahead = (enemies & (bottom > player.top - LOOKAHEAD) & (top < player.bottom)
+             & (left < player.right + MARGIN) & (left + size[:, 0] > player.left - MARGIN))
+    if ahead.any():
+        centers = left[ahead] + size[ahead, 0] / 2
+        threat = centers.mean()
+        room_left, room_right = player.left, sim.SCREEN_WIDTH - player.right
+        if threat > player.centerx and room_left > 0 or room_right <= 0:
+            return -1
+        return 1
+
+    # Nearest coin still above the player
+    coins = live & ~enemies & (bottom < player.bottom)
+    if coins.any():
+        index = np.flatnonzero(coins)[np.argmax(top[coins])]
+        target = left[index] + size[index, 0] / 2
+        if abs(target - player.centerx) > sim.PLAYER_SPEED:
+            return 1 if target > player.centerx else -1
+    return 0
+
+
+register_policy("idle", stateless(idle))
+register_policy("wander", Wander)
+register_policy("dodger", stateless(dodger))
+
+
+# --- Running ---
+def play(job):
+    """Runs one game for a (policy name, settings dict, seed) job; returns its result dict."""
+    policy, settings, seed = job
+    return sim.run(POLICIES[policy](seed), seed=seed, max_time=MAX_TIME, **settings)
+
+
+def run_games(policy, runs, settings=None, workers=None):
+    """Plays runs games with the same settings in a process pool; returns the list of results."""
+    return sweep(policy, runs, [settings or {}], workers)[0]
+
+
+def sweep(policy, runs, settings_list, workers=None):
+    """Plays runs games for every settings dict in settings_list; returns a list of result lists."""
+    jobs = [(policy, settings, seed) for settings in settings_list for seed in range(runs)]
+    with ProcessPoolExecutor(workers, initializer=sim.init_headless) as pool:
+        results = list(pool.map(play, jobs, chunksize=max(1, len(jobs) // (8 * (workers or os.cpu_count() or 1)))))
+    return [results[i * runs:(i + 1) * runs] for i in range(len(settings_list))]
+
+
+def summarize(results):
+    """{stat: (mean, p10, p50, p90)} for survival time, coins and score, plus the share of games survived."""
+    summary = {}
+    for stat in ("time", "coins", "score"):
+        values = np.array([result[stat] for result in results], float)
+        summary[stat] = (values.mean(), *np.percentile(values, (10, 50, 90)))
+    summary["survived"] = np.mean([result["time"] >= MAX_TIME for result in results])
+    return summary
+
+
+def describe(summary):
+    parts = [f"{stat} {mean:6.1f} ({p10:.0f}/{p50:.0f}/{p90:.0f})"
+             for stat, (mean, p10, p50, p90) in ((stat, summary[stat]) for stat in ("time", "coins", "score"))]
+    return "  ".join(parts) + f"  survived {summary['survived'] * 100:3.0f}%"
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    start = time.perf_counter()
+    print("stat mean (p10/p50/p90); time in simulated seconds")
+    if args and args[0] == "sweep":
+        runs = int(args[1]) if len(args) > 1 else 100
+        names = list(SWEEP)
+        settings_list = [dict(zip(names, values)) for values in itertools.product(*SWEEP.values())]
+        for settings, results in zip(settings_list, sweep("dodger", runs, settings_list)):
+            label = " ".join(f"{name}={value}" for name, value in settings.items())
+            print(f"{label:<50} {describe(summarize(results))}")
+        games = runs * len(settings_list)
+    else:
+        policy = args[0] if args else "dodger"
+        games = int(args[1]) if len(args) > 1 else 200
+        print(f"{policy:<10} {describe(summarize(run_games(policy, games)))}")
+    print(f"{games} games in {time.perf_counter() - start:.1f} s on {os.cpu_count()} CPUs")
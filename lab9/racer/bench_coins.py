@@ -0,0 +1,123 @@
+"""Benchmark: coins that re-tint and re-scale on every respawn vs shared variants.
+
+The "before" coin is the original one from start.py: it loads coin.png in
+__init__ and runs a BLEND_MULT fill (and a scale) on each respawn. The
+"after" coin only swaps to a surface prebuilt by coins.build_variants().
+Both move and draw the same number of coins onto a 400x600 screen per frame.
+
+Run with:  python bench_coins.py
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # No window needed
+
+import pygame
+
+pygame.display.init()
+screen = pygame.display.set_mode((400, 600))
+
+import coins
+
+WIDTH, HEIGHT = 400, 600
+FRAMES = 300
+BASE_SPEED = 5
+
+
+class OldCoin(pygame.sprite.Sprite):
+    """The coin as it was: its own image, tinted and scaled on the spot."""
+
+    def __init__(self):
+        super().__init__()
+        self.is_special = random.random() < 0.25
+        self.base_image = pygame.image.load("images/coin.png")
+        self.image = self.base_image.copy()
+        self.image.fill(coins.GOLD if self.is_special else coins.SILVER, special_flags=pygame.BLEND_MULT)
+        if self.is_special:
+            self.image = pygame.transform.scale(self.image, (48, 48))
+        self.rect = self.image.get_rect(center=(random.randint(40, WIDTH - 40), 0))
+        self.speed = max(1, BASE_SPEED // 2 + random.randint(-1, 2))
+
+    def move(self):
+        self.rect.move_ip(0, self.speed)
+        if self.rect.top > HEIGHT:
+            self.reset_position()
+
+    def reset_position(self):
+        self.rect.center = (random.randint(40, WIDTH - 40), 0)
+        self.is_special = random.random() < 0.25
+        if self.is_special:
+            self.image.fill(coins.GOLD, special_flags=pygame.BLEND_MULT)
+            self.image = pygame.transform.scale(self.image, (48, 48))
+        else:
+            self.image.fill(coins.SILVER, special_flags=pygame.BLEND_MULT)
+            self.image = pygame.transform.scale(self.base_image.copy(), self.base_image.get_size())
+
+
+def random_kind():
+    return "gold" if random.random() < coins.GOLD_CHANCE else "silver"
+
+
+class Coin(pygame.sprite.Sprite):
+    """A coin sprite that swaps to the shared variants (before the EntityPool held the coins)."""
+
+    def __init__(self, screen_width, screen_height, base_speed):
+        super().__init__()
+        if not coins.VARIANTS:
+            coins.build_variants()
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset_position()
+
+        # Randomize movement speed (some coins fall faster than others)
+        self.speed = max(1, (base_speed // 2) + random.randint(-1, 2))
+
+    def set_kind(self, kind):
+        """Switches to the shared surface of a coin type, keeping the center"""
+        self.kind = kind
+        self.is_special = kind == "gold"
+        self.image, self.value = coins.VARIANTS[kind]
+        self.rect = self.image.get_rect(center=self.rect.center)
+
+    def move(self):
+        """Moves the coin downwards and respawns randomly when out of screen"""
+        self.rect.move_ip(0, self.speed)
+
+        # Reset coin when it moves off screen
+        if self.rect.top > self.screen_height:
+            self.reset_position()
+
+    def reset_position(self):
+        """Reset coin to a new random type and position at the top of the screen"""
+        self.rect.center = (random.randint(40, self.screen_width - 40), 0)
+        self.set_kind(random_kind())
+
+
+def run(make_coin, count):
+    """Average ms per frame (move + respawn + draw) for count coins, plus respawns per frame."""
+    random.seed(1)
+    group = [make_coin() for _ in range(count)]
+    for i, coin in enumerate(group):
+        coin.rect.y = i * HEIGHT // count  # Spread out, so respawns happen every frame
+    respawns = 0
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        screen.fill((0, 0, 0))
+        for coin in group:
+            top = coin.rect.top
+            coin.move()
+            respawns += coin.rect.top < top
+            screen.blit(coin.image, coin.rect)
+    elapsed = time.perf_counter() - start
+    return elapsed / FRAMES * 1000, respawns / FRAMES
+
+
+if __name__ == "__main__":
+    coins.build_variants()
+    print(f"{'coins':>6} {'respawns/frame':>15} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+    for count in (100, 300, 1000):
+        before, rate = run(OldCoin, count)
+        after, _ = run(lambda: Coin(WIDTH, HEIGHT, BASE_SPEED), count)
+        print(f"{count:>6} {rate:15.1f} {before:10.2f} {after:9.2f} {before / after:7.1f}x")
@@ -0,0 +1,34 @@
+"""Coins for the racer: the gold and silver variants are built once and shared.
+
+build_variants() tints and scales the coin image once for each type. Each
+type becomes a kind of the racer's EntityPool, so a respawning coin just
+changes kind: respawning does no pixel work and the colors can never drift
+from repeated tinting. The collision masks are made by the Collider, from
+the images the pool actually draws.
+"""
+import assets
+
+GOLD = (255, 215, 0)  # Gold color for special coins
+SILVER = (192, 192, 192)  # Silver color for regular coins
+GOLD_CHANCE = 0.25  # Gold coins are less common but worth more
+
+# type -> (tint, scale, value); special coins are slightly larger
+COIN_TYPES = {
+    "gold": (GOLD, 1.2, 3),
+    "silver": (SILVER, 1.0, 1),
+}
+
+VARIANTS = {}  # type -> (surface, value), filled by build_variants()
+
+
+def asset_variants():
+    """The (name, tint, scale) list to hand to assets.preload()."""
+    return [("coin", tint, scale) for tint, scale, _ in COIN_TYPES.values()]
+
+
+def build_variants():
+    """Makes the shared surface of every coin type (once)."""
+    for kind, (tint, scale, value) in COIN_TYPES.items():
+        if kind not in VARIANTS:
+            VARIANTS[kind] = (assets.variant("coin", tint, scale), value)
+    return VARIANTS
@@ -0,0 +1,150 @@
+"""Collision detection for the racer's entity pool: a grid broad phase and a mask narrow phase.
+
+The broad phase is a uniform grid of CELL-pixel cells holding pool indices.
+sync() works out every entity's cell range with NumPy and only re-files
+the entities whose range changed, so with objects moving a few pixels per
+step most steps touch a handful of cells.
+
+The narrow phase tests the candidates pixel by pixel with pygame masks,
+made once per entity kind (not per object), so the car sprites only
+collide where they are actually painted, not anywhere in their rect.
+
+pairs() (e.g. every enemy against every coin) skips the grid: with
+hundreds of objects there are thousands of touching pairs, and a Python
+loop over them costs more than the test itself. Instead each pair of
+kinds gets an overlap table, Mask.convolve() of their two masks, which
+says for every offset between them whether they touch. All the pairs are
+then offset-and-rect tested with NumPy and looked up in the table, with no
+Python code per pair.
+"""
+import numpy as np
+import pygame
+
+CELL = 64  # Grid cell size in pixels (about one sprite)
+UNPLACED = (0, 0, -1, -1)  # Empty cell range, for free slots
+PAIR_CHUNK = 1 << 18  # Pairs pairs() offset-tests per NumPy pass
+
+
+class Collider:
+    def __init__(self, pool, cell_size=CELL):
+        self.pool = pool
+        self.cell_size = cell_size
+        self.cells = {}  # (col, row) -> set of pool indices
+        self.placed = np.tile(UNPLACED, (len(pool.x), 1))  # index -> (col0, row0, col1, row1)
+        self.masks = []  # kind -> Mask of the kind's image
+        self.tables = {}  # (kind a, kind b) -> bool array [dx, dy] of the offsets where they touch
+
+    # --- Broad phase ---
+    def sync(self):
+        """Re-files the entities that moved into other cells since the last sync()."""
+        pool = self.pool
+        if len(self.placed) < len(pool.x):  # The pool grew
+            extra = np.tile(UNPLACED, (len(pool.x) - len(self.placed), 1))
+            self.placed = np.vstack([self.placed, extra])
+        size = pool.sizes[pool.kind]
+        left = pool.x.astype(np.int32)
+        top = pool.y.astype(np.int32)
+        ranges = np.column_stack([left, top, left + size[:, 0] - 1, top + size[:, 1] - 1]) // self.cell_size
+        ranges[~pool.alive] = UNPLACED
+        for i in np.flatnonzero((ranges != self.placed).any(axis=1)).tolist():
+            self._file(i, self.placed[i], discard=True)
+            self._file(i, ranges[i])
+            self.placed[i] = ranges[i]
+
+    def _file(self, i, cell_range, discard=False):
+        col0, row0, col1, row1 = cell_range.tolist()
+        cells = self.cells
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                if discard:
+                    bucket = cells[col, row]
+                    bucket.discard(i)
+                    if not bucket:
+                        del cells[col, row]
+                else:
+                    cells.setdefault((col, row), set()).add(i)
+
+    def candidates(self, rect):
+        """Pool indices filed in the cells rect covers (may include misses)."""
+        size = self.cell_size
+        found = set()
+        for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for col in range(rect.left // size, (rect.right - 1) // size + 1):
+                found.update(self.cells.get((col, row), ()))
+        return found
+
+    # --- Narrow phase ---
+    def mask(self, kind):
+        while len(self.masks) <= kind:  # Kinds added since the last call
+            self.masks.append(pygame.mask.from_surface(self.pool.images[len(self.masks)]))
+        return self.masks[kind]
+
+    def hits(self, rect, mask, kinds=None):
+        """Sorted pool indices (optionally only of the given kinds) whose pixels touch mask placed at rect."""
+        return sorted(self._touching(rect.x, rect.y, rect.w, rect.h, mask, kinds, self._layout()))
+
+    def table(self, kind_a, kind_b):
+        """Overlap table of two kinds: [dx + width_b - 1, dy + height_b - 1] is True if
+        an entity of kind_b placed (dx, dy) from one of kind_a touches it."""
+        key = (kind_a, kind_b)
+        if key not in self.tables:
+            overlaps = self.mask(kind_a).convolve(self.mask(kind_b))
+            self.tables[key] = pygame.surfarray.array_red(overlaps.to_surface()) > 0
+        return self.tables[key]
+
+    def pairs(self, kinds_a, kinds_b):
+        """Sorted (a, b) index pairs of touching entities, a of kinds_a and b of kinds_b."""
+        pool = self.pool
+        alive = pool.alive
+        x, y = pool.x.astype(np.int32), pool.y.astype(np.int32)
+        by_kind = {kind: np.flatnonzero(alive & (pool.kind == kind)) for kind in set(kinds_a) | set(kinds_b)}
+        found_a, found_b = [], []
+        for kind_a in kinds_a:
+            a = by_kind[kind_a]
+            width_a, height_a = pool.sizes[kind_a].tolist()
+            for kind_b in kinds_b:
+                b = by_kind[kind_b]
+                if not len(a) or not len(b):
+                    continue
+                width_b, height_b = pool.sizes[kind_b].tolist()
+                table = self.table(kind_a, kind_b)
+                rows = max(1, PAIR_CHUNK // len(b))  # Bounds the size of the offset arrays
+                for start in range(0, len(a), rows):
+                    chunk = a[start:start + rows]
+                    dx = x[b][None, :] - x[chunk][:, None]
+                    dy = y[b][None, :] - y[chunk][:, None]
+                    near = (dx > -width_b) & (dx < width_a) & (dy > -height_b) & (dy < height_a)
+                    i, j = np.nonzero(near)
+                    touching = table[dx[i, j] + width_b - 1, dy[i, j] + height_b - 1]
+                    found_a.append(chunk[i[touching]])
+                    found_b.append(b[j[touching]])
+        if not found_a:
+            return []
+        found_a, found_b = np.concatenate(found_a), np.concatenate(found_b)
+        different = found_a != found_b  # kinds_a and kinds_b may share kinds
+        found_a, found_b = found_a[different], found_b[different]
+        order = np.lexsort((found_b, found_a))
+        return list(zip(found_a[order].tolist(), found_b[order].tolist()))
+
+    def _layout(self):
+        """Positions, kinds and kind sizes as plain lists (much faster to index than arrays)."""
+        pool = self.pool
+        self.mask(len(pool.images) - 1)  # Masks of every kind exist
+        return (pool.x.astype(np.int32).tolist(), pool.y.astype(np.int32).tolist(),
+                pool.kind.tolist(), pool.sizes.tolist())
+
+    def _touching(self, x, y, width, height, mask, kinds, layout):
+        xs, ys, kind, sizes = layout
+        masks = self.masks
+        right, bottom = x + width, y + height
+        found = []
+        for i in self.candidates(pygame.Rect(x, y, width, height)):
+            k = kind[i]
+            if kinds is not None and k not in kinds:
+                continue
+            left, top = xs[i], ys[i]
+            w, h = sizes[k]
+            if left < right and x < left + w and top < bottom and y < top + h \
+                    and mask.overlap(masks[k], (left - x, top - y)):
+                found.append(i)
+        return found
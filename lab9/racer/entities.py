@@ -0,0 +1,129 @@
+"""Data-oriented storage for the racer's falling objects (enemies and coins).
+
+Instead of one Sprite per object, an EntityPool keeps the position, speed
+and kind of every object in NumPy arrays, so moving all of them is a single
+vectorized add. Objects that leave the screen are either respawned in place
+or their slot goes back on a free list for the next spawn(), so a running
+level doesn't allocate anything. Drawing is one Surface.blits() call.
+
+Kinds are registered with add_kind(image, value) and share that image.
+Per-pixel-alpha images are turned into RLE-accelerated colorkey copies
+first (see solid_copy), because at hundreds of objects the frame time is
+almost all blitting.
+"""
+import numpy as np
+import pygame
+
+COLORKEY = (255, 0, 255)  # Magenta never shows up in the racer's sprites
+
+
+def solid_copy(image, threshold=127):
+    """Returns a colorkey + RLEACCEL copy of a per-pixel-alpha image.
+
+    Pixels with alpha above threshold are kept (blended onto black), the rest
+    become the colorkey. Soft edges turn hard, but the copy blits about 3x
+    faster than the alpha original.
+    """
+    solid = pygame.Surface(image.get_size()).convert()
+    solid.blit(image, (0, 0))
+    transparent = pygame.mask.from_surface(image, threshold)
+    transparent.invert()
+    transparent.to_surface(solid, setcolor=COLORKEY, unsetcolor=None)
+    solid.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    return solid
+
+
+class EntityPool:
+    def __init__(self, capacity=64):
+        self.x = np.zeros(capacity)  # Top-left corner, in (float) pixels
+        self.y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)  # Pixels per step; 0 for free slots
+        self.kind = np.zeros(capacity, np.int16)
+        self.alive = np.zeros(capacity, bool)
+        self.free = list(range(capacity - 1, -1, -1))  # Free slots, lowest index on top
+        self.images = []  # kind -> shared Surface
+        self.sizes = np.zeros((0, 2), np.int32)  # kind -> (width, height)
+        self.values = []  # kind -> points (coin value), 0 for enemies
+
+    def __len__(self):
+        return len(self.x) - len(self.free)
+
+    # --- Kinds ---
+    def add_kind(self, image, value=0, solid=True):
+        """Registers a kind of entity drawn with image; returns its kind number.
+
+        With solid=True an image with per-pixel alpha is drawn from its solid_copy().
+        """
+        if solid and image.get_flags() & pygame.SRCALPHA:
+            image = solid_copy(image)
+        self.images.append(image)
+        self.sizes = np.vstack([self.sizes, image.get_size()])
+        self.values.append(value)
+        return len(self.images) - 1
+
+    # --- Spawning and recycling ---
+    def spawn(self, kind, center, speed):
+        """Puts an entity in a free slot (growing the arrays if there is none) and returns its index."""
+        if not self.free:
+            self._grow()
+        i = self.free.pop()
+        self.alive[i] = True
+        self.speed[i] = speed
+        self.respawn(i, kind, center)
+        return i
+
+    def respawn(self, i, kind, center):
+        """Reuses entity i as a kind at a new center, keeping its slot and speed."""
+        width, height = self.sizes[kind]
+        self.kind[i] = kind
+        self.x[i] = center[0] - width // 2
+        self.y[i] = center[1] - height // 2
+
+    def release(self, i):
+        """Frees entity i's slot for the next spawn()."""
+        self.alive[i] = False
+        self.speed[i] = 0
+        self.free.append(i)
+
+    def _grow(self):
+        old = len(self.x)
+        for name in ("x", "y", "speed", "kind", "alive"):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+        self.free.extend(range(2 * old - 1, old - 1, -1))
+
+    # --- Update ---
+    def update(self, bottom, steps=1.0):
+        """Moves everything down by speed * steps; returns the indices that went below bottom."""
+        self.y += self.speed * steps  # Free slots have speed 0
+        return np.flatnonzero(self.alive & (self.y > bottom))
+
+    def add_speed(self, kind, amount):
+        self.speed[self.alive & (self.kind == kind)] += amount
+
+    # --- Queries ---
+    def indices(self):
+        return np.flatnonzero(self.alive)
+
+    def rect(self, i):
+        width, height = self.sizes[self.kind[i]]
+        return pygame.Rect(int(self.x[i]), int(self.y[i]), width, height)
+
+    def overlapping(self, rect):
+        """Indices of live entities whose rect overlaps rect (a vectorized rect test)."""
+        size = self.sizes[self.kind]
+        left = self.x.astype(np.int32)
+        top = self.y.astype(np.int32)
+        hit = (self.alive & (left < rect.right) & (left + size[:, 0] > rect.left)
+               & (top < rect.bottom) & (top + size[:, 1] > rect.top))
+        return np.flatnonzero(hit)
+
+    # --- Drawing ---
+    def draw(self, surface, y=None):
+        """Blits every live entity; y replaces the y array (e.g. positions between two steps)."""
+        live = self.indices()
+        images = self.images
+        y = self.y if y is None else y
+        surface.blits(zip([images[kind] for kind in self.kind[live].tolist()],
+                          zip(self.x[live].astype(np.int32).tolist(), y[live].astype(np.int32).tolist())),
+                      doreturn=False)
@@ -0,0 +1,45 @@
+"""Drawing helpers for the racer: the scrolling road and cached HUD text.
+
+Road keeps the street image as one display-format strip and draws it at
+a scroll offset with two blits, the bottom of the strip wrapping around
+to the top. Together the two blits cover the screen exactly once, so a
+moving road costs the same as blitting a static background.
+
+CachedText renders a label only when its value changes, so the HUD costs
+one blit per label on frames where the score stays the same.
+"""
+import pygame
+
+
+class Road:
+    def __init__(self, image):
+        self.strip = image.convert()  # Opaque and in the display's pixel format
+        self.height = self.strip.get_height()
+        self.offset = 0.0  # How far the road has scrolled down, in pixels
+
+    def scroll(self, distance):
+        self.offset = (self.offset + distance) % self.height
+
+    def draw(self, surface, offset=None):
+        """Blits the strip scrolled down by offset (default: the current scroll)."""
+        split = int(self.offset if offset is None else offset) % self.height
+        width = self.strip.get_width()
+        # The part that scrolled off the bottom comes back in at the top
+        surface.blit(self.strip, (0, 0), (0, self.height - split, width, split))
+        surface.blit(self.strip, (0, split), (0, 0, width, self.height - split))
+
+
+class CachedText:
+    def __init__(self, font, color, template):
+        self.font = font
+        self.color = color
+        self.template = template  # e.g. "Score: {}"
+        self.value = None
+        self.surface = None
+
+    def render(self, value):
+        """Returns the label for value, re-rendering only if value changed."""
+        if self.surface is None or value != self.value:
+            self.value = value
+            self.surface = self.font.render(self.template.format(value), True, self.color)
+        return self.surface
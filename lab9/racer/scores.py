@@ -0,0 +1,130 @@
+"""Racer high scores: a write-ahead file in front of an indexed SQLite table.
+
+record() appends the result as one JSON line to WAL_PATH and returns; the
+game loop never waits for SQLite. A background thread moves the rows into
+the database in batches (every BATCH_SIZE rows or FLUSH_INTERVAL seconds,
+one transaction each) and then empties the write-ahead file. Rows left in
+it by a crash are inserted at the next start; each row has a unique id,
+so inserting one twice is harmless.
+
+The same thread opens the database and loads the leaderboard, so creating
+a ScoreStore costs nothing up front: top() returns None until the first
+load is done, and includes rows that aren't flushed yet.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+DB_PATH = "racer_scores.db"
+WAL_PATH = "racer_scores.wal"
+BATCH_SIZE = 20
+FLUSH_INTERVAL = 5.0  # Seconds
+LEADERBOARD_SIZE = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id TEXT PRIMARY KEY,
+    played_at REAL NOT NULL,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    coins INTEGER NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_rank ON scores (score DESC, coins DESC);
+"""
+COLUMNS = ("id", "played_at", "name", "score", "coins", "seconds")
+
+
+def rank(row):
+    return -row["score"], -row["coins"]
+
+
+class ScoreStore:
+    def __init__(self, db_path=DB_PATH, wal_path=WAL_PATH, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.wal_path = wal_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()  # Guards pending, leaderboard and the write-ahead file
+        self.pending = []  # Rows in the write-ahead file, not yet in SQLite
+        self.leaderboard = None  # Top rows from SQLite, once loaded
+        self.wake = queue.Queue()  # One item per new row; None means close
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    # --- Game thread ---
+    def record(self, score, coins, seconds, name="player"):
+        """Appends a finished game to the write-ahead file and returns the row (doesn't touch SQLite)."""
+        row = {"id": uuid.uuid4().hex, "played_at": time.time(), "name": name,
+               "score": score, "coins": coins, "seconds": round(seconds, 2)}
+        with self.lock:
+            with open(self.wal_path, "a") as wal:
+                wal.write(json.dumps(row) + "\n")
+            self.pending.append(row)
+        self.wake.put(row)
+        return row
+
+    def top(self, n=LEADERBOARD_SIZE):
+        """The n best rows (dicts) including unflushed ones, or None while the leaderboard is still loading."""
+        with self.lock:
+            if self.leaderboard is None:
+                return None
+            rows = {row["id"]: row for row in self.leaderboard + self.pending}
+        return sorted(rows.values(), key=rank)[:n]
+
+    def close(self, timeout=2.0):
+        """Flushes what is left and stops the background thread."""
+        self.wake.put(None)
+        self.thread.join(timeout)
+
+    # --- Background thread ---
+    def _worker(self):
+        db = sqlite3.connect(self.db_path)
+        db.executescript(SCHEMA)
+        self._recover()
+        self._flush(db)  # Leftovers from a crash
+        last_flush = time.monotonic()
+        closing = False
+        while not closing:
+            try:
+                closing = self.wake.get(timeout=self.flush_interval) is None
+            except queue.Empty:
+                pass
+            with self.lock:
+                waiting = len(self.pending)
+            due = time.monotonic() - last_flush >= self.flush_interval
+            if waiting and (closing or due or waiting >= self.batch_size):
+                self._flush(db)
+                last_flush = time.monotonic()
+        db.close()
+
+    def _recover(self):
+        if not os.path.exists(self.wal_path):
+            return
+        with self.lock, open(self.wal_path) as wal:
+            for line in wal:
+                try:
+                    self.pending.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass  # Torn last line from a crash mid-write
+
+    def _flush(self, db):
+        """Inserts the pending rows in one transaction, empties the write-ahead file and reloads the leaderboard."""
+        with self.lock:
+            rows = list(self.pending)
+        if rows:
+            with db:
+                db.executemany(f"INSERT OR IGNORE INTO scores VALUES ({', '.join('?' * len(COLUMNS))})",
+                               [tuple(row[column] for column in COLUMNS) for row in rows])
+        cursor = db.execute(f"SELECT {', '.join(COLUMNS)} FROM scores "
+                            f"ORDER BY score DESC, coins DESC LIMIT {LEADERBOARD_SIZE}")
+        leaderboard = [dict(zip(COLUMNS, values)) for values in cursor]
+        with self.lock:
+            del self.pending[:len(rows)]
+            with open(self.wal_path, "w") as wal:  # Keep only rows recorded during the insert
+                wal.writelines(json.dumps(row) + "\n" for row in self.pending)
+            self.leaderboard = leaderboard
@@ -0,0 +1,203 @@
+"""The racer's rules as a fixed-timestep simulation, separate from drawing.
+
+RacerSim.step(steer) advances the game by exactly STEP seconds whatever
+the frame rate, so a slow machine drops frames instead of running in slow
+motion. start.py runs it from an accumulator and draws between the last
+two steps (lerp() gives the in-between positions). Without a window,
+run() steps it as fast as it can, for balancing runs:
+
+    python sim.py [runs]
+"""
+import os
+import random
+import time
+
+import numpy as np
+import pygame
+
+import assets
+from coins import GOLD_CHANCE, VARIANTS, build_variants
+from collision import Collider
+from entities import EntityPool
+
+STEP = 1 / 60  # Seconds per simulation step (one frame of the original game)
+
+# Game settings
+SCREEN_WIDTH = 400
+SCREEN_HEIGHT = 600
+START_SPEED = 5  # Pixels per step
+SPEED_RAMP = 0.1  # Base speed gained per second
+PLAYER_SPEED = 5  # Pixels per step while steering
+
+# Speed increase threshold - increase enemy speed every N coins
+SPEED_BOOST_THRESHOLD = 5  # Increase speed every 5 coins collected
+SPEED_BOOST_AMOUNT = 1  # How much to increase speed by
+
+# Falling objects on screen at once (hard levels can use hundreds)
+ENEMY_COUNT = 1
+COIN_COUNT = 3
+
+
+class RacerSim:
+    def __init__(self, seed=None, boost_threshold=SPEED_BOOST_THRESHOLD, boost_amount=SPEED_BOOST_AMOUNT,
+                 gold_chance=GOLD_CHANCE, enemies=ENEMY_COUNT, coins=COIN_COUNT):
+        """Sets up a new game. Needs a display mode set (images are loaded for sizes and masks)."""
+        self.rng = random.Random(seed)
+        self.boost_threshold = boost_threshold
+        self.boost_amount = boost_amount
+        self.gold_chance = gold_chance
+
+        # Falling objects: enemies and coins live in one pool of NumPy arrays
+        build_variants()
+        self.entities = EntityPool()
+        self.enemy = self.entities.add_kind(assets.image("enemy"))
+        self.coin_kind = {kind: self.entities.add_kind(image, value) for kind, (image, value) in VARIANTS.items()}
+        self.collider = Collider(self.entities)  # Grid of the pool, plus a mask per kind
+
+        # Player, positioned near the bottom
+        self.player_image = assets.image("player")
+        self.player_mask = pygame.mask.from_surface(self.player_image)  # Pixel-exact collisions
+        self.player = self.player_image.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 80))
+
+        self.speed = START_SPEED  # Base game speed, rising over time
+        self.distance = 0.0  # How far the road has scrolled
+        self.score = 0
+        self.coins_collected = 0
+        self.last_speed_boost = 0
+        self.steps = 0
+        self.crashed = False
+
+        for _ in range(enemies):
+            self.entities.spawn(self.enemy, self.spawn_point(), self.speed)
+        for _ in range(coins):  # Coins with different weights
+            self.entities.spawn(self.random_coin(), self.spawn_point(), self.coin_speed())
+
+        # Where things were one step ago, for interpolated drawing
+        self.prev_y = self.entities.y.copy()
+        self.prev_player_x = self.player.x
+        self.prev_distance = self.distance
+
+    @property
+    def time(self):
+        return self.steps * STEP
+
+    # --- Spawning ---
+    def spawn_point(self):
+        """Random center just above the visible road"""
+        return (self.rng.randint(40, SCREEN_WIDTH - 40), 0)
+
+    def coin_speed(self):
+        """Randomize coin speed (some coins fall faster than others)"""
+        return max(1, (self.speed // 2) + self.rng.randint(-1, 2))
+
+    def random_coin(self):
+        return self.coin_kind["gold" if self.rng.random() < self.gold_chance else "silver"]
+
+    def respawn_coin(self, i):
+        self.entities.respawn(i, self.random_coin(), self.spawn_point())
+        self.prev_y[i] = self.entities.y[i]  # Jumped, so don't draw it sliding there
+
+    # --- Stepping ---
+    def step(self, steer=0):
+        """Advances one STEP with the player steering -1 (left), 0 or 1 (right).
+
+        Returns a list of events for the front end: ("coin", value),
+        ("boost", new_level) and ("crash",).
+        """
+        entities = self.entities
+        events = []
+        self.prev_y = entities.y.copy()
+        self.prev_player_x = self.player.x
+        self.prev_distance = self.distance
+        self.steps += 1
+
+        self.speed += SPEED_RAMP * STEP  # Gradually increase base game speed over time
+        self.distance += self.speed
+
+        # Move the player, keeping it on the screen
+        if steer < 0 and self.player.left > 0:
+            self.player.move_ip(-PLAYER_SPEED, 0)
+        if steer > 0 and self.player.right < SCREEN_WIDTH:
+            self.player.move_ip(PLAYER_SPEED, 0)
+
+        # Every enemy and coin in one vectorized step
+        for i in entities.update(SCREEN_HEIGHT).tolist():
+            if entities.kind[i] == self.enemy:
+                self.score += 1  # Increase score when an enemy passes
+                entities.respawn(i, self.enemy, self.spawn_point())
+                self.prev_y[i] = entities.y[i]
+            else:
+                self.respawn_coin(i)
+
+        # Collision detection: grid lookup around the player, then mask overlap
+        self.collider.sync()
+        for i in self.collider.hits(self.player, self.player_mask):
+            kind = entities.kind[i]
+            if kind == self.enemy:
+                self.crashed = True
+                continue
+
+            # Add coin's value to total collected
+            value = entities.values[kind]
+            self.coins_collected += value
+            events.append(("coin", value))
+
+            # Increase enemy speed when player reaches a coin threshold
+            if self.coins_collected // self.boost_threshold > self.last_speed_boost:
+                entities.add_speed(self.enemy, self.boost_amount)
+                self.last_speed_boost = self.coins_collected // self.boost_threshold
+                events.append(("boost", self.last_speed_boost))
+
+            # Reset coin to new position after collection
+            self.respawn_coin(i)
+
+        if self.crashed:
+            events.append(("crash",))
+        return events
+
+    # --- Interpolation ---
+    def lerp(self, alpha):
+        """(entity ys, player x, road distance) alpha of the way from the previous step to the current one."""
+        y = self.prev_y + (self.entities.y - self.prev_y) * alpha
+        player_x = round(self.prev_player_x + (self.player.x - self.prev_player_x) * alpha)
+        return y, player_x, self.prev_distance + (self.distance - self.prev_distance) * alpha
+
+    def result(self):
+        return {"time": self.time, "score": self.score, "coins": self.coins_collected, "speed": self.speed}
+
+
+def init_headless():
+    """Sets up pygame without a window, enough to load the images the rules need."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+
+def run(policy=None, seed=None, max_time=600, **settings):
+    """Plays one game headless, as fast as possible, and returns sim.result().
+
+    policy(sim) returns the steer for each step (default: never steer).
+    The game stops at the first crash or after max_time simulated seconds.
+    """
+    sim = RacerSim(seed, **settings)
+    max_steps = int(max_time / STEP)
+    while not sim.crashed and sim.steps < max_steps:
+        sim.step(policy(sim) if policy else 0)
+    return sim.result()
+
+
+if __name__ == "__main__":
+    import sys
+
+    init_headless()
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    start = time.perf_counter()
+    results = [run(seed=seed) for seed in range(runs)]
+    elapsed = time.perf_counter() - start
+    steps = sum(result["time"] for result in results) / STEP
+    print(f"{runs} runs, {steps:.0f} steps in {elapsed:.2f} s ({steps / elapsed:.0f} steps/s, "
+          f"{steps / elapsed * STEP:.0f}x real time)")
+    times = np.array([result["time"] for result in results])
+    print(f"survival: mean {times.mean():.1f} s, max {times.max():.1f} s; "
+          f"mean score {np.mean([result['score'] for result in results]):.1f}")
@@ -1,13 +1,25 @@
-import pygame, sys
-from pygame.locals import *
-import random, time
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pgcommon.bootstrap import Startup
+
+# Initializing only the pygame modules the game uses (the mixer is started by the AudioManager)
+startup = Startup("Racer", ("display", "font"))
 
-# Initializing pygame
-pygame.init()
+import pygame
+from pygame.locals import *
+import assets
+from coins import asset_variants
+from render import CachedText, Road
+from scores import ScoreStore
+from sim import STEP, SCREEN_WIDTH, SCREEN_HEIGHT, RacerSim
+from pgcommon.audio import AudioManager
+startup.mark("imports")
 
 # Setting up FPS (Frames Per Second)
 FPS = 60
 FramePerSec = pygame.time.Clock()
+MAX_FRAME_TIME = 0.25  # Longer frames (e.g. dragging the window) are cut, not caught up
 
 # Creating colors using RGB values
 BLUE = (0, 0, 255)
@@ -15,252 +27,139 @@ RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
-GOLD = (255, 215, 0)  # Gold color for special coins
-SILVER = (192, 192, 192)  # Silver color for regular coins
-
-# Game settings
-SCREEN_WIDTH = 400
-SCREEN_HEIGHT = 600
-SPEED = 5
-SCORE = 0
-COINS_COLLECTED = 0  # Counter to track collected coins
 
-# Speed increase threshold - increase enemy speed every N coins
-SPEED_BOOST_THRESHOLD = 5  # Increase speed every 5 coins collected
-SPEED_BOOST_AMOUNT = 1  # How much to increase speed by
+# How long the crash and game over screens last, in seconds
+CRASH_PAUSE = 0.5  # Brief pause after collision
+GAME_OVER_TIME = 2
+BOOST_MESSAGE_TIME = 0.5
 
 # Setting up Fonts
 font = pygame.font.SysFont("Verdana", 60)
 font_small = pygame.font.SysFont("Verdana", 20)
 game_over = font.render("Game Over", True, BLACK)
-
-# Load background image
-background = pygame.image.load("images/AnimatedStreet.png")
+boost_message = font_small.render("Speed Boost!", True, RED)
+startup.mark("fonts")  # SysFont scans the installed fonts
 
 # Create and configure game display window
 DISPLAYSURF = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 DISPLAYSURF.fill(WHITE)
 pygame.display.set_caption("Coin Collector")
+startup.mark("window")
 
+# Load every image and sound once, in the display's pixel format (needs the window first)
+audio = AudioManager()
+startup.mark("audio")
+assets.preload(asset_variants(), audio)
+audio.play_music(assets.path(assets.MUSIC), volume=0.5)  # Streams while the game runs
+startup.mark("assets")
+road = Road(assets.image("background"))  # Scrolls at the base game speed
 
-# Enemy class - obstacles the player must avoid
-class Enemy(pygame.sprite.Sprite):
-    def __init__(self):
-        """Initialize enemy with image and random position at top of screen"""
-        super().__init__()
-        self.image = pygame.image.load("images/Enemy.png")
-        self.rect = self.image.get_rect()
-        self.rect.center = (random.randint(40, SCREEN_WIDTH - 40), 0)
-        self.speed = SPEED  # Initialize with the default speed
-
-    def move(self):
-        """Moves the enemy downwards and respawns at a random position when out of screen."""
-        global SCORE
-        # Move enemy down based on current speed
-        self.rect.move_ip(0, self.speed)
-
-        # Reset enemy when it moves off screen
-        if self.rect.top > SCREEN_HEIGHT:
-            SCORE += 1  # Increase score when an enemy passes
-            self.rect.top = 0
-            self.rect.center = (random.randint(40, SCREEN_WIDTH - 40), 0)
-
-    def increase_speed(self, amount):
-        """Increase the enemy's movement speed"""
-        self.speed += amount
-
-
-# Player class - controlled by the user
-class Player(pygame.sprite.Sprite):
-    def __init__(self):
-        """Initialize player with image and starting position"""
-        super().__init__()
-        self.image = pygame.image.load("images/Player.png")
-        self.rect = self.image.get_rect()
-        self.rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT - 80)  # Position near bottom
-
-    def move(self):
-        """Handles player movement with keyboard and enforces screen boundaries"""
-        pressed_keys = pygame.key.get_pressed()
-
-        # Move left if left arrow pressed and not at screen edge
-        if self.rect.left > 0 and pressed_keys[K_LEFT]:
-            self.rect.move_ip(-5, 0)
-
-        # Move right if right arrow pressed and not at screen edge
-        if self.rect.right < SCREEN_WIDTH and pressed_keys[K_RIGHT]:
-            self.rect.move_ip(5, 0)
-
-
-# Coin class - collectible items with different values
-class Coin(pygame.sprite.Sprite):
-    def __init__(self):
-        """Initialize coin with random weight/value and position"""
-        super().__init__()
-
-        # Randomly determine if this is a special (gold) coin or regular (silver) coin
-        # Gold coins are less common (25% chance) but worth more points
-        self.is_special = random.random() < 0.25
-
-        # Set coin value based on type
-        self.value = 3 if self.is_special else 1
-
-        # Load base coin image
-        self.base_image = pygame.image.load("images/coin.png")
-
-        # Create colored coin based on type (gold or silver)
-        self.image = self.base_image.copy()
-
-        # Color the coin surface based on type
-        if self.is_special:
-            # Gold coin (worth more)
-            pygame.Surface.fill(self.image, GOLD, special_flags=pygame.BLEND_MULT)
-        else:
-            # Silver coin (regular value)
-            pygame.Surface.fill(self.image, SILVER, special_flags=pygame.BLEND_MULT)
-
-        # Set the coin's size based on value (bigger = worth more)
-        if self.is_special:
-            # Make special coins slightly larger
-            new_size = (int(self.base_image.get_width() * 1.2),
-                        int(self.base_image.get_height() * 1.2))
-            self.image = pygame.transform.scale(self.image, new_size)
+# HUD labels, re-rendered only when the numbers change
+score_text = CachedText(font_small, BLACK, "Score: {}")
+coins_text = CachedText(font_small, BLACK, "Coins: {}")
 
-        # Set up position
-        self.rect = self.image.get_rect()
-        self.rect.center = (random.randint(40, SCREEN_WIDTH - 40), 0)
+# The game rules (player, enemies, coins, score) run in fixed steps
+sim = RacerSim()
 
-        # Randomize movement speed (some coins fall faster than others)
-        self.speed = (SPEED // 2) + random.randint(-1, 2)
-        if self.speed < 1:  # Ensure minimum speed
-            self.speed = 1
+# High scores: opened and loaded in the background, so the first frame doesn't wait
+scores = ScoreStore()
+PLAYER_NAME = sys.argv[sys.argv.index("--name") + 1] if "--name" in sys.argv else "player"
+leaderboard = None  # Rendered lines, once the scores are loaded
+startup.mark("game")
 
-    def move(self):
-        """Moves the coin downwards and respawns randomly when out of screen"""
-        self.rect.move_ip(0, self.speed)
 
-        # Reset coin when it moves off screen
-        if self.rect.top > SCREEN_HEIGHT:
-            self.reset_position()
+def steer():
+    """Left/right arrow keys -> -1, 0 or 1"""
+    pressed_keys = pygame.key.get_pressed()
+    return pressed_keys[K_RIGHT] - pressed_keys[K_LEFT]
 
-    def reset_position(self):
-        """Reset coin to a new random position at the top of the screen"""
-        self.rect.top = 0
-        self.rect.center = (random.randint(40, SCREEN_WIDTH - 40), 0)
 
-        # Randomize coin type and value on respawn
-        self.is_special = random.random() < 0.25
-        self.value = 3 if self.is_special else 1
+def draw_game(alpha):
+    """Draws the road, HUD and sprites alpha of the way between the last two steps"""
+    y, player_x, distance = sim.lerp(alpha)
+    road.draw(DISPLAYSURF, distance)
 
-        # Refresh coin appearance
-        if self.is_special:
-            pygame.Surface.fill(self.image, GOLD, special_flags=pygame.BLEND_MULT)
-            new_size = (int(self.base_image.get_width() * 1.2),
-                        int(self.base_image.get_height() * 1.2))
-            self.image = pygame.transform.scale(self.image, new_size)
-        else:
-            pygame.Surface.fill(self.image, SILVER, special_flags=pygame.BLEND_MULT)
-            self.image = pygame.transform.scale(self.base_image.copy(),
-                                                (self.base_image.get_width(),
-                                                 self.base_image.get_height()))
-
-
-# Setting up initial game sprites
-P1 = Player()
-E1 = Enemy()
-
-# Create multiple coins with different weights
-coins = pygame.sprite.Group()
-for _ in range(3):  # Create 3 coins with different properties
-    new_coin = Coin()
-    coins.add(new_coin)
-
-# Creating Sprite Groups for collision detection and rendering
-enemies = pygame.sprite.Group()
-enemies.add(E1)
-
-all_sprites = pygame.sprite.Group()
-all_sprites.add(P1, E1)
-for coin in coins:
-    all_sprites.add(coin)
-
-# Adding a new User event for general timing
-INC_SPEED = pygame.USEREVENT + 1
-pygame.time.set_timer(INC_SPEED, 1000)  # Trigger every 1 second
-
-# Track when the last enemy speed boost occurred
-last_speed_boost = 0
+    # Display Score and Coins Collected as HUD elements
+    DISPLAYSURF.blit(score_text.render(sim.score), (10, 10))  # Top left corner
+    DISPLAYSURF.blit(coins_text.render(sim.coins_collected), (SCREEN_WIDTH - 100, 10))  # Top right corner
+
+    # Draw all sprites on the screen (one batched blit for the pool)
+    DISPLAYSURF.blit(sim.player_image, (player_x, sim.player.y))
+    sim.entities.draw(DISPLAYSURF, y)
+
+    if boost_timer > 0:  # Display speed boost notification
+        DISPLAYSURF.blit(boost_message, (SCREEN_WIDTH // 2 - 50, SCREEN_HEIGHT // 2))
+
+
+def draw_game_over():
+    DISPLAYSURF.fill(RED)
+    DISPLAYSURF.blit(game_over, (30, 250))
+    final_score = font_small.render(f"Final Score: {sim.score}", True, WHITE)
+    final_coins = font_small.render(f"Coins Collected: {sim.coins_collected}", True, WHITE)
+    DISPLAYSURF.blit(final_score, (SCREEN_WIDTH // 2 - 60, SCREEN_HEIGHT // 2))
+    DISPLAYSURF.blit(final_coins, (SCREEN_WIDTH // 2 - 80, SCREEN_HEIGHT // 2 + 30))
+
+    # High scores, rendered once they have loaded
+    global leaderboard
+    if leaderboard is None:
+        top = scores.top(5)
+        if top is None:
+            DISPLAYSURF.blit(font_small.render("Loading high scores...", True, WHITE), (SCREEN_WIDTH // 2 - 110, 400))
+            return
+        lines = ["High Scores"] + [f"{n}. {row['name']}  {row['score']}  ({row['coins']} coins)"
+                                   for n, row in enumerate(top, 1)]
+        leaderboard = [font_small.render(line, True, WHITE) for line in lines]
+    for i, text in enumerate(leaderboard):
+        DISPLAYSURF.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, 400 + 28 * i))
+
+
+def quit_game():
+    scores.close()  # Flushes this game's score to SQLite
+    pygame.quit()
+    sys.exit()
+
+
+# Game states: "playing" -> "crashed" (brief pause) -> "game_over" -> exit
+state = "playing"
+state_time = 0.0  # Seconds spent in the current state
+boost_timer = 0.0
+accumulator = 0.0  # Real time not yet simulated
 
 # Game Loop
 while True:
+    frame_time = min(FramePerSec.tick(FPS) / 1000, MAX_FRAME_TIME)
+    state_time += frame_time
+    boost_timer -= frame_time
+
     # Process game events
     for event in pygame.event.get():
-        if event.type == INC_SPEED:
-            SPEED += 0.1  # Gradually increase base game speed over time
         if event.type == QUIT:
-            pygame.quit()
-            sys.exit()
-
-    # Draw background on the display surface
-    DISPLAYSURF.blit(background, (0, 0))
-
-    # Display Score and Coins Collected as HUD elements
-    score_display = font_small.render(f"Score: {SCORE}", True, BLACK)
-    coin_display = font_small.render(f"Coins: {COINS_COLLECTED}", True, BLACK)
-    DISPLAYSURF.blit(score_display, (10, 10))  # Top left corner
-    DISPLAYSURF.blit(coin_display, (SCREEN_WIDTH - 100, 10))  # Top right corner
-
-    # Move all game sprites according to their movement patterns
-    P1.move()
-    E1.move()
-    for coin in coins:
-        coin.move()
-
-    # Draw all sprites on the screen
-    for entity in all_sprites:
-        DISPLAYSURF.blit(entity.image, entity.rect)
-
-    # Collision detection for coins
-    # Check if player has collided with any coin
-    coin_collisions = pygame.sprite.spritecollide(P1, coins, False)
-    for coin in coin_collisions:
-        # Add coin's value to total collected
-        COINS_COLLECTED += coin.value
-
-        # Check if player has reached a speed boost threshold
-        if (COINS_COLLECTED // SPEED_BOOST_THRESHOLD) > last_speed_boost:
-            # Increase enemy speed when player reaches coin threshold
-            E1.increase_speed(SPEED_BOOST_AMOUNT)
-            last_speed_boost = COINS_COLLECTED // SPEED_BOOST_THRESHOLD
-
-            # Display speed boost notification
-            boost_message = font_small.render("Speed Boost!", True, RED)
-            DISPLAYSURF.blit(boost_message, (SCREEN_WIDTH // 2 - 50, SCREEN_HEIGHT // 2))
-            pygame.display.update()  # Force an immediate update to show message
-
-        # Reset coin to new position after collection
-        coin.reset_position()
-
-    # Collision detection for enemy - game over if player hits enemy
-    if pygame.sprite.spritecollideany(P1, enemies):
-        # Play crash sound
-        pygame.mixer.Sound('images/crash.wav').play()
-        time.sleep(0.5)  # Brief pause after collision
-
-        # Show game over screen
-        DISPLAYSURF.fill(RED)
-        DISPLAYSURF.blit(game_over, (30, 250))
-        final_score = font_small.render(f"Final Score: {SCORE}", True, WHITE)
-        final_coins = font_small.render(f"Coins Collected: {COINS_COLLECTED}", True, WHITE)
-        DISPLAYSURF.blit(final_score, (SCREEN_WIDTH // 2 - 60, SCREEN_HEIGHT // 2))
-        DISPLAYSURF.blit(final_coins, (SCREEN_WIDTH // 2 - 80, SCREEN_HEIGHT // 2 + 30))
-
-        # Update display, wait, then exit
-        pygame.display.update()
-        time.sleep(2)
-        pygame.quit()
-        sys.exit()
-
-    # Update the display and maintain frame rate
+            quit_game()
+
+    if state == "playing":
+        # Run as many fixed steps as the real time that passed
+        accumulator += frame_time
+        direction = steer()
+        while accumulator >= STEP and state == "playing":
+            accumulator -= STEP
+            for event in sim.step(direction):
+                if event[0] == "boost":
+                    boost_timer = BOOST_MESSAGE_TIME
+                elif event[0] == "crash":
+                    audio.stop_music()
+                    audio.play("crash")  # Play crash sound
+                    scores.record(sim.score, sim.coins_collected, sim.time, PLAYER_NAME)
+                    state, state_time = "crashed", 0.0
+        draw_game(accumulator / STEP)
+    elif state == "crashed":
+        draw_game(1.0)  # Frozen on the crash
+        if state_time >= CRASH_PAUSE:
+            state, state_time = "game_over", 0.0
+    elif state == "game_over":
+        draw_game_over()
+        if state_time >= GAME_OVER_TIME:
+            quit_game()
+
+    # Update the display
     pygame.display.update()
-    FramePerSec.tick(FPS)
+    startup.first_frame()
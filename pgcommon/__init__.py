@@ -0,0 +1 @@
+"""Helpers shared by the pygame apps in the labs (audio, startup, profiling, free cells)."""
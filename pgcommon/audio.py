@@ -0,0 +1,133 @@
+"""Audio manager shared by the racer and the music player.
+
+Sound effects are decoded into Sound objects once, when loaded, and played
+on a fixed pool of mixer channels: a new effect takes a free channel, or
+else the one playing the oldest effect of the same or lower priority, so
+effects never queue up or cut off something more important. Music is
+streamed from disk by pygame.mixer.music, separately from the pool. A
+track change with fade_ms fades the old track out, then the new one in;
+the mixer does the fading, and update() (once per frame) starts the new
+track when the old one has gone quiet.
+
+None of the play calls wait for anything. If there is no audio device the
+manager still works, it just stays silent.
+
+Apps outside this folder import it after putting the repo root on sys.path:
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+    from pgcommon.audio import AudioManager
+"""
+import time
+
+import pygame
+
+CHANNELS = 8  # Effects that can play at once
+FREQUENCY = 44100
+BUFFER = 512  # Samples per mixer buffer; small for low latency
+
+
+class AudioManager:
+    def __init__(self, channels=CHANNELS, frequency=FREQUENCY, buffer=BUFFER):
+        self.sounds = {}  # name -> decoded Sound
+        self.enabled = True
+        if not pygame.mixer.get_init():
+            try:
+                pygame.mixer.init(frequency=frequency, buffer=buffer)
+            except pygame.error as error:
+                print(f"Audio disabled: {error}")
+                self.enabled = False
+        self.channels = []
+        self.playing = []  # channel index -> (start time, priority)
+        if self.enabled:
+            pygame.mixer.set_num_channels(channels)
+            self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+            self.playing = [(0.0, 0)] * channels
+        self.music_path = None
+        self.music_paused = False
+        self.next_music = None  # (path, loops, volume, fade_ms) waiting for a fade-out
+
+    # --- Sound effects ---
+    def load(self, name, path, volume=1.0):
+        """Decodes a sound file once and keeps it under name."""
+        if self.enabled and name not in self.sounds:
+            sound = pygame.mixer.Sound(path)
+            sound.set_volume(volume)
+            self.sounds[name] = sound
+
+    def play(self, name, priority=0, loops=0):
+        """Plays a loaded sound on a pool channel; returns the Channel, or None if it was dropped."""
+        sound = self.sounds.get(name)
+        if sound is None:
+            return None
+        index = self._free_channel(priority)
+        if index is None:
+            return None  # Everything playing is more important
+        channel = self.channels[index]
+        channel.play(sound, loops=loops)
+        self.playing[index] = (time.perf_counter(), priority)
+        return channel
+
+    def _free_channel(self, priority):
+        oldest = None
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+            started, playing_priority = self.playing[index]
+            if playing_priority <= priority and (oldest is None or started < self.playing[oldest][0]):
+                oldest = index
+        return oldest
+
+    def stop_all(self):
+        for channel in self.channels:
+            channel.stop()
+
+    # --- Music (streamed) ---
+    def play_music(self, path, loops=-1, volume=1.0, fade_ms=0):
+        """Streams a music file, replacing whatever music was playing.
+
+        With fade_ms, music that is playing fades out over fade_ms and the
+        new track then fades in over fade_ms (started by update()).
+        """
+        if not self.enabled:
+            return
+        if fade_ms and not self.music_paused and pygame.mixer.music.get_busy():
+            pygame.mixer.music.fadeout(fade_ms)  # Returns at once; the fade runs in the mixer
+            self.next_music = (path, loops, volume, fade_ms)
+        else:
+            self.next_music = None
+            self._start_music(path, loops, volume, fade_ms)
+        self.music_path = path
+        self.music_paused = False
+
+    def _start_music(self, path, loops, volume, fade_ms):
+        pygame.mixer.music.load(path)  # Only opens the file; it is decoded as it plays
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(loops, fade_ms=fade_ms)
+
+    def update(self):
+        """Starts the next track once the previous one has faded out; call once per frame."""
+        if self.next_music is not None and not pygame.mixer.music.get_busy():
+            self._start_music(*self.next_music)
+            self.next_music = None
+
+    def toggle_music(self):
+        """Pauses or resumes the music; returns True if it is now paused."""
+        if self.next_music is not None:  # Mid fade: skip to the next track, then pause that
+            self._start_music(*self.next_music)
+            self.next_music = None
+        if self.enabled and self.music_path is not None:
+            if self.music_paused:
+                pygame.mixer.music.unpause()
+            else:
+                pygame.mixer.music.pause()
+            self.music_paused = not self.music_paused
+        return self.music_paused
+
+    def stop_music(self, fade_ms=0):
+        self.next_music = None
+        if self.enabled and self.music_path is not None:
+            if fade_ms:
+                pygame.mixer.music.fadeout(fade_ms)  # Returns at once; the fade runs in the mixer
+            else:
+                pygame.mixer.music.stop()
+            self.music_path = None
@@ -0,0 +1,59 @@
+"""Startup for the pygame apps: initialize only the pygame modules an app uses, and time it.
+
+pygame.init() starts every module, including the mixer (which opens the
+audio device) and the joysticks, whether the app uses them or not. Apps
+start like this instead, before importing anything else that imports pygame:
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+    from pgcommon.bootstrap import Startup
+    startup = Startup("Paint", ("display", "font"))  # Imports pygame and starts just these
+
+    ...                       # imports, window, assets
+    startup.mark("assets")    # time since the previous mark
+    ...
+    pygame.display.flip()
+    startup.first_frame()     # prints the breakdown, on the first call only
+
+Without pygame.init(), pygame.time.get_ticks() always returns 0, so these
+apps use ticks() from this module instead.
+"""
+import time
+
+START = time.perf_counter()  # When the bootstrap was imported, close to the start of the app
+
+
+def ticks():
+    """Milliseconds since startup, like pygame.time.get_ticks()."""
+    return int((time.perf_counter() - START) * 1000)
+
+
+class Startup:
+    def __init__(self, app, modules=("display",)):
+        self.app = app
+        self.marks = []  # (label, seconds)
+        self.last = START
+        self.done = False
+
+        import pygame
+        self.mark("import pygame")
+        for name in modules:
+            try:
+                getattr(pygame, name).init()
+            except pygame.error as error:
+                print(f"{app}: could not start pygame.{name}: {error}")
+        self.mark("init " + "+".join(modules))
+
+    def mark(self, label):
+        """Charges the time since the previous mark to label."""
+        now = time.perf_counter()
+        self.marks.append((label, now - self.last))
+        self.last = now
+
+    def first_frame(self):
+        """Marks the first frame as shown and prints the startup breakdown (only the first time)."""
+        if self.done:
+            return
+        self.done = True
+        self.mark("first frame")
+        parts = ", ".join(f"{label} {seconds * 1000:.1f} ms" for label, seconds in self.marks)
+        print(f"Startup ({self.app}): {parts} = {(self.last - START) * 1000:.0f} ms to first frame")
@@ -0,0 +1,71 @@
+"""Free-cell index shared by the lab8 and lab10 snake games.
+
+Apps outside this folder import it after putting the repo root on sys.path:
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+    from pgcommon.free_cells import FreeCells
+"""
+import random
+from array import array
+
+
+class FreeCells:
+    """Set of free cell indices with O(1) add, remove and uniform sampling.
+
+    The free cells are packed into an array; a position map remembers where
+    each cell sits so removing one just swaps the last entry into its slot.
+    Picking a random free cell stays O(1) however full the board is.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.reset()
+
+    def reset(self, taken=None):
+        """Marks every cell as free again, except those with a non-zero byte in taken."""
+        if taken is None:
+            self.cells = array('i', range(self.size))
+            self.pos = array('i', range(self.size))  # -1 when the cell is taken
+            return
+        self.cells = array('i', [index for index in range(self.size) if not taken[index]])
+        self.pos = array('i', [-1]) * self.size
+        for slot, index in enumerate(self.cells):
+            self.pos[index] = slot
+
+    def snapshot(self):
+        return array('i', self.cells), array('i', self.pos)
+
+    def restore(self, state):
+        cells, pos = state
+        self.cells = array('i', cells)
+        self.pos = array('i', pos)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, index):
+        return 0 <= index < self.size and self.pos[index] >= 0
+
+    def remove(self, index):
+        """Marks a cell as taken (no-op if it already is)."""
+        slot = self.pos[index]
+        if slot < 0:
+            return
+        last = self.cells.pop()
+        if last != index:
+            self.cells[slot] = last
+            self.pos[last] = slot
+        self.pos[index] = -1
+
+    def add(self, index):
+        """Marks a cell as free (no-op if it already is)."""
+        if self.pos[index] >= 0:
+            return
+        self.pos[index] = len(self.cells)
+        self.cells.append(index)
+
+    def sample(self, rng=random):
+        """Returns a random free cell index, or None when the board is full."""
+        if not self.cells:
+            return None
+        return self.cells[rng.randrange(len(self.cells))]
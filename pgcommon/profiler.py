@@ -0,0 +1,142 @@
+"""Frame profiler with an on-screen overlay, shared by the paint apps of lab8 and lab9.
+
+The main loop calls start_frame(), then lap(phase) after each phase (the
+time since the previous lap goes to that phase) and end_frame() after the
+flip. The last WINDOW frames are kept per phase for rolling percentiles.
+
+F3 toggles the overlay (FPS, per-phase p50/p95/max in ms, object counts).
+F4 starts/stops recording a per-frame trace, written as CSV when stopped.
+"""
+import csv
+import time
+from collections import deque
+
+import pygame
+
+WINDOW = 300  # Frames kept for the rolling stats (5 s at 60 FPS)
+REFRESH = 0.5  # Seconds between overlay redraws
+TRACE_PATH = "paint_trace.csv"
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class FrameProfiler:
+    def __init__(self, phases, trace_path=TRACE_PATH):
+        self.phases = list(phases) + ["hud"]  # "hud" is the overlay's own cost
+        self.samples = {phase: deque(maxlen=WINDOW) for phase in self.phases + ["frame"]}
+        self.frame_starts = deque(maxlen=WINDOW)
+        self.current = dict.fromkeys(self.phases, 0.0)
+        self.frame_start = self.last = time.perf_counter()
+        self.frame = 0
+        self.visible = False
+        self.trace = None  # Rows being recorded, or None
+        self.trace_path = trace_path
+        self.font = None  # Loaded the first time the overlay is shown
+        self.overlay = None
+        self.overlay_time = 0.0
+
+    # --- Timing ---
+    def start_frame(self):
+        self.frame_start = self.last = time.perf_counter()
+        self.frame_starts.append(self.frame_start)
+        for phase in self.current:
+            self.current[phase] = 0.0
+
+    def lap(self, phase):
+        """Charges the time since the previous lap (or the frame start) to phase."""
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        total = time.perf_counter() - self.frame_start
+        for phase, seconds in self.current.items():
+            self.samples[phase].append(seconds)
+        self.samples["frame"].append(total)
+        if self.trace is not None:
+            self.trace.append([self.frame, self.frame_start] + [self.current[p] for p in self.phases] + [total])
+        self.frame += 1
+
+    # --- Stats ---
+    def fps(self):
+        starts = self.frame_starts
+        if len(starts) < 2:
+            return 0.0
+        return (len(starts) - 1) / (starts[-1] - starts[0])
+
+    def stats(self, phase):
+        """(p50, p95, max) of a phase over the window, in milliseconds."""
+        values = sorted(self.samples[phase])
+        if not values:
+            return 0.0, 0.0, 0.0
+        return percentile(values, 0.5) * 1000, percentile(values, 0.95) * 1000, values[-1] * 1000
+
+    # --- Keys ---
+    def handle_event(self, event):
+        """F3 shows/hides the overlay, F4 starts/stops the trace. Returns True if the event was used."""
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == pygame.K_F3:
+            self.visible = not self.visible
+            self.overlay = None
+            return True
+        if event.key == pygame.K_F4:
+            if self.trace is None:
+                self.trace = []
+                print("Recording frame trace...")
+            else:
+                self.dump_trace()
+            return True
+        return False
+
+    def dump_trace(self, path=None):
+        """Writes the recorded frames as CSV (times in ms) and stops recording."""
+        path = path or self.trace_path
+        rows, self.trace = self.trace or [], None
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "time_s"] + [f"{p}_ms" for p in self.phases] + ["total_ms"])
+            start = rows[0][1] if rows else 0.0
+            for row in rows:
+                writer.writerow([row[0], f"{row[1] - start:.6f}"] + [f"{value * 1000:.4f}" for value in row[2:]])
+        print(f"Wrote {len(rows)} frames to {path}")
+
+    # --- Overlay ---
+    def draw(self, surface, counts=None):
+        """Draws the overlay (if visible) in the top-left corner of the canvas area.
+
+        counts is a {label: number} dict of object counts to show. The text is only
+        re-rendered every REFRESH seconds.
+        """
+        if not self.visible:
+            return
+        now = time.perf_counter()
+        if self.overlay is None or now - self.overlay_time >= REFRESH:
+            self.overlay = self._render(counts or {})
+            self.overlay_time = now
+        surface.blit(self.overlay, (10, 80))
+        self.lap("hud")
+
+    def _render(self, counts):
+        lines = [f"FPS {self.fps():.1f}   (p50 / p95 / max ms)"]
+        for phase in self.phases + ["frame"]:
+            p50, p95, worst = self.stats(phase)
+            lines.append(f"{phase:<8} {p50:6.2f} {p95:6.2f} {worst:6.2f}")
+        if counts:
+            lines.append("  ".join(f"{label} {value}" for label, value in counts.items()))
+        if self.trace is not None:
+            lines.append(f"TRACE {len(self.trace)} frames (F4 to save)")
+
+        if self.font is None:
+            self.font = pygame.font.SysFont("dejavusansmono,couriernew,monospace", 13)  # Columns line up
+        rendered = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(text.get_width() for text in rendered) + 12
+        panel = pygame.Surface((width, 16 * len(rendered) + 8))
+        panel.set_alpha(200)  # See-through, so the painting stays visible underneath
+        for i, text in enumerate(rendered):
+            panel.blit(text, (6, 4 + 16 * i))
+        return panel